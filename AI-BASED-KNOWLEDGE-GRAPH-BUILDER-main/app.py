@@ -15,7 +15,9 @@ Cognexa retrieves and synthesizes information from your knowledge base to delive
     ).send()
 
     try:
-        rag = RAGPipeline()
+        # Sessions share one process-wide RetrievalService; only the first
+        # session loads it, off the event loop.
+        rag = await cl.make_async(RAGPipeline)()
         cl.user_session.set("rag", rag)
 
     except Exception as e:
@@ -35,9 +37,13 @@ async def main(message: cl.Message):
         ).send()
         return
 
+    if message.content.startswith("/filter"):
+        await set_filter(rag, message.content[len("/filter"):].strip())
+        return
+
     with cl.Step(name="🔍 Retrieving relevant documents", type="run") as step:
         try:
-            answer, sources = rag.answer(message.content)
+            answer, sources = await rag.aanswer(message.content)
             step.output = "✅ Retrieval complete"
         except Exception as e:
             step.output = f"❌ Error: {str(e)}"
@@ -50,3 +56,18 @@ async def main(message: cl.Message):
         response += f"- `{src}`\n"
 
     await cl.Message(content=response).send()
+
+
+# ---------- Filters ----------
+async def set_filter(rag, args):
+    """/filter source=email,pdf name=report.pdf from=2024-10 to=2024-11; /filter clears it."""
+    try:
+        search_filter = rag.set_filter(args)
+    except ValueError as e:
+        await cl.Message(content=f"⚠️ {e}").send()
+        return
+
+    if search_filter is None:
+        await cl.Message(content="🔎 Filter cleared; searching all documents.").send()
+    else:
+        await cl.Message(content=f"🔎 Searching only `{search_filter}`.").send()
@@ -0,0 +1,126 @@
+"""
+Benchmark: recall@k vs latency of the ANN index types.
+
+Builds each vector_store.index_type through index_factory.build_index
+(IDMap2-wrapped, trained on a sample like the pipeline does), sweeps its
+query-time knob and reports, against exact flat search:
+- recall@k:   overlap of the returned top-k with the exact top-k
+- p50 ms:     single-query latency (the chat path)
+- QPS:        batched throughput over all queries
+- size MB:    serialized index size
+- build s:    train + add time
+
+Vectors are synthetic clustered unit vectors unless --vectors-file points
+to an .npy matrix (e.g. exported chunk embeddings); queries are held out
+from the same distribution.
+
+Run from the project root:
+    python -m benchmarks.ann_recall --vectors 200000 --k 10
+    python -m benchmarks.ann_recall --index-type IndexHNSWFlat --factory IVF1024,SQ8
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+
+from src.knowledge_graph.components.index_factory import apply_search_params, build_index
+
+SWEEPS = [
+    ("IndexIVFFlat", "nprobe", [1, 4, 16, 64]),
+    ("IndexIVFPQ", "nprobe", [4, 16, 64]),
+    ("IndexHNSWFlat", "ef_search", [16, 32, 64, 128]),
+]
+
+
+def synthetic(n, dim, clusters=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    points = centers[rng.integers(0, clusters, n)]
+    points += 1.5 * rng.standard_normal((n, dim), dtype=np.float32)
+    faiss.normalize_L2(points)
+    return points
+
+
+def load_vectors(args):
+    if args.vectors_file:
+        data = np.load(args.vectors_file, mmap_mode="r")
+        data = np.ascontiguousarray(data[:args.vectors + args.queries], dtype=np.float32)
+    else:
+        data = synthetic(args.vectors + args.queries, args.dim)
+    return data[args.queries:], data[:args.queries]
+
+
+def recall(found, truth, k):
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def measure(index, queries, k, single=200):
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    qps = len(queries) / (time.perf_counter() - start)
+
+    latencies = []
+    for q in queries[:single]:
+        start = time.perf_counter()
+        index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - start)
+    return found, float(np.median(latencies)) * 1000, qps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vectors-file", help=".npy matrix of real embeddings")
+    parser.add_argument("--nlist", type=int, default=0, help="0 = ~4*sqrt(n)")
+    parser.add_argument("--pq-m", type=int, default=16)
+    parser.add_argument("--pq-bits", type=int, default=8)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--train-sample", type=int, default=100_000)
+    parser.add_argument("--index-type", action="append",
+                        help="limit to these index types (repeatable)")
+    parser.add_argument("--factory", action="append", default=[],
+                        help="extra FAISS factory string to sweep over nprobe, e.g. OPQ16_64,IVF1024,PQ16")
+    args = parser.parse_args()
+
+    vectors, queries = load_vectors(args)
+    ids = np.arange(len(vectors), dtype=np.int64)
+    print(f"{len(vectors):,} vectors x {vectors.shape[1]}, {len(queries)} queries, k={args.k}")
+
+    def options(index_type):
+        return SimpleNamespace(index_type=index_type, metric="l2", nlist=args.nlist, pq_m=args.pq_m,
+                               pq_bits=args.pq_bits, hnsw_m=args.hnsw_m,
+                               train_sample=args.train_sample)
+
+    start = time.perf_counter()
+    exact = build_index(vectors, ids, options("IndexFlatL2"))
+    build_s = time.perf_counter() - start
+    truth, p50, qps = measure(exact, queries, args.k)
+    size = len(faiss.serialize_index(exact)) / 1e6
+
+    print(f"{'index':<16}{'knob':<16}{'recall@k':>9}{'p50 ms':>9}{'QPS':>10}{'size MB':>9}{'build s':>9}")
+    print(f"{'IndexFlatL2':<16}{'exact':<16}{1.0:9.3f}{p50:9.2f}{qps:10.0f}{size:9.1f}{build_s:9.1f}")
+
+    sweeps = [s for s in SWEEPS if not args.index_type or s[0] in args.index_type]
+    sweeps += [(factory, "nprobe", [4, 16, 64]) for factory in args.factory]
+
+    for index_type, knob, values in sweeps:
+        start = time.perf_counter()
+        index = build_index(vectors, ids, options(index_type))
+        build_s = time.perf_counter() - start
+        size = len(faiss.serialize_index(index)) / 1e6
+
+        for value in values:
+            apply_search_params(index, **{knob: value})
+            found, p50, qps = measure(index, queries, args.k)
+            print(f"{index_type:<16}{f'{knob}={value}':<16}{recall(found, truth, args.k):9.3f}"
+                  f"{p50:9.2f}{qps:10.0f}{size:9.1f}{build_s:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: peak memory and throughput of the streaming embedding engine.
+
+Streams --chunks synthetic chunks through EmbeddingEngine into a new
+VectorStore generation, in a fresh interpreter per --batch-size, with the
+query_load StubEncoder standing in for the model (--item-ms of GIL-free
+"compute" per chunk). A batch size of all chunks is the old behaviour:
+every chunk, vector and record held in memory before the index is built.
+Reports per batch size:
+- peak MB:   growth of peak RSS (VmHWM) over the interpreter baseline
+- index MB:  float32 vectors in the index, included in peak MB
+- chunks/s:  end-to-end rate, chunking and metadata writes included
+
+Run from the project root:
+    python -m benchmarks.embedding_stream --chunks 500000
+    python -m benchmarks.embedding_stream --batch-size 256 --batch-size 4096
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import json, os, time
+from types import SimpleNamespace
+def peak_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM"):
+                return int(line.split()[1]) / 1024
+from benchmarks.query_load import StubEncoder
+from src.knowledge_graph.components.embedding_engine import EmbeddingEngine
+from src.knowledge_graph.components.vector_store import VectorStore, make_chunk_id
+encoder = StubEncoder(0.0, {item_ms})
+options = SimpleNamespace(index_type="IndexFlatIP", metric="ip", quantization="none", nlist=0,
+                          pq_m=16, pq_bits=8, hnsw_m=32, train_sample=100_000)
+store = VectorStore(os.path.join({workdir!r}, "faiss.index"), os.path.join({workdir!r}, "metadata.json"))
+before = peak_mb()
+start = time.perf_counter()
+writer = store.begin()
+engine = EmbeddingEngine(writer, encoder.encode, options, batch_size={batch_size})
+for row in range({chunks}):
+    text = f"chunk {{row}} " + " ".join(f"token{{(row * 7 + i) % 5000}}" for i in range(80))
+    engine.add(text, {{"chunk_id": make_chunk_id(row // 8, row % 8), "doc_id": row // 8,
+                       "source_type": "pdf", "source_name": f"doc-{{row // 8}}.pdf", "text": text}})
+index = engine.finish()
+writer.commit(index, {{}}, {{"dim": index.d}})
+seconds = time.perf_counter() - start
+print("__RESULT__" + json.dumps({{
+    "peak_mb": peak_mb() - before, "index_mb": index.ntotal * index.d * 4 / 1e6,
+    "chunks_per_s": {chunks} / seconds, "encode_s": engine.encode_seconds,
+}}))
+"""
+
+
+def probe(chunks, batch_size, item_ms):
+    workdir = tempfile.mkdtemp(prefix="embedding_stream_")
+    try:
+        code = PROBE.format(chunks=chunks, batch_size=batch_size, item_ms=item_ms, workdir=workdir)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        for line in out.stdout.splitlines():
+            if line.startswith("__RESULT__"):
+                return json.loads(line[len("__RESULT__"):])
+        raise RuntimeError(out.stderr.strip().splitlines()[-1:])
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, action="append",
+                        help="batch sizes to compare (repeatable, default 256/1024/4096 and all chunks)")
+    parser.add_argument("--item-ms", type=float, default=0.0, help="simulated encoder cost per chunk")
+    args = parser.parse_args()
+
+    batch_sizes = args.batch_size or [256, 1024, 4096, args.chunks]
+    print(f"{args.chunks:,} chunks, stub encoder {args.item_ms} ms/chunk")
+    print(f"{'batch size':>12}{'peak MB':>10}{'index MB':>10}{'chunks/s':>11}{'encode s':>10}")
+    for batch_size in batch_sizes:
+        result = probe(args.chunks, batch_size, args.item_ms)
+        label = f"{batch_size:,}" + (" (all)" if batch_size >= args.chunks else "")
+        print(f"{label:>12}{result['peak_mb']:10.1f}{result['index_mb']:10.1f}"
+              f"{result['chunks_per_s']:11.0f}{result['encode_s']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
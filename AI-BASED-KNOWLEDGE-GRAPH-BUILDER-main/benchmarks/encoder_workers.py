@@ -0,0 +1,120 @@
+"""
+Benchmark: CPU embedding throughput vs encoder worker processes.
+
+Encodes a synthetic corpus of --chunks chunks with a wide spread of
+lengths (--min-words..--max-words) through EmbeddingEncoder, once per
+--workers value (0 = in-process), and checks that every run returns the
+same vectors in the same order as the in-process run. Reports the share
+of padded token slots holding no token with batches in document order vs
+length-sorted, then per run:
+- chunks/s:   throughput after the pool is warm (model loaded per worker)
+- speedup:    against the in-process run
+
+The default stub model pads each batch to its longest text and pays a
+matmul per padded token, like a transformer forward pass, but its BLAS
+threads are not pinned. --model runs a real sentence-transformers model
+on CPU instead, with torch threads pinned per worker.
+
+Run from the project root:
+    python -m benchmarks.encoder_workers --workers 0 --workers 2 --workers 4
+    python -m benchmarks.encoder_workers --model sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+import os
+import random
+import time
+import zlib
+
+import numpy as np
+
+from src.knowledge_graph.components.embedding_encoder import EmbeddingEncoder, load_cpu_model
+
+DIM = 384
+
+
+class PaddedStubModel:
+    """Token-hash vectors; compute scales with batch rows x longest text, as in a transformer."""
+
+    def __init__(self):
+        self.weights = np.random.default_rng(0).standard_normal((DIM, DIM)).astype(np.float32)
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        # SentenceTransformer.encode sorts each call by length too
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i].split()))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            padded = len(batch) * max(len(texts[i].split()) for i in batch)
+            np.dot(np.ones((padded, DIM), dtype=np.float32), self.weights)
+            for i in batch:
+                for token in texts[i].split():
+                    vectors[i, zlib.crc32(token.encode()) % DIM] += 1.0
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+
+def load_stub(model_name):
+    return PaddedStubModel()
+
+
+def corpus(args):
+    rng = random.Random(0)
+    return [" ".join(f"w{rng.randrange(20000)}" for _ in range(rng.randint(args.min_words, args.max_words)))
+            for _ in range(args.chunks)]
+
+
+def padding(lengths, batch_size):
+    """Share of padded slots holding no token when batching lengths in the given order."""
+    slots = sum(len(lengths[s:s + batch_size]) * max(lengths[s:s + batch_size])
+                for s in range(0, len(lengths), batch_size))
+    return 1 - sum(lengths) / slots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--min-words", type=int, default=10)
+    parser.add_argument("--max-words", type=int, default=250)
+    parser.add_argument("--workers", type=int, action="append",
+                        help="worker counts to compare (repeatable, default 0, 1, 2, 4 up to the cores)")
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="0 = cores / workers")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model", help="real sentence-transformers model (default: stub)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or [0] + [w for w in (1, 2, 4, 8, 16) if w <= cores]
+    loader = load_cpu_model if args.model else load_stub
+    model_name = args.model or "stub"
+    texts = corpus(args)
+
+    lengths = [len(t.split()) for t in texts]
+    print(f"{args.chunks:,} chunks of {args.min_words}-{args.max_words} words, {cores} cores, "
+          f"model={model_name}, batch_size={args.batch_size}")
+    print(f"padding: {padding(lengths, args.batch_size):.0%} in document order, "
+          f"{padding(sorted(lengths, reverse=True), args.batch_size):.0%} length-sorted")
+    print(f"{'workers':>8}{'threads':>9}{'chunks/s':>10}{'speedup':>9}  same vectors")
+
+    reference, baseline = None, None
+    for workers in worker_counts:
+        encoder = EmbeddingEncoder(loader(model_name), model_name, normalize=True, workers=workers,
+                                   threads_per_worker=args.threads_per_worker,
+                                   batch_size=args.batch_size, loader=loader)
+        try:
+            # Warm-up: starts the pool and loads the model in every worker
+            encoder.encode(texts[:args.batch_size * max(workers, 1)])
+            start = time.perf_counter()
+            vectors = encoder.encode(texts)
+            rate = len(texts) / (time.perf_counter() - start)
+        finally:
+            encoder.close()
+
+        if reference is None:
+            reference, baseline = vectors, rate
+        same = np.allclose(vectors, reference, atol=1e-5)
+        print(f"{workers:>8}{encoder.threads:>9}{rate:10.0f}{rate / baseline:8.2f}x  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark: per-row session.run vs batched UNWIND writes to Neo4j.
+
+Runs against RecordingDriver, an in-process stand-in for the neo4j
+driver that records every statement and transaction, applies the
+writes to an in-memory graph, and simulates --rtt-ms of network round
+trip per statement/commit plus --row-us of server work per row. With
+--fail-rate, that share of commits fails with a retryable
+TransientError and is rolled back, to exercise GraphLoader's retries.
+
+Loads --entities synthetic entities and --triples triples
+- the old way: one auto-commit session.run per entity and per triple
+- with GraphLoader for every --batch-size x --workers combination
+and reports statements, transactions, retries, seconds, rows/s and
+whether the resulting graph is identical to the per-row load.
+
+Run from the project root:
+    python -m benchmarks.graph_load --entities 20000 --triples 60000
+    python -m benchmarks.graph_load --batch-size 1000 --workers 4 --fail-rate 0.05
+"""
+import argparse
+import random
+import threading
+import time
+
+from neo4j.exceptions import TransientError
+
+from src.knowledge_graph.components.graph_loader import ENTITY_QUERY, GraphLoader, TRIPLE_QUERY
+
+
+class RecordingDriver:
+    """neo4j.Driver stand-in: records statements and keeps the written graph in memory."""
+
+    def __init__(self, rtt_ms, row_us, fail_rate=0.0, seed=0):
+        self.rtt_s = rtt_ms / 1000
+        self.row_s = row_us / 1e6
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.nodes, self.edges = {}, set()
+        self.statements, self.transactions, self.failures = [], 0, 0
+
+    def session(self, database=None):
+        return _Session(self)
+
+    def close(self):
+        pass
+
+    def apply(self, query, rows):
+        """Executes the subset of Cypher the loaders send."""
+        time.sleep(self.rtt_s + self.row_s * len(rows))
+        with self.lock:
+            self.statements.append((" ".join(query.split()), len(rows)))
+            for row in rows:
+                if "MERGE (e:Entity" in query:
+                    self.nodes[row["id"]] = (row["name"], row["type"])
+                elif row["hid"] in self.nodes and row["tid"] in self.nodes:
+                    self.edges.add((row["hid"], row["rel"], row["tid"]))
+
+    def graph(self):
+        return self.nodes, self.edges
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        # Auto-commit: one statement, one transaction, one round trip
+        self.driver.apply(query, [params])
+        with self.driver.lock:
+            self.driver.transactions += 1
+
+    def begin_transaction(self):
+        return _Transaction(self.driver)
+
+
+class _Transaction:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, rows):
+        self.pending.append((query, rows))
+        time.sleep(self.driver.rtt_s)
+        return self
+
+    def consume(self):
+        return None
+
+    def commit(self):
+        driver = self.driver
+        with driver.lock:
+            failed = driver.random.random() < driver.fail_rate
+            driver.failures += failed
+        if failed:
+            # Rolled back: nothing in this transaction is applied
+            time.sleep(driver.rtt_s)
+            raise TransientError("Neo.TransientError.Transaction.DeadlockDetected (simulated)")
+        for query, rows in self.pending:
+            driver.apply(query, rows)
+        with driver.lock:
+            driver.transactions += 1
+
+
+def synthetic(entities, triples, seed=0):
+    rng = random.Random(seed)
+    ents = [{"id": f"entity {i}_ORG", "name": f"Entity {i}", "label": "ORG"} for i in range(entities)]
+    relations = ("WORKS_AT", "LOCATED_IN", "MADE_BY", "RELATED_TO")
+    trips, seen = [], set()
+    while len(trips) < triples:
+        head, tail, rel = rng.randrange(entities), rng.randrange(entities), rng.choice(relations)
+        if head != tail and (head, rel, tail) not in seen:
+            seen.add((head, rel, tail))
+            trips.append({"head_id": ents[head]["id"], "tail_id": ents[tail]["id"], "relation": rel})
+    return ents, trips
+
+
+def legacy_load(driver, entities, triples):
+    """The old build_graph loop."""
+    with driver.session(database="rag-kg-db") as session:
+        for ent in entities:
+            session.run("MERGE (e:Entity {id: $id}) SET e.name = $name, e.type = $type",
+                        id=ent["id"], name=ent["name"], type=ent["label"])
+        for t in triples:
+            session.run("MATCH (h:Entity {id: $hid}) MATCH (t:Entity {id: $tid}) "
+                        "MERGE (h)-[:RELATION {type: $rel}]->(t)",
+                        hid=t["head_id"], tid=t["tail_id"], rel=t["relation"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--triples", type=int, default=30_000)
+    parser.add_argument("--rtt-ms", type=float, default=0.3, help="simulated round trip per statement/commit")
+    parser.add_argument("--row-us", type=float, default=5.0, help="simulated server work per row")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of commits failing with TransientError")
+    parser.add_argument("--batch-size", type=int, action="append", help="repeatable, default 1000 and 5000")
+    parser.add_argument("--workers", type=int, action="append", help="repeatable, default 1 and 4")
+    args = parser.parse_args()
+
+    entities, triples = synthetic(args.entities, args.triples)
+    rows = len(entities) + len(triples)
+    print(f"{len(entities):,} entities + {len(triples):,} triples, rtt {args.rtt_ms} ms, "
+          f"{args.row_us} us/row, fail rate {args.fail_rate:.0%}")
+    print(f"{'mode':<22}{'statements':>11}{'txns':>8}{'retries':>9}{'seconds':>9}{'rows/s':>10}  same graph")
+
+    def report(label, driver, seconds, retries, reference):
+        same = reference is None or driver.graph() == reference
+        print(f"{label:<22}{len(driver.statements):>11,}{driver.transactions:>8,}{retries:>9}"
+              f"{seconds:9.2f}{rows / seconds:10.0f}  {'yes' if same else 'NO'}")
+
+    driver = RecordingDriver(args.rtt_ms, args.row_us)
+    start = time.perf_counter()
+    legacy_load(driver, entities, triples)
+    report("per-row session.run", driver, time.perf_counter() - start, 0, None)
+    reference = driver.graph()
+
+    for batch_size in args.batch_size or [1000, 5000]:
+        for workers in args.workers or [1, 4]:
+            driver = RecordingDriver(args.rtt_ms, args.row_us, args.fail_rate)
+            loader = GraphLoader(driver, "rag-kg-db", batch_size=batch_size, workers=workers,
+                                 max_retries=10, retry_backoff_s=0.001)
+            start = time.perf_counter()
+            loader.load_entities(entities)
+            loader.load_triples(triples)
+            seconds = time.perf_counter() - start
+            assert {q for q, _ in driver.statements} == {" ".join(ENTITY_QUERY.split()),
+                                                         " ".join(TRIPLE_QUERY.split())}
+            report(f"UNWIND {batch_size} x{workers}", driver, seconds, loader.retries, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: serving-process memory of chunk metadata.
+
+Writes --chunks synthetic chunk records both as a legacy metadata.json
+list and as the columnar MetadataStore, then, in a fresh interpreter for
+each, loads the metadata the way RetrievalService does and performs
+--lookups random lookups by chunk id. Reports on-disk size, growth of
+private (anonymous) RSS and of file-backed RSS, load time and lookup
+latency. File-backed pages are page cache shared by every process that
+maps the same store and can be reclaimed under memory pressure.
+
+Run from the project root:
+    python -m benchmarks.metadata_memory --chunks 1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from src.knowledge_graph.components.metadata_store import MetadataWriter
+
+PROBE = """
+import json, random, sys, time
+def rss_mb():
+    rss = {{}}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon", "RssFile")):
+                key, value = line.split()[:2]
+                rss[key.rstrip(":")] = int(value) / 1024
+    return rss
+import numpy
+from src.knowledge_graph.utils.resources import get_vector_metadata
+from src.knowledge_graph.components import metadata_store
+before = rss_mb()
+start = time.perf_counter()
+metadata = get_vector_metadata({path!r})
+load_s = time.perf_counter() - start
+ids = random.Random(0).sample(range({chunks}), {lookups})
+start = time.perf_counter()
+for i in ids:
+    metadata.get(i << 20)
+lookup_us = (time.perf_counter() - start) / len(ids) * 1e6
+after = rss_mb()
+print("__RESULT__" + json.dumps({{
+    "anon_mb": after["RssAnon"] - before["RssAnon"],
+    "file_mb": after["RssFile"] - before["RssFile"],
+    "load_s": load_s, "lookup_us": lookup_us,
+}}))
+"""
+
+
+def records(n):
+    for i in range(n):
+        yield {
+            "chunk_id": i << 20,
+            "doc_id": i,
+            "source_type": ("email", "pdf", "csv")[i % 3],
+            "source_name": f"data/source_{i // 500}.txt",
+            "text": f"chunk {i}: " + "lorem ipsum dolor sit amet " * 20,
+        }
+
+
+def disk_mb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+    return os.path.getsize(path) / 1e6
+
+
+def probe(path, chunks, lookups):
+    code = PROBE.format(path=path, chunks=chunks, lookups=lookups)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    for line in out.stdout.splitlines():
+        if line.startswith("__RESULT__"):
+            return json.loads(line[len("__RESULT__"):])
+    raise RuntimeError(out.stderr.strip().splitlines()[-1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="metadata_memory_")
+    try:
+        legacy = os.path.join(workdir, "metadata.json")
+        with open(legacy, "w") as f:
+            json.dump(list(records(args.chunks)), f)
+
+        columnar = os.path.join(workdir, "metadata.g1")
+        writer = MetadataWriter(columnar)
+        writer.extend(records(args.chunks))
+        writer.close()
+
+        print(f"{args.chunks:,} chunks, {args.lookups:,} random lookups")
+        print(f"{'format':<10}{'disk MB':>9}{'anon MB':>9}{'file MB':>9}{'load s':>8}{'lookup us':>11}")
+        for name, path in (("json", legacy), ("columnar", columnar)):
+            result = probe(path, args.chunks, args.lookups)
+            print(f"{name:<10}{disk_mb(path):9.1f}{result['anon_mb']:9.1f}{result['file_mb']:9.1f}"
+                  f"{result['load_s']:8.2f}{result['lookup_us']:11.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: spaCy parsing throughput of the transformation stage.
+
+Builds the corpus from data/ with the ingestion parsers (email bodies,
+PDF text, CSV rows), replicated --replicate times (default 100x), and
+parses it
+- per document with the full pipeline (the old self.nlp(text) loop)
+- through NLPEngine: nlp.pipe, only the components the extractor reads
+  (senter instead of the parser), for every --n-process value
+Reports docs/s, speedup over the per-document loop and entity count,
+then checks that the trimmed pipeline finds exactly the entities (span
+and label) of the full one on every document of the unreplicated corpus;
+exits with an error when any document differs.
+
+Needs spaCy and the model (python -m spacy download en_core_web_sm).
+
+Run from the project root:
+    python -m benchmarks.nlp_throughput
+    python -m benchmarks.nlp_throughput --n-process 1 --n-process 4 --batch-size 128
+"""
+import argparse
+import glob
+import os
+import time
+
+import spacy
+
+from src.knowledge_graph.components.data_ingestion import _parse_csv, _parse_email, _parse_pdf
+from src.knowledge_graph.components.nlp_engine import NLPEngine
+from src.knowledge_graph.entity.config_entity import PdfIngestionConfig
+
+
+def corpus(data_dir):
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "emails", "*.txt"))):
+        payloads.extend(_parse_email(path))
+    for path in sorted(glob.glob(os.path.join(data_dir, "pdf", "*.pdf"))):
+        payloads.extend(_parse_pdf(path, PdfIngestionConfig()))
+    for path in sorted(glob.glob(os.path.join(data_dir, "spreadsheets", "*.csv"))):
+        payloads.extend(_parse_csv(path))
+    return [text for _, _, _, text in payloads if text]
+
+
+def report(label, texts, run, baseline=None):
+    start = time.perf_counter()
+    entities = sum(len(doc.ents) for doc in run(texts))
+    rate = len(texts) / (time.perf_counter() - start)
+    speedup = f"{rate / baseline:8.2f}x" if baseline else f"{'':>9}"
+    print(f"{label:<34}{rate:10.1f}{speedup}{entities:>11,}")
+    return rate
+
+
+def entity_spans(doc):
+    return {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+
+
+def entity_mismatches(texts, nlp, engine):
+    """Indices of texts whose entities differ between the full pipeline and NLPEngine."""
+    trimmed = (doc for doc, _ in engine.pipe((text, None) for text in texts))
+    return [i for i, (text, doc) in enumerate(zip(texts, trimmed))
+            if entity_spans(nlp(text)) != entity_spans(doc)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--replicate", type=int, default=100)
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-length", type=int, default=100_000)
+    parser.add_argument("--n-process", type=int, action="append",
+                        help="process counts to compare (repeatable, default 1, 2, 4 up to the cores)")
+    args = parser.parse_args()
+
+    base = corpus(args.data_dir)
+    texts = base * args.replicate
+    cores = os.cpu_count() or 1
+    print(f"{len(base)} documents x {args.replicate} = {len(texts):,} docs "
+          f"({sum(map(len, texts)) / 1e6:.1f}M characters), {cores} cores, {args.model}")
+    print(f"{'run':<34}{'docs/s':>10}{'speedup':>9}{'entities':>11}")
+
+    nlp = spacy.load(args.model)
+    baseline = report(f"per document, {len(nlp.pipe_names)} components", texts,
+                      lambda items: (nlp(text) for text in items))
+
+    for n_process in args.n_process or [n for n in (1, 2, 4, 8) if n <= cores]:
+        engine = NLPEngine(args.model, batch_size=args.batch_size, n_process=n_process,
+                           max_length=args.max_length)
+        report(f"NLPEngine n_process={n_process}, {len(engine.nlp.pipe_names)} components", texts,
+               lambda items: (doc for doc, _ in engine.pipe((text, None) for text in items)), baseline)
+
+    engine = NLPEngine(args.model, batch_size=args.batch_size, max_length=args.max_length)
+    mismatches = entity_mismatches(base, nlp, engine)
+    if mismatches:
+        for i in mismatches[:5]:
+            print(f"document {i}: full {sorted(entity_spans(nlp(base[i])))}")
+        raise SystemExit(f"{len(mismatches)} of {len(base)} documents have different entities "
+                         f"with {engine.nlp.pipe_names}")
+    print(f"entities identical to the full pipeline on all {len(base)} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: recall vs memory of quantized vector storage.
+
+Builds every vector_store.quantization mode (none, fp16, int8, pq) for
+each --index-type through index_factory.build_index, exactly as the
+pipeline does, and reports on held-out queries:
+- size MB:    serialized index size (what lands on disk and in RAM)
+- ratio:      float32 size of the same index type / quantized size
+- recall@k:   overlap of the top-k with exact float32 search
+- loss:       recall@k lost against the float32 index of the same type
+- verdict:    ok when the ratio is within --min-ratio..--max-ratio and
+              loss < --max-loss. The ratio covers the whole index, so
+              ids and HNSW links keep fp16 slightly under a clean 2x.
+
+Vectors are synthetic clustered unit vectors unless --vectors-file points
+to an .npy matrix (e.g. exported chunk embeddings). --output also writes
+the report as JSON so it can be tracked between runs.
+
+Run from the project root:
+    python -m benchmarks.quantization_report --vectors 200000
+    python -m benchmarks.quantization_report --index-type IndexHNSWFlat --pq-m 96
+"""
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+import faiss
+import numpy as np
+
+from benchmarks.ann_recall import load_vectors, measure, recall
+from src.knowledge_graph.components.index_factory import (
+    QUANTIZATION, apply_search_params, build_index, factory_string,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vectors-file", help=".npy matrix of real embeddings")
+    parser.add_argument("--metric", choices=("ip", "l2"), default="ip")
+    parser.add_argument("--nlist", type=int, default=0, help="0 = ~4*sqrt(n)")
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--pq-m", type=int, default=192, help="bytes per vector in pq mode")
+    parser.add_argument("--pq-bits", type=int, default=8)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--train-sample", type=int, default=100_000)
+    parser.add_argument("--index-type", action="append",
+                        help="index types to report (repeatable, default IndexFlatIP/L2 per --metric)")
+    parser.add_argument("--min-ratio", type=float, default=1.9)
+    parser.add_argument("--max-ratio", type=float, default=8.0)
+    parser.add_argument("--max-loss", type=float, default=0.01)
+    parser.add_argument("--output", help="also write the report as JSON here")
+    args = parser.parse_args()
+
+    vectors, queries = load_vectors(args)
+    if args.metric == "ip":
+        faiss.normalize_L2(vectors)
+        faiss.normalize_L2(queries)
+    ids = np.arange(len(vectors), dtype=np.int64)
+    flat = "IndexFlatIP" if args.metric == "ip" else "IndexFlatL2"
+    index_types = args.index_type or [flat]
+
+    def options(index_type, quantization):
+        return SimpleNamespace(index_type=index_type, metric=args.metric, quantization=quantization,
+                               nlist=args.nlist, pq_m=args.pq_m, pq_bits=args.pq_bits,
+                               hnsw_m=args.hnsw_m, train_sample=args.train_sample)
+
+    exact = build_index(vectors, ids, options(flat, "none"))
+    truth, _, _ = measure(exact, queries, args.k)
+    print(f"{len(vectors):,} vectors x {vectors.shape[1]}, {len(queries)} held-out queries, "
+          f"k={args.k}, metric={args.metric}")
+    print(f"{'index':<16}{'quantization':<14}{'factory':<18}{'size MB':>9}{'ratio':>7}"
+          f"{'recall@k':>9}{'loss':>8}{'p50 ms':>8}{'build s':>8}  verdict")
+
+    report = []
+    for index_type in index_types:
+        baseline = None
+        for quantization in QUANTIZATION:
+            start = time.perf_counter()
+            index = build_index(vectors, ids, options(index_type, quantization))
+            build_s = time.perf_counter() - start
+            apply_search_params(index, nprobe=args.nprobe, ef_search=args.ef_search)
+
+            found, p50, _ = measure(index, queries, args.k)
+            row = {
+                "index_type": index_type,
+                "quantization": quantization,
+                "factory": factory_string(index_type, len(vectors), options(index_type, quantization)),
+                "size_mb": len(faiss.serialize_index(index)) / 1e6,
+                "recall": recall(found, truth, args.k),
+                "p50_ms": p50,
+                "build_s": build_s,
+            }
+            if baseline is None:
+                baseline = row
+            row["ratio"] = baseline["size_mb"] / row["size_mb"]
+            row["loss"] = baseline["recall"] - row["recall"]
+            row["ok"] = quantization == "none" or (
+                args.min_ratio <= row["ratio"] <= args.max_ratio and row["loss"] < args.max_loss
+            )
+            report.append(row)
+
+            print(f"{index_type:<16}{quantization:<14}{row['factory']:<18}{row['size_mb']:9.1f}"
+                  f"{row['ratio']:6.1f}x{row['recall']:9.3f}{row['loss']:8.3f}{p50:8.2f}"
+                  f"{build_s:8.1f}  {'ok' if row['ok'] else 'outside target'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"vectors": len(vectors), "dim": int(vectors.shape[1]), "queries": len(queries),
+                       "k": args.k, "metric": args.metric, "rows": report}, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Benchmark: query latency and throughput under concurrent users.
+
+Simulates --users concurrent chat sessions on one event loop, as the
+Chainlit app runs them, each sending --queries questions back to back
+through HybridRetriever. Reports p50/p99 latency and QPS for:
+- sync:  retriever.invoke() called from the handler (blocks the loop)
+- async: await retriever.ainvoke() (encode/search on the executor,
+         graph lookups through the async driver)
+
+No models or database are needed: the embedder is a stub that hashes
+tokens and holds the CPU for --encode-ms per call plus --encode-item-ms
+per text, the index is a random FAISS flat index, and the graph is an
+in-process stand-in that answers after --graph-ms.
+
+--batch-size sets the query micro-batch size (1 disables batching).
+
+Run from the project root:
+    python -m benchmarks.query_load --users 1 10 100
+    python -m benchmarks.query_load --mode async --users 50 100 --batch-size 1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import zlib
+
+import faiss
+import numpy as np
+
+from src.knowledge_graph.components.data_retriever import HybridRetriever
+from src.knowledge_graph.components.retrieval_service import RetrievalService
+from src.knowledge_graph.entity.config_entity import (Ragpipelineconfig, faiss_data,
+                                                      neo4j_config, llmconfig)
+from src.knowledge_graph.utils.resources import get_resource
+
+DIM = 384
+QUESTIONS = [
+    "What did Alice send to Bob about the Orders table?",
+    "Which Customers placed orders in March?",
+    "Summarize the Contract Review email thread",
+    "Who approved the Budget for Project Atlas?",
+]
+
+
+# ---------- STAND-INS ----------
+class StubEncoder:
+    """Deterministic token-hash embeddings; GIL-free 'compute' per call and per text."""
+
+    def __init__(self, encode_ms, item_ms):
+        self.encode_s = encode_ms / 1000
+        self.item_s = item_ms / 1000
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        time.sleep(self.encode_s + self.item_s * len(texts))
+        vecs = np.zeros((len(texts), DIM), dtype="float32")
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                vecs[row, zlib.crc32(token.encode()) % DIM] += 1.0
+        return vecs
+
+
+class StubNLP:
+    """Capitalized words stand in for named entities."""
+
+    class _Ent:
+        def __init__(self, text):
+            self.text = text
+
+    class _Doc:
+        def __init__(self, ents):
+            self.ents = ents
+
+    def __call__(self, text):
+        words = [w.strip("?.,") for w in text.split()[1:]]
+        return self._Doc([self._Ent(w) for w in words if w[:1].isupper()])
+
+
+def _records(name, limit):
+    return [{"n.name": name, "rel": "RELATED_TO", "m.name": f"{name}-{i}"} for i in range(limit)]
+
+
+class FakeGraph:
+    """Sync neo4j.Driver stand-in: each query takes graph_ms."""
+
+    def __init__(self, graph_ms):
+        self.graph_s = graph_ms / 1000
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def run(self, query, name, limit):
+        time.sleep(self.graph_s)
+        return _records(name, limit)
+
+
+class FakeAsyncGraph(FakeGraph):
+    """neo4j.AsyncDriver stand-in: each query awaits graph_ms."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def run(self, query, name, limit):
+        await asyncio.sleep(self.graph_s)
+        return _AsyncResult(_records(name, limit))
+
+
+class _AsyncResult:
+    def __init__(self, records):
+        self._records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._records)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class StubResources:
+    """RAGResources with the stand-ins above."""
+
+    def __init__(self, config, graph_ms):
+        self.retrieval = RetrievalService.shared(config)
+        self.nlp = StubNLP()
+        self.graph = FakeGraph(graph_ms)
+        self.async_graph = FakeAsyncGraph(graph_ms)
+
+
+def build_resources(args):
+    config = Ragpipelineconfig(
+        input_json=None,
+        faiss=faiss_data(index_path="benchmark://faiss.index",
+                         metadata_path="benchmark://metadata.json",
+                         top_k=5, search_workers=args.search_workers,
+                         batch_max_size=args.batch_size,
+                         batch_max_wait_ms=args.batch_wait_ms),
+        neo4j=neo4j_config(uri="benchmark://graph", username="bench", password=""),
+        llm=llmconfig(provider="none", model="none", temperature=0.0, max_tokens=0),
+        embedding_model="benchmark-stub",
+    )
+
+    # Pre-register the stand-ins under the keys RetrievalService loads
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(DIM)
+    index.add(rng.random((args.vectors, DIM), dtype="float32"))
+    metadata = {i: {"source_type": "email", "source_name": f"doc-{i}", "text": f"chunk {i}"}
+                for i in range(args.vectors)}
+
+    get_resource(("embedder", config.embedding_model), lambda: StubEncoder(args.encode_ms, args.encode_item_ms))
+    get_resource(("faiss_index", str(config.faiss.index_path), True), lambda: index)
+    get_resource(("vector_metadata", str(config.faiss.metadata_path)), lambda: metadata)
+    return StubResources(config, args.graph_ms)
+
+
+# ---------- LOAD ----------
+async def user(retriever, mode, queries, latencies):
+    for i in range(queries):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        start = time.perf_counter()
+        # The message arrives now; any time spent waiting for a blocked
+        # loop to reach this handler counts towards its latency.
+        await asyncio.sleep(0)
+        if mode == "sync":
+            retriever.invoke(question)
+        else:
+            await retriever.ainvoke(question)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(retriever, mode, users, queries):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(user(retriever, mode, queries, latencies) for _ in range(users)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99, len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=20, help="queries per user")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--vectors", type=int, default=10_000)
+    parser.add_argument("--encode-ms", type=float, default=15.0)
+    parser.add_argument("--encode-item-ms", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0)
+    parser.add_argument("--graph-ms", type=float, default=10.0)
+    parser.add_argument("--search-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    retriever = HybridRetriever(resources=build_resources(args))
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+
+    print(f"{'mode':>6} {'users':>6} {'p50 ms':>9} {'p99 ms':>9} {'QPS':>8}")
+    for mode in modes:
+        for users in args.users:
+            p50, p99, qps = asyncio.run(run_level(retriever, mode, users, args.queries))
+            print(f"{mode:>6} {users:>6} {p50 * 1000:9.1f} {p99 * 1000:9.1f} {qps:8.1f}")
+
+    batcher = retriever.resources.retrieval.batcher
+    if batcher:
+        print(f"mean query batch size: {batcher.mean_batch_size:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: cold-start time of the entry points.
+
+Each measurement runs in a fresh interpreter and reports:
+- import: importing the entry module (main.py, rag.py, app.py)
+- ready:  building what the entry point needs before it can answer
+- query:  the first query (--first-query; loads the models and index)
+plus which heavy modules ended up imported.
+
+Run from the project root:
+    python -m benchmarks.startup_time --repeat 3 --first-query
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "faiss", "spacy", "neo4j", "langchain_groq"]
+
+ENTRY_POINTS = {
+    "main.py": {
+        "import": "import main",
+        "ready": "",
+        "query": "",
+    },
+    "rag.py": {
+        "import": "import rag",
+        "ready": "chain = rag.RAGPipeline.get_rag_chain()",
+        "query": "chain.steps[0].invoke('What is in the orders table?')",
+    },
+    "app.py": {
+        "import": "import app",
+        "ready": (
+            "from src.knowledge_graph.components.rag_pipeline import RAGPipeline\n"
+            "pipeline = RAGPipeline()"
+        ),
+        "query": "pipeline.answer('What is in the orders table?')",
+    },
+}
+
+PROBE = """
+import json, sys, time
+timings = {{}}
+def step(name, code):
+    if not code:
+        return
+    start = time.perf_counter()
+    try:
+        exec(code, globals())
+        timings[name] = time.perf_counter() - start
+    except Exception as e:
+        timings[name] = f"error: {{type(e).__name__}}: {{e}}"[:200]
+step("import", {import_code!r})
+step("ready", {ready_code!r})
+step("query", {query_code!r})
+timings["heavy_modules"] = [m for m in {heavy!r} if m in sys.modules]
+print("__TIMINGS__" + json.dumps(timings))
+"""
+
+
+def measure(entry, first_query):
+    codes = ENTRY_POINTS[entry]
+    probe = PROBE.format(
+        import_code=codes["import"],
+        ready_code=codes["ready"],
+        query_code=codes["query"] if first_query else "",
+        heavy=HEAVY_MODULES,
+    )
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True)
+    for line in out.stdout.splitlines():
+        if line.startswith("__TIMINGS__"):
+            return json.loads(line[len("__TIMINGS__"):])
+    return {"import": f"error: {out.stderr.strip().splitlines()[-1:]}"}
+
+
+def summarize(runs, key):
+    values = [r[key] for r in runs if isinstance(r.get(key), float)]
+    if values:
+        return f"{statistics.median(values):7.2f}s"
+    errors = [r[key] for r in runs if key in r]
+    return errors[0] if errors else "      -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--first-query", action="store_true")
+    parser.add_argument("--entry", choices=list(ENTRY_POINTS), action="append")
+    args = parser.parse_args()
+
+    for entry in args.entry or list(ENTRY_POINTS):
+        runs = [measure(entry, args.first_query) for _ in range(args.repeat)]
+        print(f"{entry}")
+        for key in ("import", "ready", "query"):
+            print(f"  {key:>6}: {summarize(runs, key)}")
+        print(f"  heavy modules loaded: {runs[-1].get('heavy_modules', [])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
-import os
-import faiss
-import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.knowledge_graph.utils.common import read_json, write_json
+from src.knowledge_graph.utils.common import iter_records
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.components.vector_store import VectorStore, make_chunk_id, resolve_store
+from src.knowledge_graph.components.embedding_encoder import EmbeddingEncoder
+from src.knowledge_graph.components.embedding_engine import EmbeddingEngine, index_settings
+from src.knowledge_graph.components.search_filter import document_date
 from src.knowledge_graph.logger.logging import logger
 from src.knowledge_graph.exception.exception import KGException
 import sys
 
+faiss = lazy_import("faiss")
+
 class DataEmbedding:
     """
     Milestone-3: Data Embedding Pipeline
@@ -17,24 +19,23 @@ class DataEmbedding:
     Optimized for RAG:
     - Preserves text content in metadata (Essential for retrieval).
     - Uses GPU acceleration if available.
-    - Implements batched processing.
+    - Streams chunks through batched encoding, so memory stays flat.
     """
 
+    # Recorded in the index settings; EmbeddingPipeline splits by words
+    CHUNKER = "recursive_character"
+
     def __init__(self, config):
         try:
             self.config = config
             
-            # 1. Load Data
-            self.documents = read_json(self.config.input_json)
-            
-            # 2. Setup Device (GPU/CPU)
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Embedding Model will run on: {self.device.upper()}")
-
-            # 3. Load Model
-            self.model = SentenceTransformer(
-                self.config.embedding_model.name,
-                device=self.device
+            # 1. Data is streamed from input_json in prepare_chunks
+
+            # 2-3. Model on GPU when available, length-sorted batches and the
+            # embedding cache (unchanged chunks are not re-encoded)
+            self.encoder = EmbeddingEncoder.from_config(
+                self.config.embedding_model.name, self.config.vector_store.normalize,
+                self.config.encoder, self.config.cache,
             )
 
             # 4. Setup Text Splitter
@@ -49,112 +50,74 @@ class DataEmbedding:
             self.index_path = self.config.vector_store.index_path
             self.metadata_path = self.config.vector_store.metadata_path
 
-            # Runtime Storage
-            self.text_chunks = []
-            self.metadata = []
-
         except Exception as e:
             raise KGException(e, sys)
 
     def prepare_chunks(self):
         """
         Step 1: Chunking
-        Splits text and prepares metadata.
+        Lazily yields (chunk text, metadata record) per chunk.
         CRITICAL: We must store the actual text in metadata for RAG retrieval.
         """
-        logger.info("Starting text chunking...")
-        
-        try:
-            global_chunk_id = 0
-            
-            for doc in self.documents:
-                # Handle potentially missing text
-                raw_text = doc.get("text", "")
-                if not raw_text:
-                    continue
-                    
-                chunks = self.text_splitter.split_text(raw_text)
-
-                for chunk in chunks:
-                    self.text_chunks.append(chunk)
-                    
-                    # Store rich metadata including the text itself
-                    self.metadata.append({
-                        "id": global_chunk_id,
-                        "document_id": doc.get("id"),
-                        "source_name": doc.get("source_name"),
-                        "source_type": doc.get("source_type"),
-                        "text": chunk,  # <--- CRITICAL FOR RAG
-                        "created_at": doc.get("ingestion_timestamp")
-                    })
-                    global_chunk_id += 1
-
-            logger.info(f"Chunking complete. Generated {len(self.text_chunks)} chunks.")
-
-        except Exception as e:
-            raise KGException(e, sys)
-
-    def generate_embeddings(self):
+        for doc in iter_records(self.config.input_json):
+            # Handle potentially missing text
+            raw_text = doc.get("text", "")
+            if not raw_text:
+                continue
+
+            chunks = self.text_splitter.split_text(raw_text)
+
+            for offset, chunk in enumerate(chunks):
+                # Store rich metadata including the text itself
+                yield chunk, {
+                    # Stable id: document id + chunk offset
+                    "chunk_id": make_chunk_id(doc.get("id"), offset),
+                    "doc_id": doc.get("id"),
+                    "source_name": doc.get("source_name"),
+                    "source_type": doc.get("source_type"),
+                    "text": chunk,  # <--- CRITICAL FOR RAG
+                    "created_at": document_date(doc)  # email Date, else ingestion time
+                }
+
+    def run(self):
         """
-        Step 2: Vectorization
-        Generates embeddings using the loaded model.
+        Steps 2-3: Vectorization and Storage (FAISS + Metadata)
+        Chunks stream through an EmbeddingEngine batch_size at a time and
+        are published as a new generation; readers never see a
+        half-written index/metadata pair.
         """
-        logger.info("Starting embedding generation...")
-        
-        try:
-            if not self.text_chunks:
-                logger.warning("No text chunks to embed.")
-                return np.array([])
-
-            # Encode in batches to manage memory
-            batch_size = 32
-            embeddings = self.model.encode(
-                self.text_chunks,
-                batch_size=batch_size,
-                show_progress_bar=True,
-                convert_to_numpy=True,
-                normalize_embeddings=True # Good for cosine similarity search
-            )
-            
-            logger.info(f"Generated embeddings with shape: {embeddings.shape}")
-            return embeddings
-
-        except Exception as e:
-            raise KGException(e, sys)
+        logger.info("Chunking, embedding and indexing...")
 
-    def save_vector_store(self, embeddings):
-        """
-        Step 3: Storage (FAISS + Metadata)
-        """
-        logger.info("Saving Vector Store and Metadata...")
-        
+        writer = None
         try:
-            # --- A. Save Metadata ---
-            # We save metadata as a JSON list where index i corresponds to vector i
-            os.makedirs(os.path.dirname(self.metadata_path), exist_ok=True)
-            write_json(self.metadata_path, self.metadata)
-            
-            # --- B. Save FAISS Index ---
-            if len(embeddings) > 0:
-                dimension = embeddings.shape[1]
-                
-                # Using FlatL2 (Euclidean Distance). 
-                # For huge datasets (>100k), consider IndexIVFFlat.
-                index = faiss.IndexFlatL2(dimension)
-                index.add(embeddings)
-                
-                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-                faiss.write_index(index, self.index_path)
-                
-                logger.info(f"FAISS index saved to {self.index_path}")
-            else:
+            writer = VectorStore(self.index_path, self.metadata_path).begin()
+            # normalize (vector_store.normalize): cosine with metric: ip
+            engine = EmbeddingEngine(writer, self.encoder.embed, self.config.vector_store,
+                                     batch_size=self.config.batch_size)
+            for chunk, record in self.prepare_chunks():
+                engine.add(chunk, record)
+            index = engine.finish()
+
+            if index is None:
+                writer.abort()
                 logger.warning("No embeddings to save.")
+                return
+
+            self.encoder.save_cache()
+            settings = index_settings(self.config.embedding_model.name, index.d, self.config.chunking,
+                                      self.config.vector_store, self.CHUNKER)
+            writer.commit(index, {}, settings)
+            logger.info(f"FAISS index saved to {resolve_store(self.index_path, self.metadata_path)[0]}")
 
         except Exception as e:
+            if writer is not None:
+                writer.abort()
             raise KGException(e, sys)
+        finally:
+            self.encoder.close()
     
     def show_faiss_index(self):
-        index = faiss.read_index(self.index_path)
+        index = faiss.read_index(resolve_store(self.index_path, self.metadata_path)[0])
         print("Total vectors:", index.ntotal)
         print("Vector dimension:", index.d)
 
@@ -1,19 +1,269 @@
 import os
 import json
-import sqlite3
+import tempfile
 import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from src.knowledge_graph.components.db_ingestion import SQLiteTableReader
 from src.knowledge_graph.logger.logging import logger
 from src.knowledge_graph.exception.exception import KGException
+from src.knowledge_graph.utils.common import record_writer, file_sha256
 import sys
 import pypdf
 
 
+# ---------- SOURCE PARSERS ----------
+# Module-level so they can be pickled into worker processes.
+# Each parser yields (source_type, source_name, metadata, text) payloads;
+# record ids are assigned afterwards, in the parent, in a fixed order.
+# Tabular parsers first yield a table header payload (text is None) whose
+# metadata is stored once in tables_json; their rows only reference it.
+
+# Rows per frame for CSV/DB reads; large enough to amortize the column-wise
+# rendering in _frame_to_rows.
+TABLE_CHUNK_SIZE = 10_000
+
+def _frame_to_rows(frame):
+    """
+    Renders every row of a frame as "col: val, col: val", skipping nulls.
+    The "col: val" pieces are built column-wise on object arrays; only the
+    final join runs per row.
+
+    Returns (texts, values): values holds each row's rendered values in
+    column order (None for nulls). They are kept in the row's metadata so
+    SchemaExtractor reads columns without parsing the text back, which is
+    ambiguous once a value itself contains ", <column>: ".
+    """
+    pieces, columns = [], []
+    for col in frame.columns:
+        values = frame[col]
+        missing = values.isna().to_numpy()
+
+        if not is_string_dtype(values.dtype) or is_object_dtype(values.dtype):
+            values = values.astype(str)
+        strs = values.to_numpy(dtype=object, na_value="")
+
+        piece = f"{col}: " + strs
+        piece[missing] = None
+        pieces.append(piece)
+        strs[missing] = None
+        columns.append(strs)
+
+    texts = [", ".join(filter(None, row)) for row in zip(*pieces)]
+    return texts, [list(row) for row in zip(*columns)]
+
+
+def _frame_to_texts(frame):
+    return _frame_to_rows(frame)[0]
+
+
+def _table_payloads(source_type, source_name, table_meta, frames):
+    # "row" is the frame index: the line position for CSVs, the row key
+    # (rowid / primary key) for database tables.
+    ref = table_meta["table"]
+    yield source_type, source_name, table_meta, None
+
+    for frame in frames:
+        texts, values = _frame_to_rows(frame)
+        for row, text, row_values in zip(frame.index.tolist(), texts, values):
+            yield source_type, source_name, {"table": ref, "row": row, "values": row_values}, text
+
+
+def _parse_email(path):
+    file = os.path.basename(path)
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+
+        parts = content.split("\n\n", 1)
+        header_block = parts[0] if len(parts) > 0 else ""
+        body_text = parts[1] if len(parts) > 1 else content
+
+        headers = {}
+        for line in header_block.splitlines():
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+
+        yield (
+            "email",
+            file,
+            {
+                "from": headers.get("from"),
+                "to": headers.get("to"),
+                "date": headers.get("date"),
+                "subject": headers.get("subject"),
+                "file_path": os.path.abspath(path)
+            },
+            body_text
+        )
+
+    except Exception as e:
+        logger.warning(f"Failed to process email {file}: {e}")
+
+
+def _extract_pages(path, start, end):
+    """Extracts the text of pages [start, end); runs in page workers."""
+    reader = pypdf.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _pdf_page_texts(path, pdf_config):
+    """
+    Returns the text of every page of a PDF.
+
+    Pages are cached under cache_dir/<file sha256>/<page>.txt, so an
+    unchanged PDF is never re-extracted. Large PDFs are split into page
+    ranges extracted in parallel by page_workers processes.
+    """
+    cache = None
+    if pdf_config.cache_dir:
+        cache = os.path.join(pdf_config.cache_dir, file_sha256(path))
+        count_path = os.path.join(cache, "page_count")
+        if os.path.exists(count_path):
+            with open(count_path, "r", encoding="utf-8") as f:
+                page_count = int(f.read())
+            texts = []
+            for i in range(page_count):
+                with open(os.path.join(cache, f"{i}.txt"), "r", encoding="utf-8") as f:
+                    texts.append(f.read())
+            return texts
+
+    page_count = len(pypdf.PdfReader(path).pages)
+    # min_parallel_pages <= 0 means "always split"
+    workers = min(pdf_config.page_workers, page_count // max(pdf_config.min_parallel_pages, 1))
+
+    if workers > 1:
+        step = -(-page_count // workers)
+        ranges = [(s, min(s + step, page_count)) for s in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = executor.map(_extract_pages, *zip(*[(path, s, e) for s, e in ranges]))
+            texts = [text for part in parts for text in part]
+    else:
+        texts = _extract_pages(path, 0, page_count)
+
+    if cache:
+        os.makedirs(cache, exist_ok=True)
+        for i, text in enumerate(texts):
+            with open(os.path.join(cache, f"{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+        # Written last: marks the cache entry as complete
+        with open(os.path.join(cache, "page_count"), "w", encoding="utf-8") as f:
+            f.write(str(page_count))
+
+    return texts
+
+
+def _parse_pdf(path, pdf_config):
+    file = os.path.basename(path)
+    try:
+        texts = _pdf_page_texts(path, pdf_config)
+
+        if pdf_config.mode != "page":
+            yield (
+                "pdf",
+                file,
+                {
+                    "pages": len(texts),
+                    "file_path": os.path.abspath(path)
+                },
+                "\n".join(text for text in texts if text)
+            )
+            return
+
+        # One record per range of pages_per_record pages
+        step = pdf_config.pages_per_record
+        for start in range(0, len(texts), step):
+            end = min(start + step, len(texts))
+            yield (
+                "pdf",
+                file,
+                {
+                    "page_start": start + 1,
+                    "page_end": end,
+                    "pages": len(texts),
+                    "file_path": os.path.abspath(path)
+                },
+                "\n".join(text for text in texts[start:end] if text)
+            )
+
+    except Exception as e:
+        logger.warning(f"Failed to process PDF {file}: {e}")
+
+
+def _parse_csv(path):
+    file = os.path.basename(path)
+    try:
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        yield from _table_payloads(
+            "csv",
+            file,
+            {
+                "table": path,
+                "columns": columns,
+                "file_path": os.path.abspath(path)
+            },
+            pd.read_csv(path, chunksize=TABLE_CHUNK_SIZE)
+        )
+
+    except Exception as e:
+        logger.warning(f"Failed to process CSV {file}: {e}")
+
+
+def _parse_table(db_path, table_name, db_config, after_key=None):
+    # after_key restricts the read to rows appended after a previous run
+    try:
+        with SQLiteTableReader(db_path, db_config) as reader:
+            yield from _table_payloads(
+                "database",
+                table_name,
+                {
+                    "table": f"{db_path}::{table_name}",
+                    "columns": reader.columns(table_name),
+                    "db_path": os.path.abspath(db_path)
+                },
+                reader.iter_frames(table_name, after_key)
+            )
+
+    except Exception as e:
+        logger.warning(f"Failed to ingest table {table_name}: {e}")
+
+
+def _run_unit(unit, shard_path):
+    """
+    Runs one (key, parser, args) unit inside a worker process, streaming
+    its payloads to shard_path as JSON lines so neither the worker nor the
+    parent holds a whole file or table. Returns shard_path.
+    """
+    _, parser, args = unit
+    with open(shard_path, "w", encoding="utf-8") as f:
+        for payload in parser(*args):
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    return shard_path
+
+
+def _read_shard(shard_path):
+    """Payloads of a _run_unit shard, one line at a time."""
+    with open(shard_path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
 class DataIngestion:
     def __init__(self, config):
         self.config = config
-        self.records = []
+        # Records are streamed to output_json as they are produced
+        # (see ingest); only the count is kept in memory.
+        self.write_record = None
+        self.record_count = 0
         self.counter = 1
+        # Shared per-table metadata (columns, path, timestamp), keyed by ref;
+        # saved next to output_json unless tables_json is configured
+        self.tables = {}
+        self.tables_json = config.tables_json or os.path.join(
+            os.path.dirname(config.output_json), "tables.json")
+        self.batch_timestamp = None
 
     def _create_record(self, source_type, source_name, metadata, text):
         """Standardizes the record format."""
@@ -21,204 +271,168 @@ class DataIngestion:
             return None
 
         record = {
-            "id": self.counter,
+            "id": self._next_id(),
             "source_type": source_type,
             "source_name": source_name,
             "metadata": metadata,
             "text": text.strip(),
-            "ingestion_timestamp": datetime.utcnow().isoformat()
+            "ingestion_timestamp": self.batch_timestamp
         }
-        self.counter += 1
         return record
 
-    def _row_to_text(self, row, columns):
-        try:
-            return ", ".join(
-                [f"{col}: {val}" for col, val in zip(columns, row) if pd.notna(val)]
-            )
-        except Exception:
-            return " ".join(map(str, row))
-
-    # ---------- EMAIL INGESTION ----------
-    def ingest_emails(self):
-        logger.info("Starting Email Ingestion...")
+    def _make_records(self, payloads):
+        """Turns payloads into records; one timestamp per unit (batch)."""
+        self.batch_timestamp = datetime.utcnow().isoformat()
+
+        for source_type, source_name, metadata, text in payloads:
+            if text is None:
+                self.tables[metadata["table"]] = {
+                    **metadata,
+                    "source_type": source_type,
+                    "source_name": source_name,
+                    "ingestion_timestamp": self.batch_timestamp,
+                }
+                continue
+
+            record = self._create_record(source_type, source_name, metadata, text)
+            if record:
+                yield record
+
+    def _save_tables(self):
+        os.makedirs(os.path.dirname(self.tables_json), exist_ok=True)
+        with open(self.tables_json, "w", encoding="utf-8") as f:
+            json.dump(self.tables, f, indent=2, ensure_ascii=False)
+
+    def _next_id(self):
+        record_id = self.counter
+        self.counter += 1
+        return record_id
+
+    def _list_files(self, directory, extension):
+        # Sorted so record ids do not depend on filesystem listing order
+        if not os.path.exists(directory):
+            return []
+        return sorted(
+            os.path.join(directory, f)
+            for f in os.listdir(directory) if f.endswith(extension)
+        )
+
+    # ---------- WORK UNITS ----------
+    # One (key, parser, args) unit per file or table; the key identifies
+    # the source and the unit order fixes the record ids.
+    def _email_units(self):
         try:
-            if not os.path.exists(self.config.email_dir):
-                return
-
-            files = [f for f in os.listdir(self.config.email_dir) if f.endswith(".txt")]
-
-            for file in files:
-                path = os.path.join(self.config.email_dir, file)
-                try:
-                    with open(path, "r", encoding="utf-8", errors="replace") as f:
-                        content = f.read()
-
-                    parts = content.split("\n\n", 1)
-                    header_block = parts[0] if len(parts) > 0 else ""
-                    body_text = parts[1] if len(parts) > 1 else content
-
-                    headers = {}
-                    for line in header_block.splitlines():
-                        if ":" in line:
-                            key, value = line.split(":", 1)
-                            headers[key.strip().lower()] = value.strip()
-
-                    record = self._create_record(
-                        source_type="email",
-                        source_name=file,
-                        metadata={
-                            "from": headers.get("from"),
-                            "to": headers.get("to"),
-                            "date": headers.get("date"),
-                            "subject": headers.get("subject"),
-                            "file_path": os.path.abspath(path)
-                        },
-                        text=body_text
-                    )
-                    if record:
-                        self.records.append(record)
-
-                except Exception as e:
-                    logger.warning(f"Failed to process email {file}: {e}")
-
+            return [(path, _parse_email, (path,))
+                    for path in self._list_files(self.config.email_dir, ".txt")]
         except Exception as e:
             logger.error(f"Critical error in email ingestion: {e}")
+            return []
 
-    # ---------- PDF INGESTION ----------
-    def ingest_pdfs(self):
-        logger.info("Starting PDF Ingestion...")
+    def _pdf_units(self):
         try:
-            if not os.path.exists(self.config.pdf_dir):
-                return
-
-            files = [f for f in os.listdir(self.config.pdf_dir) if f.endswith(".pdf")]
-
-            for file in files:
-                path = os.path.join(self.config.pdf_dir, file)
-                try:
-                    reader = pypdf.PdfReader(path)
-                    text_content = []
-
-                    for page in reader.pages:
-                        extracted = page.extract_text()
-                        if extracted:
-                            text_content.append(extracted)
-
-                    full_text = "\n".join(text_content)
-
-                    record = self._create_record(
-                        source_type="pdf",
-                        source_name=file,
-                        metadata={
-                            "pages": len(reader.pages),
-                            "file_path": os.path.abspath(path)
-                        },
-                        text=full_text
-                    )
-                    if record:
-                        self.records.append(record)
-
-                except Exception as e:
-                    logger.warning(f"Failed to process PDF {file}: {e}")
-
+            return [(path, _parse_pdf, (path, self.config.pdf))
+                    for path in self._list_files(self.config.pdf_dir, ".pdf")]
         except Exception as e:
             logger.error(f"Critical error in PDF ingestion: {e}")
+            return []
 
-    # ---------- CSV INGESTION ----------
-    def ingest_csvs(self):
-        logger.info("Starting CSV Ingestion...")
+    def _csv_units(self):
         try:
-            if not os.path.exists(self.config.csv_dir):
-                return
-
-            files = [f for f in os.listdir(self.config.csv_dir) if f.endswith(".csv")]
-
-            for file in files:
-                path = os.path.join(self.config.csv_dir, file)
-                try:
-                    for chunk in pd.read_csv(path, chunksize=1000):
-                        columns = list(chunk.columns)
-                        for row in chunk.values:
-                            text = self._row_to_text(row, columns)
-                            record = self._create_record(
-                                source_type="csv",
-                                source_name=file,
-                                metadata={
-                                    "columns": columns,
-                                    "file_path": os.path.abspath(path)
-                                },
-                                text=text
-                            )
-                            if record:
-                                self.records.append(record)
-
-                except Exception as e:
-                    logger.warning(f"Failed to process CSV {file}: {e}")
-
+            return [(path, _parse_csv, (path,))
+                    for path in self._list_files(self.config.csv_dir, ".csv")]
         except Exception as e:
             logger.error(f"Critical error in CSV ingestion: {e}")
+            return []
 
-    # ---------- DATABASE INGESTION ----------
-    def ingest_db(self):
-        logger.info("Starting Database Ingestion...")
+    def _db_units(self):
         if not os.path.exists(self.config.db_path):
-            return
+            return []
 
-        conn = None
         try:
-            conn = sqlite3.connect(self.config.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-
-            for (table_name,) in tables:
-                try:
-                    for chunk in pd.read_sql_query(
-                        f"SELECT * FROM {table_name}", conn, chunksize=1000
-                    ):
-                        columns = list(chunk.columns)
-                        for row in chunk.values:
-                            text = self._row_to_text(row, columns)
-                            record = self._create_record(
-                                source_type="database",
-                                source_name=table_name,
-                                metadata={
-                                    "columns": columns,
-                                    "db_path": os.path.abspath(self.config.db_path)
-                                },
-                                text=text
-                            )
-                            if record:
-                                self.records.append(record)
-
-                except Exception as e:
-                    logger.warning(f"Failed to ingest table {table_name}: {e}")
+            with SQLiteTableReader(self.config.db_path, self.config.database) as reader:
+                return [(f"{self.config.db_path}::{table_name}",
+                         _parse_table, (self.config.db_path, table_name, self.config.database))
+                        for table_name in reader.tables()]
 
         except Exception as e:
             logger.error(f"Database connection error: {e}")
-        finally:
-            if conn:
-                conn.close()
+            return []
+
+    def _ingest_units(self, units):
+        """
+        Runs work units and appends their records in unit order.
+        With num_workers > 1 the units are spread over a process pool
+        (PDF extraction is CPU-bound); each worker spools its unit to a
+        shard file and executor.map hands the shards back in input order,
+        so ids and ordering match a serial run.
+        """
+        workers = min(self.config.num_workers, len(units))
+
+        if workers > 1:
+            os.makedirs(self.config.root_dir, exist_ok=True)
+            with tempfile.TemporaryDirectory(prefix="spool-", dir=self.config.root_dir) as spool, \
+                    ProcessPoolExecutor(max_workers=workers) as executor:
+                shards = [os.path.join(spool, f"{i:06d}.jsonl") for i in range(len(units))]
+                for unit, shard in zip(units, executor.map(_run_unit, units, shards)):
+                    self._append_payloads(_read_shard(shard), unit)
+                    os.remove(shard)
+        else:
+            for unit in units:
+                _, parser, args = unit
+                self._append_payloads(parser(*args), unit)
+
+    def _append_payloads(self, payloads, unit):
+        for record in self._make_records(payloads):
+            self.write_record(record)
+            self.record_count += 1
 
-    # ---------- MAIN PIPELINE ----------
-    def ingest(self):
-        try:
-            logger.info(f">>> Ingestion Started at {datetime.now()}")
+    # ---------- EMAIL INGESTION ----------
+    def ingest_emails(self):
+        logger.info("Starting Email Ingestion...")
+        self._ingest_units(self._email_units())
+
+    # ---------- PDF INGESTION ----------
+    def ingest_pdfs(self):
+        logger.info("Starting PDF Ingestion...")
+        self._ingest_units(self._pdf_units())
 
+    # ---------- CSV INGESTION ----------
+    def ingest_csvs(self):
+        logger.info("Starting CSV Ingestion...")
+        self._ingest_units(self._csv_units())
+
+    # ---------- DATABASE INGESTION ----------
+    def ingest_db(self):
+        logger.info("Starting Database Ingestion...")
+        self._ingest_units(self._db_units())
+
+    # ---------- MAIN PIPELINE ----------
+    def _ingest_sources(self):
+        if self.config.num_workers > 1:
+            # All sources share one pool so small email files and large
+            # PDFs are balanced across the same workers.
+            logger.info(f"Parallel ingestion with {self.config.num_workers} workers")
+            self._ingest_units(
+                self._email_units() + self._pdf_units()
+                + self._csv_units() + self._db_units()
+            )
+        else:
             self.ingest_emails()
             self.ingest_pdfs()
             self.ingest_csvs()
             self.ingest_db()
 
-            # ✅ SAFE JSON WRITE (THIS FIXES YOUR ERROR)
-            os.makedirs(os.path.dirname(self.config.output_json), exist_ok=True)
-            with open(self.config.output_json, "w", encoding="utf-8") as f:
-                json.dump(self.records, f, indent=2, ensure_ascii=False)
+    def ingest(self):
+        try:
+            logger.info(f">>> Ingestion Started at {datetime.now()}")
+
+            with record_writer(self.config.output_json) as write:
+                self.write_record = write
+                self._ingest_sources()
+            self._save_tables()
 
             logger.info(
-                f"<<< Ingestion Completed. Total Records: {len(self.records)}"
+                f"<<< Ingestion Completed. Total Records: {self.record_count}"
             )
 
         except Exception as e:
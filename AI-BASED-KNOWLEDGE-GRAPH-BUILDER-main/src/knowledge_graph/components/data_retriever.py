@@ -1,73 +1,124 @@
 import sys
+import asyncio
 from langchain_core.retrievers import BaseRetriever
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import (CallbackManagerForRetrieverRun,
+                                      AsyncCallbackManagerForRetrieverRun)
 from langchain_core.documents import Document
+from src.knowledge_graph.components.graph_schema import ENTITY_LOOKUP_QUERY, fulltext_query
+from src.knowledge_graph.components.search_filter import SearchFilter
 from src.knowledge_graph.exception.exception import KGException
 from src.knowledge_graph.logger.logging import logger
-from typing import List, Any
+from typing import List, Any, ClassVar, Optional
 from dotenv import load_dotenv
 load_dotenv()
 class HybridRetriever(BaseRetriever):
     """
     Same Retriever logic as before (Vectors + Graph)
+    Models and indexes come from a RAGResources handle and are loaded
+    on first use.
     """
-    vector_index: Any
-    vector_metadata: List[dict]
-    embedder: Any
-    graph: Any
-    nlp: Any
+    resources: Any
     top_k_vector: int = 5
     top_k_graph: int = 5
+    # Restrict vector hits by source type/name and date, inside the search
+    search_filter: Optional[SearchFilter] = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         logger.info("Initializing HybridRetriever")
 
+    # Exact name through the name_lower index, then fuzzy full-text matches
+    GRAPH_QUERY: ClassVar[str] = ENTITY_LOOKUP_QUERY
+
+    def _graph_params(self, entity):
+        """Lookup parameters for an entity mention; None when nothing in it is searchable."""
+        search = fulltext_query(entity)
+        if search is None:
+            return None
+        return {"name_lower": entity.strip().lower(), "search": search, "limit": self.top_k_graph}
+
+    @staticmethod
+    def _vector_docs(chunks):
+        docs = []
+        for meta in chunks:
+            content = f"[Source: {meta.get('source_name', 'Unknown')}] {meta.get('text', '')}"
+            docs.append(Document(
+                page_content=content,
+                metadata={"type": "vector", "source": meta.get('source_name'),
+                          "score": meta.get('score')}
+            ))
+        return docs
+
+    @staticmethod
+    def _graph_doc(entity, record):
+        fact = f"{record['n.name']} --[{record['rel']}]--> {record['m.name']}"
+        return Document(page_content=fact, metadata={"type": "graph", "entity": entity})
+
     def _get_relevant_documents(
         self, query: str, *, run_manager: CallbackManagerForRetrieverRun
     ) -> List[Document]:
         logger.info("Initializing vector search")
         # 1. Vector Search
-        query_vector = self.embedder.encode([query])
-        _, indices = self.vector_index.search(query_vector, self.top_k_vector)
-        
-        docs = []
-        for idx in indices[0]:
-            if idx < len(self.vector_metadata):
-                meta = self.vector_metadata[idx]
-                content = f"[Source: {meta.get('source_name', 'Unknown')}] {meta.get('text', '')}"
-                docs.append(Document(
-                    page_content=content,
-                    metadata={"type": "vector", "source": meta.get('source_name')}
-                ))
+        chunks = self.resources.retrieval.search(query, self.top_k_vector, self.search_filter)
+        docs = self._vector_docs(chunks)
         logger.info("Vector search completed, proceeding to graph search")
         # 2. Graph Search (Fixed for neo4j.Driver)
-        spacy_doc = self.nlp(query)
+        spacy_doc = self.resources.nlp(query)
         entities = [ent.text for ent in spacy_doc.ents]
         logger.info("Opening Graph session for entity search")
         if entities:
             # Open a session properly using the driver
             try:
-                with self.graph.session() as session:
+                with self.resources.graph.session() as session:
                     for entity in entities:
-                        # Fuzzy match entity names
-                        cypher = """
-                        MATCH (n:Entity)-[r]-(m:Entity)
-                        WHERE toLower(n.name) CONTAINS toLower($name)
-                        RETURN n.name, type(r) AS rel, m.name
-                        LIMIT $limit
-                        """
+                        params = self._graph_params(entity)
+                        if params is None:
+                            continue
                         # Use session.run with parameters (safer than f-strings)
-                        result = session.run(cypher, name=entity, limit=self.top_k_graph)
-                        
-                        for record in result:
-                            fact = f"{record['n.name']} --[{record['rel']}]--> {record['m.name']}"
-                            docs.append(Document(
-                                page_content=fact,
-                                metadata={"type": "graph", "entity": entity}
-                            ))
+                        result = session.run(self.GRAPH_QUERY, **params)
+                        docs.extend(self._graph_doc(entity, record) for record in result)
                 logger.info("Graph search completed")
             except Exception as e:
                 raise KGException(e,sys)
         
         return docs
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        """
+        Non-blocking variant used by ainvoke(): encode/search and entity
+        extraction run on the retrieval thread pool concurrently, and each
+        entity is looked up in its own async Neo4j session. The encoder,
+        index and spaCy model are loaded off the event loop on first use.
+        """
+        retrieval, nlp = await asyncio.gather(
+            self.resources.aget("retrieval"), self.resources.aget("nlp")
+        )
+        chunks, spacy_doc = await asyncio.gather(
+            retrieval.asearch(query, self.top_k_vector, self.search_filter),
+            retrieval.run_blocking(nlp, query),
+        )
+        docs = self._vector_docs(chunks)
+
+        entities = [ent.text for ent in spacy_doc.ents]
+        if entities:
+            try:
+                driver = self.resources.async_graph
+                facts = await asyncio.gather(
+                    *(self._agraph_lookup(driver, entity) for entity in entities)
+                )
+            except Exception as e:
+                raise KGException(e,sys)
+            for found in facts:
+                docs.extend(found)
+
+        return docs
+
+    async def _agraph_lookup(self, driver, entity):
+        params = self._graph_params(entity)
+        if params is None:
+            return []
+        async with driver.session() as session:
+            result = await session.run(self.GRAPH_QUERY, **params)
+            return [self._graph_doc(entity, record) async for record in result]
@@ -1,19 +1,148 @@
-import spacy
+import os
 import re
+import uuid
+import hashlib
 import itertools
-from neo4j import GraphDatabase
-from pathlib import Path
 
-from src.knowledge_graph.utils.common import read_json, write_json, read_yaml
+from src.knowledge_graph.utils.common import iter_records, read_json, write_json
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.components.graph_loader import GraphLoader
+from src.knowledge_graph.components.nlp_engine import NLPEngine
+from src.knowledge_graph.components.schema_extractor import SchemaExtractor
 from src.knowledge_graph.logger.logging import logger
 
+spacy = lazy_import("spacy")
+neo4j = lazy_import("neo4j")
+
+_PARSE_INDEX = "index.json"
+
+
+class DocParseCache:
+    """
+    spaCy parses of input documents, kept under the directory path as
+    DocBin shards of shard_size documents plus an index.json of the parse
+    keys in each shard, so reruns and later stages reuse them instead of
+    running the pipeline again.
+
+    A parse is keyed by the engine's model, version and enabled components
+    plus the document text: changed documents, or a different pipeline,
+    are parsed afresh. Only parse keys are held for the whole corpus:
+    cached parses are read one shard at a time (a rerun reads them in
+    order), uncached documents go to the engine max_pending at a time, and
+    this run's parses are written out shard by shard. save() swaps in the
+    new index and then deletes the shards of earlier runs.
+    """
+
+    def __init__(self, path, engine, shard_size=1000, max_pending=None):
+        self.path = path
+        self.engine = engine
+        self.shard_size = shard_size
+        # Each flush is one nlp.pipe call, so it also spans n_process workers
+        self.max_pending = max_pending or engine.batch_size * max(engine.n_process, 1) * 16
+        self.reused = self.parsed = 0
+
+        # key -> shard file, from the previous run
+        self._index = {}
+        if path and os.path.exists(os.path.join(path, _PARSE_INDEX)):
+            for shard, keys in read_json(os.path.join(path, _PARSE_INDEX))["shards"].items():
+                self._index.update(dict.fromkeys(keys, shard))
+            logger.info(f"{len(self._index)} cached parses in {path}")
+        self._loaded_shard, self._loaded_docs = None, {}
+
+        # This run's shards: file -> keys, and the shard being filled
+        self._run = uuid.uuid4().hex[:8]
+        self._shards = {}
+        self._written = set()
+        self._docbin, self._docbin_keys = None, []
+
+    def parse(self, records):
+        """
+        Yields (record, spaCy Doc) in input order. Only documents without
+        a cached parse go through the NLP engine, in batches.
+        """
+        # From the first uncached document on: (record, key, cached Doc or None)
+        pending = []
+        for record in records:
+            key = hashlib.sha256(f"{self.engine.signature}\0{record['text']}".encode("utf-8")).hexdigest()
+            spacy_doc = self._lookup(key)
+            if spacy_doc is not None and not pending:
+                yield self._emit(record, key, spacy_doc)
+                continue
+            pending.append((record, key, spacy_doc))
+            if len(pending) >= self.max_pending:
+                yield from self._flush(pending)
+        yield from self._flush(pending)
+
+    def _flush(self, pending):
+        """Parses the uncached documents of pending in one engine batch; emits all of pending in order."""
+        texts = [(record["text"], None) for record, _, spacy_doc in pending if spacy_doc is None]
+        parsed = self.engine.pipe(texts)
+        for record, key, spacy_doc in pending:
+            if spacy_doc is None:
+                spacy_doc, _ = next(parsed)
+                self.parsed += 1
+            yield self._emit(record, key, spacy_doc)
+        pending.clear()
+
+    def _lookup(self, key):
+        shard = self._index.get(key)
+        if shard is None:
+            return None
+        if shard != self._loaded_shard:
+            docbin = spacy.tokens.DocBin().from_disk(os.path.join(self.path, shard))
+            self._loaded_docs = {d.user_data.get("parse_key"): d for d in docbin.get_docs(self.engine.nlp.vocab)}
+            self._loaded_shard = shard
+        return self._loaded_docs.get(key)
+
+    def _emit(self, record, key, spacy_doc):
+        if spacy_doc.user_data.get("parse_key") == key:
+            self.reused += 1
+        spacy_doc.user_data["parse_key"] = key
+        spacy_doc.user_data["doc_id"] = record.get("id")
+        if self.path and key not in self._written:
+            self._written.add(key)
+            if self._docbin is None:
+                self._docbin = spacy.tokens.DocBin(store_user_data=True)
+            # DocBin.add serializes the Doc right away; nothing keeps it alive
+            self._docbin.add(spacy_doc)
+            self._docbin_keys.append(key)
+            if len(self._docbin_keys) >= self.shard_size:
+                self._write_shard()
+        return record, spacy_doc
+
+    def _write_shard(self):
+        if not self._docbin_keys:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        shard = f"{self._run}-{len(self._shards):05d}.spacy"
+        self._docbin.to_disk(os.path.join(self.path, shard))
+        self._shards[shard] = self._docbin_keys
+        self._docbin, self._docbin_keys = None, []
+
+    def save(self):
+        if not self.path:
+            return
+        self._write_shard()
+        index = os.path.join(self.path, _PARSE_INDEX)
+        write_json(f"{index}.tmp", {"signature": self.engine.signature, "shards": self._shards})
+        os.replace(f"{index}.tmp", index)
+        # Shards of earlier (or interrupted) runs are no longer indexed
+        for name in os.listdir(self.path):
+            if name.endswith(".spacy") and name not in self._shards:
+                os.remove(os.path.join(self.path, name))
+        logger.info(f"Saved {len(self._written)} parses to {self.path} in {len(self._shards)} shards")
+
+    def stats(self):
+        return f"parsed: {self.parsed}, reused: {self.reused}"
+
 
 class DataTransformation:
 
     def __init__(self, config):
         self.config = config
-        self.docs = read_json(config.input_json)
-        self.nlp = spacy.load("en_core_web_sm")
+        nlp = self.config.nlp
+        self.engine = NLPEngine(nlp.model, batch_size=nlp.batch_size, n_process=nlp.n_process,
+                                max_length=nlp.max_length)
 
         self.entities = []
         self.relationships = []
@@ -28,79 +157,109 @@ class DataTransformation:
         clean = clean.strip().replace(" ", "_").upper()
         return clean if clean else "RELATED_TO"
 
-    # ---------- 1. ENTITY EXTRACTION ----------
-    def extract_entities(self):
-        logger.info("1. Extracting Entities...")
-
-        for doc in self.docs:
-            spacy_doc = self.nlp(doc["text"])
-
-            for ent in spacy_doc.ents:
-                key = f"{self.clean_text(ent.text)}_{ent.label_}"
-
-                if key not in self.entity_map:
-                    entity = {
-                        "id": key,
-                        "name": ent.text.strip(),
-                        "label": ent.label_,
-                        "doc_id": doc.get("id")
-                    }
-                    self.entity_map[key] = entity
-                    self.entities.append(entity)
-
-        write_json(self.config.entities_output, self.entities)
-        logger.info(f"Extracted {len(self.entities)} unique entities.")
-
-    # ---------- 2. RELATIONSHIP EXTRACTION ----------
-    def extract_relationships(self):
-        logger.info("2. Extracting Relationships...")
+    # ---------- 1-2. ENTITY AND RELATIONSHIP EXTRACTION ----------
+    def extract(self):
+        """
+        Parses every free-text document once and takes both its entities
+        and its sentence-level relationships from that one spaCy Doc.
+        CSV/database rows of tables mapped in schema.yaml skip spaCy: the
+        SchemaExtractor reads them from their columns.
+        """
+        logger.info("1-2. Extracting Entities and Relationships...")
         seen = set()
+        parses = DocParseCache(self.config.parsed_output, self.engine)
+        schema = SchemaExtractor(self.config.schema_path, self.config.tables_json)
 
-        for doc in self.docs:
-            spacy_doc = self.nlp(doc["text"])
-
-            for sent in spacy_doc.sents:
-                sent_entities = []
-
-                for ent in sent.ents:
-                    key = f"{self.clean_text(ent.text)}_{ent.label_}"
-                    if key in self.entity_map:
-                        sent_entities.append(self.entity_map[key])
-
-                if len(sent_entities) < 2:
+        def free_text():
+            for doc in iter_records(self.config.input_json):
+                if not schema.handles(doc):
+                    yield doc
                     continue
+                batch = schema.add(doc)
+                if batch:
+                    self._add_structured(*batch, seen)
+
+        for doc, spacy_doc in parses.parse(free_text()):
+            # A sentence's entities are always in the map by now: they are
+            # entities of this document
+            self._add_entities(doc, spacy_doc)
+            self._add_relationships(doc, spacy_doc, seen)
+        for batch in schema.flush():
+            self._add_structured(*batch, seen)
+
+        parses.save()
+        write_json(self.config.entities_output, self.entities)
+        write_json(self.config.relationships_output, self.relationships)
+        logger.info(f"Extracted {len(self.entities)} unique entities and "
+                    f"{len(self.relationships)} relationships ({parses.stats()}, "
+                    f"schema rows: {schema.rows})")
+
+    def _add_structured(self, entities, relationships, seen):
+        """Merges one SchemaExtractor batch (already unique within the batch)."""
+        for entity in entities:
+            if entity["id"] not in self.entity_map:
+                self.entity_map[entity["id"]] = entity
+                self.entities.append(entity)
+
+        for rel in relationships:
+            if rel["relation_id"] not in seen:
+                seen.add(rel["relation_id"])
+                self.relationships.append(rel)
+
+    def _add_entities(self, doc, spacy_doc):
+        for ent in spacy_doc.ents:
+            key = f"{self.clean_text(ent.text)}_{ent.label_}"
+
+            if key not in self.entity_map:
+                entity = {
+                    "id": key,
+                    "name": ent.text.strip(),
+                    "label": ent.label_,
+                    "doc_id": doc.get("id")
+                }
+                self.entity_map[key] = entity
+                self.entities.append(entity)
+
+    def _add_relationships(self, doc, spacy_doc, seen):
+        for sent in spacy_doc.sents:
+            sent_entities = []
+
+            for ent in sent.ents:
+                key = f"{self.clean_text(ent.text)}_{ent.label_}"
+                if key in self.entity_map:
+                    sent_entities.append(self.entity_map[key])
 
-                root_verb = "RELATED_TO"
-                for token in sent:
-                    if token.pos_ == "VERB":
-                        root_verb = token.lemma_
-                        break
+            if len(sent_entities) < 2:
+                continue
 
-                relation = self.clean_relation(root_verb)
+            root_verb = "RELATED_TO"
+            for token in sent:
+                if token.pos_ == "VERB":
+                    root_verb = token.lemma_
+                    break
 
-                for src, tgt in itertools.combinations(sent_entities, 2):
-                    if src["id"] == tgt["id"]:
-                        continue
+            relation = self.clean_relation(root_verb)
 
-                    sig = f"{src['id']}|{relation}|{tgt['id']}"
-                    if sig in seen:
-                        continue
+            for src, tgt in itertools.combinations(sent_entities, 2):
+                if src["id"] == tgt["id"]:
+                    continue
 
-                    seen.add(sig)
+                sig = f"{src['id']}|{relation}|{tgt['id']}"
+                if sig in seen:
+                    continue
 
-                    self.relationships.append({
-                        "relation_id": sig,
-                        "subject_id": src["id"],
-                        "subject_name": src["name"],
-                        "relation": relation,
-                        "object_id": tgt["id"],
-                        "object_name": tgt["name"],
-                        "sentence": sent.text.strip(),
-                        "doc_id": doc.get("id")
-                    })
+                seen.add(sig)
 
-        write_json(self.config.relationships_output, self.relationships)
-        logger.info(f"Extracted {len(self.relationships)} relationships.")
+                self.relationships.append({
+                    "relation_id": sig,
+                    "subject_id": src["id"],
+                    "subject_name": src["name"],
+                    "relation": relation,
+                    "object_id": tgt["id"],
+                    "object_name": tgt["name"],
+                    "sentence": sent.text.strip(),
+                    "doc_id": doc.get("id")
+                })
 
     # ---------- 3. TRIPLE CREATION ----------
     def create_triples(self):
@@ -122,40 +281,17 @@ class DataTransformation:
     def build_graph(self):
         logger.info("4. Building Graph in Neo4j...")
 
-        cfg = read_yaml(Path("config/config.yaml"))
-        neo4j_cfg = cfg["transform_data"]["neo4j"]
-
-        uri = neo4j_cfg["uri"]
-        username = neo4j_cfg["username"]
-        password = neo4j_cfg["password"]
-
-        driver = GraphDatabase.driver(uri, auth=(username, password))
-
-        with driver.session(database="rag-kg-db") as session:
-            for ent in self.entities:
-                session.run(
-                    """
-                    MERGE (e:Entity {id: $id})
-                    SET e.name = $name, e.type = $type
-                    """,
-                    id=ent["id"],
-                    name=ent["name"],
-                    type=ent["label"]
-                )
-
-            for t in self.triples:
-                session.run(
-                    """
-                    MATCH (h:Entity {id: $hid})
-                    MATCH (t:Entity {id: $tid})
-                    MERGE (h)-[:RELATION {type: $rel}]->(t)
-                    """,
-                    hid=t["head_id"],
-                    tid=t["tail_id"],
-                    rel=t["relation"]
-                )
-
-        driver.close()
+        driver = neo4j.GraphDatabase.driver(
+            self.config.neo4j_uri, auth=(self.config.neo4j_username, self.config.neo4j_password)
+        )
+        try:
+            cfg = self.config.graph_loader
+            loader = GraphLoader(driver, self.config.neo4j_database, batch_size=cfg.batch_size,
+                                 workers=cfg.workers, max_retries=cfg.max_retries,
+                                 retry_backoff_s=cfg.retry_backoff_s)
+            loader.ensure_schema()
+            loader.load_entities(self.entities)
+            loader.load_triples(self.triples)
+        finally:
+            driver.close()
         logger.info("Graph Construction Completed Successfully.")
-
-        
@@ -0,0 +1,147 @@
+import os
+import time
+import sqlite3
+from urllib.parse import quote
+
+import pandas as pd
+
+from src.knowledge_graph.logger.logging import logger
+
+
+def _quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SQLiteTableReader:
+    """
+    Bounded-memory reader for SQLite exports.
+
+    - Opens the database read-only (mode=ro), with normal locking so a
+      concurrent writer is safe. immutable=1 (opt-in) also skips locking
+      and change detection; use it only for snapshots nothing writes to.
+    - Pages through each table by rowid (or its single-column primary key
+      for WITHOUT ROWID tables) with keyset pagination, and streams every
+      page from the cursor with fetchmany, one frame at a time.
+    - Honors per-table column projection and WHERE filters from config.
+    """
+
+    def __init__(self, db_path, config):
+        self.db_path = db_path
+        self.config = config
+        self.conn = None
+
+    def connect(self):
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        if self.config.immutable:
+            uri += "&immutable=1"
+        self.conn = sqlite3.connect(uri, uri=True)
+        return self
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- SCHEMA ----------
+    def tables(self):
+        """Tables to ingest: the configured selection, or every user table."""
+        cursor = self.conn.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        )
+        available = [name for (name,) in cursor.fetchall()]
+        if not self.config.tables:
+            return available
+
+        missing = [t for t in self.config.tables if t not in available]
+        if missing:
+            logger.warning(f"Configured tables not found in {self.db_path}: {missing}")
+        return [t for t in self.config.tables if t in available]
+
+    def _table_settings(self, table_name):
+        return (self.config.tables or {}).get(table_name) or {}
+
+    def columns(self, table_name):
+        info = self.conn.execute(f"PRAGMA table_info({_quote_ident(table_name)})").fetchall()
+        available = [c[1] for c in info]
+
+        selected = self._table_settings(table_name).get("columns")
+        if not selected:
+            return available
+
+        unknown = [c for c in selected if c not in available]
+        if unknown:
+            raise ValueError(f"Unknown columns for table {table_name}: {unknown}")
+        return list(selected)
+
+    def key_column(self, table_name):
+        """rowid when the table has one, else its single-column primary key."""
+        try:
+            self.conn.execute(f"SELECT rowid FROM {_quote_ident(table_name)} LIMIT 1")
+            return "rowid"
+        except sqlite3.OperationalError:
+            pass
+
+        info = self.conn.execute(f"PRAGMA table_info({_quote_ident(table_name)})").fetchall()
+        pk = [c[1] for c in info if c[5]]
+        if len(pk) != 1:
+            raise ValueError(f"Table {table_name} has no rowid or single-column primary key")
+        return _quote_ident(pk[0])
+
+    # ---------- ROWS ----------
+    def iter_rows(self, table_name, after_key=None):
+        """
+        Yields (keys, columns, rows) batches of at most fetch_size rows, in
+        key order, starting after after_key.
+        """
+        columns = self.columns(table_name)
+        key = self.key_column(table_name)
+        where = self._table_settings(table_name).get("where")
+
+        select = f"SELECT {key}, " + ", ".join(_quote_ident(c) for c in columns)
+        source = f" FROM {_quote_ident(table_name)}"
+
+        last_key = after_key
+        while True:
+            conditions, params = [f"({where})"] if where else [], []
+            if last_key is not None:
+                conditions.insert(0, f"{key} > ?")
+                params.append(last_key)
+
+            query = select + source
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += f" ORDER BY {key} LIMIT ?"
+            cursor = self.conn.execute(query, (*params, self.config.page_size))
+
+            fetched = 0
+            while True:
+                rows = cursor.fetchmany(self.config.fetch_size)
+                if not rows:
+                    break
+                fetched += len(rows)
+                last_key = rows[-1][0]
+                yield [r[0] for r in rows], columns, [r[1:] for r in rows]
+
+            if fetched < self.config.page_size:
+                return
+
+    def iter_frames(self, table_name, after_key=None):
+        """Frames indexed by row key; logs rows per second for the table."""
+        start, count = time.perf_counter(), 0
+
+        for keys, columns, rows in self.iter_rows(table_name, after_key):
+            count += len(rows)
+            yield pd.DataFrame.from_records(rows, columns=columns, index=keys)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Table {table_name}: {count} rows in {elapsed:.2f}s "
+            f"({count / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from src.knowledge_graph.logger.logging import logger
+
+
+class EmbeddingCache:
+    """
+    Persistent chunk-embedding cache keyed on (model name, normalization
+    flag, chunk text hash).
+
+    Layout of cache_dir/<model key>/:
+    - vectors.bin: memory-mapped (capacity, dim) matrix of float32/float16
+    - index.npz:   16-byte blake2b keys, their matrix slots and last-use ticks
+    - meta.json:   model, normalize, dim, dtype and the current tick
+
+    encode() looks every text up, sends only the misses to the encoder and
+    stores them. When more than max_entries vectors would be held, the
+    least recently used ones are evicted. New vectors only ever go to slots
+    the saved index.npz does not point at: evicted slots are reused after
+    save() has replaced index.npz (atomically), and until then the matrix
+    may grow up to max_entries / 8 past max_entries. When no such slot is
+    left, the cache saves itself. An interrupted run therefore leaves the
+    previous, consistent cache behind.
+    """
+
+    def __init__(self, cache_dir, model_name, normalize, max_entries=1_000_000, dtype="float32"):
+        self.model_name = model_name
+        self.normalize = bool(normalize)
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+
+        model_key = hashlib.blake2b(
+            f"{model_name}\0{self.normalize}\0{self.dtype.name}".encode(), digest_size=8
+        ).hexdigest()
+        self.root = os.path.join(cache_dir, model_key)
+        self.vectors_path = os.path.join(self.root, "vectors.bin")
+        self.index_path = os.path.join(self.root, "index.npz")
+        self.meta_path = os.path.join(self.root, "meta.json")
+
+        self.dim = None
+        self.capacity = 0
+        self.vectors = None
+        self.slots = {}            # key -> slot
+        self.last_used = np.zeros(0, dtype=np.int64)
+        self.free = []             # slots the saved index does not use
+        self.released = []         # evicted slots the saved index may still use
+        self.slack = max(max_entries // 8, 1)
+        self.tick = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    # ---------- STORAGE ----------
+    def _load(self):
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.index_path)):
+            return
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name or meta.get("normalize") != self.normalize:
+            logger.warning(f"Embedding cache at {self.root} belongs to another model, ignoring it")
+            return
+
+        self.dim = meta["dim"]
+        self.tick = meta["tick"]
+        self.capacity = os.path.getsize(self.vectors_path) // (self.dim * self.dtype.itemsize)
+        self.vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+",
+                                 shape=(self.capacity, self.dim))
+
+        with np.load(self.index_path) as index:
+            keys, slots, last_used = index["keys"], index["slots"], index["last_used"]
+        self.slots = {k.tobytes(): int(s) for k, s in zip(keys, slots)}
+        self.last_used = np.zeros(self.capacity, dtype=np.int64)
+        self.last_used[slots] = last_used
+        used = np.zeros(self.capacity, dtype=bool)
+        used[slots] = True
+        self.free = np.flatnonzero(~used)[::-1].tolist()
+
+        logger.info(f"Embedding cache loaded: {len(self.slots)} vectors from {self.root}")
+
+    def _grow(self, needed):
+        """Extends the matrix file so at least needed more slots are free."""
+        new_capacity = max(self.capacity * 2, self.capacity + needed, 1024)
+        new_capacity = min(new_capacity, self.max_entries + self.slack)
+        if new_capacity <= self.capacity:
+            return
+
+        os.makedirs(self.root, exist_ok=True)
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * self.dtype.itemsize)
+
+        self.vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+",
+                                 shape=(new_capacity, self.dim))
+        self.last_used = np.concatenate(
+            [self.last_used, np.zeros(new_capacity - self.capacity, dtype=np.int64)]
+        )
+        self.free.extend(range(new_capacity - 1, self.capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def _evict(self, needed):
+        """Releases needed slots, least recently used first; they are reusable after save()."""
+        slot_to_key = {s: k for k, s in self.slots.items()}
+        occupied = np.fromiter(slot_to_key, dtype=np.int64)
+        oldest = occupied[np.argsort(self.last_used[occupied], kind="stable")[:needed]]
+        for slot in oldest.tolist():
+            del self.slots[slot_to_key[slot]]
+            self.released.append(slot)
+        self.evictions += len(oldest)
+
+    def save(self):
+        if self.vectors is None:
+            return
+        self.vectors.flush()
+
+        keys = np.frombuffer(b"".join(self.slots), dtype=np.uint8).reshape(-1, 16)
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=keys, slots=slots, last_used=self.last_used[slots])
+        os.replace(tmp_path, self.index_path)
+        # The saved index no longer points at evicted slots
+        self.free.extend(self.released)
+        self.released = []
+
+        with open(self.meta_path, "w") as f:
+            json.dump({"model": self.model_name, "normalize": self.normalize,
+                       "dim": self.dim, "dtype": self.dtype.name, "tick": self.tick}, f)
+
+    # ---------- LOOKUP ----------
+    def key(self, text):
+        return hashlib.blake2b(
+            f"{self.model_name}\0{self.normalize}\0{text}".encode(), digest_size=16
+        ).digest()
+
+    def _put(self, keys, vectors):
+        keys, vectors = keys[-self.max_entries:], vectors[-self.max_entries:]
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        overflow = len(self.slots) + len(keys) - self.max_entries
+        if overflow > 0:
+            self._evict(overflow)
+        if len(self.free) < len(keys):
+            self._grow(len(keys) - len(self.free))
+        if len(self.free) < len(keys):
+            self.save()
+
+        for key, vector in zip(keys, vectors):
+            slot = self.free.pop()
+            self.vectors[slot] = vector
+            self.last_used[slot] = self.tick
+            self.slots[key] = slot
+
+    def encode(self, texts, encode_fn):
+        """
+        Embeddings for texts as a float32 matrix. encode_fn(list_of_texts)
+        is called once, with the distinct texts that are not cached.
+        """
+        self.tick += 1
+        keys = [self.key(t) for t in texts]
+
+        rows = np.fromiter((self.slots.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+        hit = rows >= 0
+        self.hits += int(hit.sum())
+        self.misses += int((~hit).sum())
+        if hit.any():
+            self.last_used[rows[hit]] = self.tick
+
+        missing = {}
+        for i in np.flatnonzero(~hit).tolist():
+            missing.setdefault(keys[i], i)
+
+        fresh = None
+        if missing:
+            fresh = np.asarray(encode_fn([texts[i] for i in missing.values()]), dtype=np.float32)
+
+        dim = fresh.shape[1] if fresh is not None else self.dim
+        out = np.empty((len(texts), dim or 0), dtype=np.float32)
+        if hit.any():
+            out[hit] = self.vectors[rows[hit]]
+        if missing:
+            position = {k: n for n, k in enumerate(missing)}
+            for i in np.flatnonzero(~hit).tolist():
+                out[i] = fresh[position[keys[i]]]
+            self._put(list(missing), fresh)
+        return out
+
+    # ---------- STATS ----------
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self.slots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "evictions": self.evictions,
+        }
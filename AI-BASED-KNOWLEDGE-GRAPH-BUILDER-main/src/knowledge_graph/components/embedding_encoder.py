@@ -0,0 +1,165 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.components.embedding_cache import EmbeddingCache
+from src.knowledge_graph.logger.logging import logger
+
+sentence_transformers = lazy_import("sentence_transformers")
+
+
+def load_cpu_model(model_name):
+    return sentence_transformers.SentenceTransformer(model_name, device="cpu")
+
+
+def pin_threads(threads):
+    """Caps the torch (and OpenMP/BLAS) threads of the calling process."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        # Stand-in models (benchmarks) run without torch
+        return
+    torch.set_num_threads(threads)
+
+
+def _encode(model, texts, batch_size, normalize):
+    return np.asarray(model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=normalize
+    ), dtype=np.float32)
+
+
+# ---------- WORKER PROCESSES ----------
+_worker_model = None
+
+
+def _init_worker(loader, model_name, threads):
+    global _worker_model
+    pin_threads(threads)
+    _worker_model = loader(model_name)
+
+
+def _encode_in_worker(texts, batch_size, normalize):
+    return _encode(_worker_model, texts, batch_size, normalize)
+
+
+class EmbeddingEncoder:
+    """
+    CPU-oriented sentence encoding.
+
+    Texts are ordered by token length before being cut into batch_size
+    batches, so each batch pads to about its own length instead of the
+    longest chunk that happens to share it. With workers > 0 the batches
+    are dealt round-robin to a pool of encoder processes, each holding a
+    copy of the model and pinned to threads_per_worker torch threads (by
+    default the cores split evenly), so processes do not oversubscribe
+    the CPU. Vectors are returned in input order.
+
+    embed() is what the embedding pipelines call: encode() behind the
+    EmbeddingCache, when one is given.
+    """
+
+    def __init__(self, model, model_name, normalize, workers=0, threads_per_worker=0, batch_size=32,
+                 loader=load_cpu_model, cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.normalize = normalize
+        self.workers = workers
+        self.batch_size = batch_size
+        self.loader = loader
+        self.cache = cache
+        self.threads = threads_per_worker or max(1, (os.cpu_count() or 1) // max(workers, 1))
+        self._executor = None
+
+        if workers == 0 and threads_per_worker:
+            pin_threads(self.threads)
+
+    @classmethod
+    def from_config(cls, model_name, normalize, config, cache_config=None):
+        """
+        Encoder for the pipeline_embedd settings: the model on its default
+        device (GPU when available), config's (EncoderConfig) encoder
+        processes only on CPU, and the embedding cache when cache_config
+        enables it.
+        """
+        model = sentence_transformers.SentenceTransformer(model_name)
+        device = str(getattr(model, "device", "cpu"))
+        logger.info(f"Embedding Model will run on: {device.upper()}")
+
+        cache = None
+        if cache_config is not None and cache_config.enabled:
+            cache = EmbeddingCache(cache_config.cache_dir, model_name, normalize=normalize,
+                                   max_entries=cache_config.max_entries, dtype=cache_config.dtype)
+        # A GPU is kept busy by one process
+        return cls(model, model_name, normalize,
+                   workers=config.workers if device == "cpu" else 0,
+                   threads_per_worker=config.threads_per_worker,
+                   batch_size=config.batch_size, cache=cache)
+
+    def embed(self, texts):
+        """Vectors for texts; with a cache, only the texts it does not hold are encoded."""
+        if self.cache is None:
+            return self.encode(texts)
+        return self.cache.encode(texts, self.encode)
+
+    def save_cache(self):
+        if self.cache is not None:
+            self.cache.save()
+            logger.info(f"Embedding cache: {self.cache.stats()}")
+
+    def token_lengths(self, texts):
+        """Token count per text (whitespace words when the model has no tokenizer)."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return np.fromiter((len(text.split()) for text in texts), dtype=np.int64, count=len(texts))
+        max_length = getattr(self.model, "max_seq_length", None)
+        encoded = tokenizer(texts, add_special_tokens=False, truncation=max_length is not None,
+                            max_length=max_length)
+        return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+    def encode(self, texts):
+        # Longest first, like SentenceTransformer.encode; stable for equal lengths
+        order = np.argsort(-self.token_lengths(texts), kind="stable")
+        if self.workers > 0:
+            return self._encode_parallel(texts, order)
+
+        vectors = _encode(self.model, [texts[i] for i in order], self.batch_size, self.normalize)
+        result = np.empty_like(vectors)
+        result[order] = vectors
+        return result
+
+    def _encode_parallel(self, texts, order):
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        # Round-robin: every worker gets a similar mix of long and short batches
+        tasks = [np.concatenate(batches[w::self.workers]) for w in range(min(self.workers, len(batches)))]
+        parts = self._pool().map(
+            _encode_in_worker, [[texts[i] for i in task] for task in tasks],
+            repeat(self.batch_size), repeat(self.normalize),
+        )
+
+        result = None
+        for task, vectors in zip(tasks, parts):
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[task] = vectors
+        return result
+
+    def _pool(self):
+        if self._executor is None:
+            logger.info(f"Starting {self.workers} encoder processes x {self.threads} threads ({self.model_name})")
+            # spawn: workers must not inherit the parent's torch thread pools
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.loader, self.model_name, self.threads),
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+
+from src.knowledge_graph.components.index_factory import build_index, requires_training, effective_metric
+from src.knowledge_graph.logger.logging import logger
+
+# Progress is logged at most this often while streaming
+_LOG_INTERVAL_S = 30.0
+
+
+def index_settings(model_name, dim, chunking, options, chunker, shard_by="none", num_shards=1):
+    """
+    What the stored vectors depend on; a change forces a full rebuild.
+    chunker names the splitting scheme ("words", "recursive_character"),
+    since the same chunk_size yields different chunks (and chunk ids) under
+    each.
+    """
+    return {
+        "model": model_name,
+        "dim": dim,
+        "chunker": chunker,
+        "chunk_size": chunking.chunk_size,
+        "chunk_overlap": chunking.chunk_overlap,
+        "index_type": options.index_type,
+        "metric": effective_metric(options),
+        "normalize": options.normalize,
+        "nlist": options.nlist,
+        "pq_m": options.pq_m,
+        "pq_bits": options.pq_bits,
+        "hnsw_m": options.hnsw_m,
+        "quantization": options.quantization,
+        "shard_by": shard_by,
+        "num_shards": num_shards,
+    }
+
+
+class EmbeddingEngine:
+    """
+    Streaming chunk -> embed -> index loop shared by the embedding pipelines.
+
+    add() queues one chunk (text plus its metadata record). Every
+    batch_size chunks the batch is encoded, added to the FAISS index and
+    its records appended to the generation's on-disk metadata before any
+    more input is read, so memory stays O(batch_size) on top of the index
+    itself. A new index that has to be trained (IVF, PQ, SQ8) first
+    collects up to train_sample vectors, is built from them and then
+    streams like any other.
+
+    replace(doc_id) marks a changed document of the previous generation:
+    its old chunks leave the index right before the batch holding its new
+    ones (they reuse the same chunk ids).
+    """
+
+    def __init__(self, writer, encode, options, index=None, previous=None, batch_size=1024):
+        self.writer = writer
+        self.encode = encode
+        self.options = options
+        self.index = index
+        # MetadataStore of the generation being updated, if any
+        self.previous = previous
+        self.batch_size = batch_size
+
+        self._texts, self._records = [], []
+        self._replaced = []
+        # Vectors and ids collected to train a new index
+        self._sample, self._sample_ids = [], []
+
+        self.chunks = 0
+        self.encode_seconds = 0.0
+        self.started = time.perf_counter()
+        self._logged = self.started
+
+    def add(self, text, record):
+        self._texts.append(text)
+        self._records.append(record)
+        if len(self._texts) >= self.batch_size:
+            self.flush()
+
+    def replace(self, doc_id):
+        self._replaced.append(doc_id)
+
+    def remove_documents(self, doc_ids):
+        """Drops every chunk of doc_ids (documents gone from the input) from the index."""
+        doc_ids = list(doc_ids)
+        if doc_ids and self.index is not None and self.previous is not None:
+            self.index.remove_ids(self.previous.doc_chunk_ids(doc_ids))
+
+    def flush(self):
+        """Encodes, indexes and stores the queued chunks."""
+        if not self._texts:
+            return
+        start = time.perf_counter()
+        vectors = np.asarray(self.encode(self._texts), dtype=np.float32)
+        self.encode_seconds += time.perf_counter() - start
+
+        ids = np.fromiter((r["chunk_id"] for r in self._records), dtype=np.int64, count=len(self._records))
+        self.writer.extend(self._records)
+        self._add(vectors, ids)
+
+        self.chunks += len(self._texts)
+        self._texts, self._records = [], []
+        if time.perf_counter() - self._logged >= _LOG_INTERVAL_S:
+            self._logged = time.perf_counter()
+            logger.info(f"Embedded {self.chunks} chunks ({self.chunks_per_second:.0f} chunks/s)")
+
+    def _add(self, vectors, ids):
+        if self.index is None:
+            if not self._sample and not requires_training(vectors.shape[1], self.options):
+                self.index = build_index(vectors, ids, self.options)
+                return
+            self._sample.append(vectors)
+            self._sample_ids.append(ids)
+            if sum(len(v) for v in self._sample) >= self.options.train_sample:
+                self._build_from_sample()
+            return
+
+        if self._replaced and self.previous is not None:
+            self.index.remove_ids(self.previous.doc_chunk_ids(self._replaced))
+        self._replaced = []
+        self.index.add_with_ids(vectors, ids)
+
+    def _build_from_sample(self):
+        vectors, ids = np.concatenate(self._sample), np.concatenate(self._sample_ids)
+        self._sample, self._sample_ids = [], []
+        self.index = build_index(vectors, ids, self.options)
+
+    def finish(self):
+        """Flushes what is left; returns the index (None if nothing was ever added)."""
+        self.flush()
+        if self._sample:
+            self._build_from_sample()
+        if self._replaced and self.index is not None and self.previous is not None:
+            self.index.remove_ids(self.previous.doc_chunk_ids(self._replaced))
+        self._replaced = []
+
+        stats = self.stats()
+        if self.chunks:
+            logger.info(
+                f"Embedded {stats['chunks']} chunks in {stats['seconds']:.1f}s: "
+                f"{stats['chunks_per_s']:.0f} chunks/s (encoding {stats['encode_seconds']:.1f}s)"
+            )
+        return self.index
+
+    @property
+    def chunks_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.chunks / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        return {
+            "chunks": self.chunks,
+            "seconds": time.perf_counter() - self.started,
+            "chunks_per_s": self.chunks_per_second,
+            "encode_seconds": self.encode_seconds,
+        }
@@ -1,34 +1,51 @@
 import os
-import json
-from pathlib import Path
-
-from sentence_transformers import SentenceTransformer
-import faiss
-import numpy as np
-
-from src.knowledge_graph.utils.common import read_json, write_json, read_yaml
+import hashlib
+
+from src.knowledge_graph.utils.common import iter_records
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.components.embedding_encoder import EmbeddingEncoder
+from src.knowledge_graph.components.embedding_engine import EmbeddingEngine, index_settings
+from src.knowledge_graph.components.vector_store import ShardedVectorStore, make_chunk_id, resolve_store
+from src.knowledge_graph.components.search_filter import document_date
+from src.knowledge_graph.components.index_factory import supports_removal
 from src.knowledge_graph.logger.logging import logger
 
 
 class EmbeddingPipeline:
 
-    def __init__(self):
-        cfg = read_yaml(Path("config/config.yaml"))
+    # Recorded in the index settings (see chunk_text)
+    CHUNKER = "words"
+
+    def __init__(self, config=None):
+        # pipeline_embedd settings, shared with DataEmbedding
+        self.config = config or ConfigManager().get_pipeline_embedd_config()
 
-        self.input_json = cfg["pipeline_embedd"]["input_json"]
+        self.input_json = self.config.input_json
 
-        self.chunk_size = cfg["pipeline_embedd"]["chunking"]["chunk_size"]
-        self.chunk_overlap = cfg["pipeline_embedd"]["chunking"]["chunk_overlap"]
+        self.chunk_size = self.config.chunking.chunk_size
+        self.chunk_overlap = self.config.chunking.chunk_overlap
 
-        self.model_name = cfg["pipeline_embedd"]["embedding_model"]["name"]
-        self.embedding_dim = cfg["pipeline_embedd"]["embedding_model"]["embedding_dim"]
+        # Chunks encoded and indexed per step; bounds memory during a run
+        self.batch_size = self.config.batch_size
 
-        self.index_path = cfg["pipeline_embedd"]["vector_store"]["index_path"]
-        self.metadata_path = cfg["pipeline_embedd"]["vector_store"]["metadata_path"]
+        self.model_name = self.config.embedding_model.name
+        self.embedding_dim = self.config.embedding_model.embedding_dim
+
+        self.vector_store = self.config.vector_store
+        self.index_path = self.vector_store.index_path
+        self.metadata_path = self.vector_store.metadata_path
+        # Only re-embed documents whose text changed since the last run
+        self.incremental = self.vector_store.incremental
+        self.normalize = self.vector_store.normalize
+        self.sharded = ShardedVectorStore(self.index_path, self.metadata_path,
+                                          self.vector_store.shard_by, self.vector_store.num_shards)
 
         os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
 
-        self.model = SentenceTransformer(self.model_name)
+        # Length-sorted batches, optionally over a pool of CPU encoder
+        # processes, behind the embedding cache
+        self.encoder = EmbeddingEncoder.from_config(self.model_name, self.normalize,
+                                                    self.config.encoder, self.config.cache)
 
     # ------------------ TEXT CHUNKING ------------------
 
@@ -47,41 +64,174 @@ class EmbeddingPipeline:
 
     # ------------------ MAIN PIPELINE ------------------
 
-    def run(self):
-        logger.info("Loading input documents...")
-        docs = read_json(self.input_json)
-
-        embeddings = []
-        metadata = []
+    def _settings(self):
+        return index_settings(self.model_name, self.embedding_dim, self.config.chunking, self.vector_store,
+                              self.CHUNKER, shard_by=self.vector_store.shard_by, num_shards=self.sharded.num_shards)
+
+    @staticmethod
+    def _doc_hash(doc):
+        key = (f"{doc.get('source_type')}\0{doc.get('source_name')}\0{document_date(doc)}\0"
+               f"{doc.get('text', '')}")
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def run(self, rebuild=False, shards=None):
+        """
+        Brings the vector store up to date with input_json. Every shard is
+        diffed, re-embedded and published on its own; shards limits the
+        run to those shard names (e.g. rebuild a single source type).
+        """
+        try:
+            needs_rebuild = self._update(rebuild, shards)
+            if needs_rebuild:
+                logger.info(f"{self.vector_store.index_type} cannot remove vectors; rebuilding {needs_rebuild}")
+                self._update(True, needs_rebuild)
+        finally:
+            self.encoder.close()
+
+    def _update(self, rebuild, shards):
+        """One pass over input_json; returns the shards that must be rebuilt."""
+        settings = self._settings()
+        updates = {}
+
+        def update_for(name):
+            if name not in updates:
+                updates[name] = self._load_shard(name, settings, rebuild)
+            return updates[name]
+
+        logger.info("Chunking new and changed documents...")
+        for doc in iter_records(self.input_json):
+            name = self.sharded.shard_of(doc)
+            if shards is None or name in shards:
+                self._add_document(update_for(name), doc)
+
+        # Shards no input document maps to any more lose all their documents
+        published = set(self.sharded.names())
+        for name in published:
+            if shards is None or name in shards:
+                update_for(name)
+
+        if not updates:
+            raise ValueError("No embeddings generated. Input data may be empty.")
 
-        logger.info("Chunking & embedding text...")
+        needs_rebuild = []
+        for name, update in updates.items():
+            outcome = self._publish_shard(update, settings)
+            if outcome == "rebuild":
+                needs_rebuild.append(name)
+            elif outcome == "empty":
+                published.discard(name)
+            else:
+                published.add(name)
 
-        for doc in docs:
-            text = doc.get("text", "")
-            chunks = self.chunk_text(text)
+        self.encoder.save_cache()
 
-            for chunk in chunks:
-                vector = self.model.encode(chunk)
+        if not published:
+            raise ValueError("No embeddings generated. Input data may be empty.")
+        self.sharded.write_manifest(published)
+        return needs_rebuild
+
+    def _load_shard(self, name, settings, rebuild):
+        store = self.sharded.store(name)
+        state = store.load(settings) if self.incremental and not rebuild else None
+        if state is not None and not state[2]:
+            # No per-document hashes (e.g. written by DataEmbedding): every
+            # document would look new and be added on top of its old chunks
+            logger.warning(f"{store.index_path} has no document hashes; rebuilding it from scratch")
+            state = None
+        update = _ShardUpdate(name, store, state)
+        if state is None:
+            logger.info(f"Building {update.label} from scratch...")
+        else:
+            logger.info(f"Updating {update.label} in place ({update.index.ntotal} vectors)...")
+        return update
+
+    def _engine(self, update):
+        """The shard's EmbeddingEngine, started (with a new generation) on its first change."""
+        if update.engine is None:
+            update.engine = EmbeddingEngine(
+                update.store.begin(), self.encoder.embed, self.vector_store,
+                index=update.index, previous=update.metadata, batch_size=self.batch_size,
+            )
+        return update.engine
+
+    def _add_document(self, update, doc):
+        doc_id = doc.get("id")
+        key = str(doc_id)
+        update.seen.add(key)
+
+        doc_hash = self._doc_hash(doc)
+        if update.needs_rebuild or update.documents.get(key) == doc_hash:
+            return
+        if key in update.documents:
+            if not supports_removal(update.index):
+                # Nothing more to stream into this shard; it is rebuilt after the run
+                update.needs_rebuild = True
+                return
+            update.stale.add(doc_id)
+            self._engine(update).replace(doc_id)
+        update.documents[key] = doc_hash
+
+        engine = self._engine(update)
+        text = doc.get("text", "")
+        created_at = document_date(doc)
+        for offset, chunk in enumerate(self.chunk_text(text)):
+            engine.add(chunk, {
+                "chunk_id": make_chunk_id(doc_id, offset),
+                "text": chunk,
+                "source_type": doc.get("source_type"),
+                "source_name": doc.get("source_name"),
+                "created_at": created_at,
+                "doc_id": doc_id
+            })
+
+    def _publish_shard(self, update, settings):
+        """Finishes one shard's diff; returns "unchanged", "published", "rebuild" or "empty"."""
+        documents = update.documents
+        removed = [key for key in documents if key not in update.seen]
+        for key in removed:
+            update.stale.add(int(key))
+            del documents[key]
+
+        if update.loaded and not update.stale and update.engine is None:
+            logger.info(f"No document changed since the last run; {update.label} is up to date")
+            return "unchanged"
+        if update.needs_rebuild or (removed and not supports_removal(update.index)):
+            if update.engine is not None:
+                update.engine.writer.abort()
+            return "rebuild"
+
+        engine = self._engine(update)
+        engine.remove_documents(int(key) for key in removed)
+        index = engine.finish()
+        if index is None or index.ntotal == 0:
+            engine.writer.abort()
+            if update.name:
+                logger.info(f"Shard {update.name!r} has no documents left; dropping it")
+                return "empty"
+            raise ValueError("No embeddings generated. Input data may be empty.")
 
-                embeddings.append(vector)
-                metadata.append({
-                    "text": chunk,
-                    "source_type": doc.get("source_type"),
-                    "source_name": doc.get("source_name"),
-                    "doc_id": doc.get("id")
-                })
+        logger.info(
+            f"{update.label}: documents changed: {len(update.stale) - len(removed)}, "
+            f"removed: {len(removed)}, new chunks: {engine.chunks}"
+        )
 
-        if not embeddings:
-            raise ValueError("No embeddings generated. Input data may be empty.")
+        engine.writer.extend(update.store.kept_records(update.metadata, update.stale))
+        engine.writer.commit(index, documents, settings)
+        logger.info(f"FAISS index saved at {resolve_store(update.store.index_path, update.store.metadata_path)[0]}")
+        return "published"
 
-        vectors = np.array(embeddings).astype("float32")
 
-        logger.info("Building FAISS index...")
-        index = faiss.IndexFlatL2(self.embedding_dim)
-        index.add(vectors)
+class _ShardUpdate:
+    """Loaded state of one shard plus the changes streamed into it."""
 
-        faiss.write_index(index, self.index_path)
-        write_json(self.metadata_path, metadata)
+    def __init__(self, name, store, state):
+        self.name = name
+        self.store = store
+        self.label = f"shard {name!r}" if name else "vector store"
+        self.loaded = state is not None
+        self.index, self.metadata, self.documents = state if state is not None else (None, None, {})
 
-        logger.info(f"FAISS index saved at {self.index_path}")
-        logger.info(f"Metadata saved at {self.metadata_path}")
+        # Started on the shard's first change (see EmbeddingPipeline._engine)
+        self.engine = None
+        self.seen, self.stale = set(), set()
+        self.needs_rebuild = False
@@ -0,0 +1,128 @@
+import time
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.knowledge_graph.components.graph_schema import ensure_schema
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.logger.logging import logger
+
+neo4j = lazy_import("neo4j")
+
+ENTITY_QUERY = """
+UNWIND $rows AS row
+MERGE (e:Entity {id: row.id})
+SET e.name = row.name, e.name_lower = toLower(row.name), e.type = row.type
+"""
+
+TRIPLE_QUERY = """
+UNWIND $rows AS row
+MATCH (h:Entity {id: row.hid})
+MATCH (t:Entity {id: row.tid})
+MERGE (h)-[:RELATION {type: row.rel}]->(t)
+"""
+
+
+def batches(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class GraphLoader:
+    """
+    Bulk Neo4j writes: rows are sent batch_size at a time as one
+    UNWIND $rows statement per explicit transaction, instead of one
+    auto-commit round trip per row.
+
+    A batch whose transaction fails with a retryable error (deadlock,
+    leader switch, lost connection) is rolled back and retried up to
+    max_retries times with exponential backoff; retryability comes from
+    the error's is_retryable(), which needs the neo4j>=5 driver. With
+    workers > 1, disjoint batches are written concurrently, one session
+    per thread.
+    Entities are always fully written before the triples that MATCH them.
+    Run ensure_schema() first: without the Entity.id constraint every
+    MERGE and MATCH by id scans all Entity nodes.
+    """
+
+    def __init__(self, driver, database=None, batch_size=5000, workers=1, max_retries=5, retry_backoff_s=0.5):
+        self.driver = driver
+        self.database = database
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+
+    def ensure_schema(self):
+        """Entity.id uniqueness constraint and lookup indexes; safe to run on every build."""
+        with self.driver.session(database=self.database) as session:
+            ensure_schema(session)
+
+    def load_entities(self, entities):
+        rows = ({"id": e["id"], "name": e["name"], "type": e["label"]} for e in entities)
+        return self._load("entities", ENTITY_QUERY, rows)
+
+    def load_triples(self, triples):
+        rows = ({"hid": t["head_id"], "tid": t["tail_id"], "rel": t["relation"]} for t in triples)
+        return self._load("triples", TRIPLE_QUERY, rows)
+
+    def _load(self, label, query, rows):
+        start = time.perf_counter()
+        if self.workers > 1:
+            written = self._load_parallel(query, rows)
+        else:
+            with self.driver.session(database=self.database) as session:
+                written = sum(self._write(session, query, batch) for batch in batches(rows, self.batch_size))
+
+        seconds = time.perf_counter() - start
+        logger.info(f"Wrote {written} {label} in {seconds:.1f}s "
+                    f"({written / seconds if seconds else 0:.0f} rows/s, retries so far: {self.retries})")
+        return written
+
+    def _load_parallel(self, query, rows):
+        def worker(queue):
+            with self.driver.session(database=self.database) as session:
+                return sum(self._write(session, query, batch) for batch in queue)
+
+        # Each worker pulls whole batches from one shared generator; the lock
+        # keeps the generator from being advanced by two threads at once
+        shared = _LockedIterator(batches(rows, self.batch_size))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="graph-writer") as pool:
+            return sum(pool.map(worker, [shared] * self.workers))
+
+    def _write(self, session, query, batch):
+        """Writes one batch in its own transaction; returns its row count."""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with session.begin_transaction() as tx:
+                    tx.run(query, rows=batch).consume()
+                    tx.commit()
+                return len(batch)
+            except (neo4j.exceptions.Neo4jError, neo4j.exceptions.DriverError) as e:
+                if not e.is_retryable() or attempt == self.max_retries:
+                    raise
+                with self._retries_lock:
+                    self.retries += 1
+                delay = self.retry_backoff_s * 2 ** (attempt - 1)
+                logger.warning(f"Retrying a {len(batch)}-row batch in {delay:.1f}s "
+                               f"(attempt {attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+
+
+class _LockedIterator:
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            return next(self.iterator)
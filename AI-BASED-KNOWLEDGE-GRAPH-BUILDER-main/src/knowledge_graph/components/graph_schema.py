@@ -0,0 +1,89 @@
+import re
+
+from src.knowledge_graph.logger.logging import logger
+
+ENTITY_FULLTEXT_INDEX = "entity_name_fulltext"
+
+# Neo4j 5 DDL (CREATE CONSTRAINT ... REQUIRE, CREATE FULLTEXT INDEX);
+# Neo4j 4.x servers reject these statements.
+# Idempotent: every statement is a no-op when the constraint/index exists.
+# The uniqueness constraint also backs MERGE (e:Entity {id: ...}) with an
+# index, so loads stop label-scanning.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
+    "CREATE INDEX entity_name_lower IF NOT EXISTS FOR (e:Entity) ON (e.name_lower)",
+    f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS FOR (e:Entity) ON EACH [e.name]",
+]
+
+# Entities written before name_lower existed. A full label scan, so it
+# only runs when ensure_schema finds some (or has just created the schema).
+BACKFILL_NAME_LOWER = """
+MATCH (e:Entity) WHERE e.name_lower IS NULL AND e.name IS NOT NULL
+CALL { WITH e SET e.name_lower = toLower(e.name) } IN TRANSACTIONS OF 10000 ROWS
+"""
+# From the label count store and the name_lower index: no label scan
+COUNT_ENTITIES = "MATCH (e:Entity) RETURN count(e) AS n"
+COUNT_NAME_LOWER = "MATCH (e:Entity) WHERE e.name_lower IS NOT NULL RETURN count(e) AS n"
+
+# Exact (case-insensitive) name matches through the name_lower index rank
+# first, then fuzzy matches from the full-text index
+ENTITY_LOOKUP_QUERY = f"""
+CALL {{
+    MATCH (n:Entity {{name_lower: $name_lower}})
+    RETURN n, 1000.0 AS score
+    UNION
+    CALL db.index.fulltext.queryNodes('{ENTITY_FULLTEXT_INDEX}', $search, {{limit: $limit}})
+    YIELD node AS n, score
+    RETURN n, score
+}}
+WITH n, max(score) AS score
+ORDER BY score DESC
+LIMIT $limit
+MATCH (n)-[r]-(m:Entity)
+RETURN n.name, type(r) AS rel, m.name
+LIMIT $limit
+"""
+
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+# Shorter terms are matched exactly; fuzzy matching them is mostly noise
+_FUZZY_MIN_LENGTH = 4
+
+
+def fulltext_query(text):
+    """
+    Lucene query for an entity mention: the whole phrase (boosted) or all
+    of its terms, each allowing one edit when long enough. None when the
+    mention has no searchable term.
+    """
+    # Lower-cased like the index analyzer, which also keeps AND/OR/NOT
+    # inside a mention from being read as operators
+    terms = [_LUCENE_SPECIAL.sub(r"\\\1", term) for term in text.lower().split()]
+    terms = [term for term in terms if term.strip("\\")]
+    if not terms:
+        return None
+    fuzzy = " AND ".join(f"{t}~1" if len(t) >= _FUZZY_MIN_LENGTH else t for t in terms)
+    return f'"{" ".join(terms)}"^2 OR ({fuzzy})'
+
+
+def _missing_name_lower(session):
+    """Whether some Entity has no name_lower (written before it existed)."""
+    total = session.run(COUNT_ENTITIES).single()["n"]
+    return session.run(COUNT_NAME_LOWER).single()["n"] < total
+
+
+def ensure_schema(session, await_seconds=300):
+    """
+    Creates the Entity constraint and indexes if missing, waits until they
+    are online and backfills name_lower when the schema was just created or
+    some entity still lacks it.
+    """
+    created = 0
+    for statement in SCHEMA_STATEMENTS:
+        counters = session.run(statement).consume().counters
+        created += counters.constraints_added + counters.indexes_added
+    session.run("CALL db.awaitIndexes($seconds)", seconds=await_seconds).consume()
+
+    if created or _missing_name_lower(session):
+        logger.info("Backfilling Entity.name_lower")
+        session.run(BACKFILL_NAME_LOWER).consume()
+    logger.info("Graph schema ready: Entity.id unique, name_lower and full-text name indexes")
@@ -0,0 +1,276 @@
+import os
+import json
+import hashlib
+from collections import deque
+from datetime import datetime
+
+from src.knowledge_graph.components.data_ingestion import DataIngestion
+from src.knowledge_graph.components.db_ingestion import SQLiteTableReader
+from src.knowledge_graph.utils.common import record_writer, iter_records, file_sha256
+from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.exception.exception import KGException
+import sys
+
+
+def _compress_ids(ids):
+    """[1, 2, 3, 7, 8] -> [[1, 4], [7, 9]] (half-open ranges)."""
+    ranges = []
+    for i in ids:
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    return ranges
+
+
+def _expand_ids(ranges):
+    for start, end in ranges:
+        yield from range(start, end)
+
+
+class IncrementalDataIngestion(DataIngestion):
+    """
+    Incremental variant of DataIngestion.
+
+    A manifest remembers, per source file, its mtime, size, content hash and
+    the record ids it produced; per DB table it keeps a rowid watermark and
+    a hash of the rows up to it. A run only re-parses new or changed
+    sources and writes them, plus tombstones for removed records, to
+    delta_json. Ids are reused positionally, so unchanged content keeps its
+    ids across runs. output_json is then patched into a full snapshot:
+    left alone when nothing changed, appended to when the delta only adds
+    records, and rewritten (a full read and write) only when records
+    changed or were deleted.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.manifest = self._load_manifest()
+        self.counter = self.manifest["next_id"]
+        self.sources = {}
+        self.touched_ids = set()
+        self.deleted_count = 0
+        self._reuse_ids = deque()
+        if os.path.exists(self.tables_json):
+            with open(self.tables_json, "r", encoding="utf-8") as f:
+                self.tables = json.load(f)
+
+    def _load_manifest(self):
+        if os.path.exists(self.config.manifest_path):
+            with open(self.config.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"next_id": 1, "sources": {}}
+
+    def _save_manifest(self):
+        self.manifest["next_id"] = self.counter
+        self.manifest["sources"] = self.sources
+        self.manifest["updated_at"] = datetime.utcnow().isoformat()
+
+        tmp = f"{self.config.manifest_path}.tmp"
+        os.makedirs(os.path.dirname(self.config.manifest_path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.config.manifest_path)
+
+    def _next_id(self):
+        if self._reuse_ids:
+            return self._reuse_ids.popleft()
+        return super()._next_id()
+
+    # ---------- CHANGE DETECTION ----------
+    def _file_changed(self, key, path):
+        old = self.manifest["sources"].get(key)
+        stat = os.stat(path)
+        state = {"mtime": stat.st_mtime, "size": stat.st_size}
+
+        if old and old["mtime"] == state["mtime"] and old["size"] == state["size"]:
+            self.sources[key] = old
+            return False
+
+        state["sha256"] = file_sha256(path)
+        if old and old["sha256"] == state["sha256"]:
+            self.sources[key] = {**old, **state}
+            return False
+
+        self.sources[key] = {**state, "ids": old["ids"] if old else []}
+        return True
+
+    def _table_state(self, db_path, table_name, old_max_rowid):
+        """
+        Hashes the ingested rows in key order. Returns the new watermark,
+        the hash of all rows and the hash of the rows up to the old watermark.
+        """
+        digest, prefix_sha, max_rowid = hashlib.sha256(), None, None
+
+        with SQLiteTableReader(db_path, self.config.database) as reader:
+            for keys, _, rows in reader.iter_rows(table_name):
+                for row_key, row in zip(keys, rows):
+                    if old_max_rowid is not None and prefix_sha is None and row_key > old_max_rowid:
+                        prefix_sha = digest.hexdigest()
+                    digest.update(repr((row_key, row)).encode("utf-8"))
+                    max_rowid = row_key
+
+        full_sha = digest.hexdigest()
+        return max_rowid, full_sha, prefix_sha or full_sha
+
+    def _plan_table(self, unit):
+        key, parser, (db_path, table_name, db_config) = unit
+        old = self.manifest["sources"].get(key)
+
+        try:
+            max_rowid, sha, prefix_sha = self._table_state(
+                db_path, table_name, old.get("max_rowid") if old else None
+            )
+        except Exception as e:
+            logger.warning(f"Could not fingerprint table {table_name}, re-ingesting: {e}")
+            self.sources[key] = {"ids": old["ids"] if old else []}
+            return unit
+
+        state = {"max_rowid": max_rowid, "sha256": sha}
+        if old and old.get("sha256") == sha:
+            self.sources[key] = {**old, **state}
+            return None
+
+        if old and old.get("max_rowid") is not None and old.get("sha256") == prefix_sha:
+            # Append-only change: keep existing ids, read only the new rows
+            self.sources[key] = {**state, "ids": old["ids"], "append": True}
+            return (key, parser, (db_path, table_name, db_config, old["max_rowid"]))
+
+        self.sources[key] = {**state, "ids": old["ids"] if old else []}
+        return unit
+
+    def _plan(self):
+        """Returns the units that need parsing and records their sources."""
+        changed = []
+
+        for unit in self._email_units() + self._pdf_units() + self._csv_units():
+            key, _, (path, *_) = unit
+            if self._file_changed(key, path):
+                changed.append(unit)
+
+        db_units = self._db_units()
+        db_key = os.path.abspath(self.config.db_path)
+        db_changed = bool(db_units) and self._file_changed(db_key, self.config.db_path)
+
+        for unit in db_units:
+            key = unit[0]
+            if not db_changed and key in self.manifest["sources"]:
+                # Database file untouched: the table keeps its manifest entry
+                self.sources[key] = self.manifest["sources"][key]
+                continue
+            planned = self._plan_table(unit)
+            if planned:
+                changed.append(planned)
+
+        return changed
+
+    # ---------- RECORD EMISSION ----------
+    def _append_payloads(self, payloads, unit):
+        key = unit[0]
+        source = self.sources[key]
+        old_ids = list(_expand_ids(source["ids"]))
+
+        if source.pop("append", False):
+            new_ids = old_ids
+        else:
+            self._reuse_ids = deque(old_ids)
+            self.touched_ids.update(old_ids)
+            new_ids = []
+
+        start = self.record_count
+        new_ids = new_ids + self._emit(payloads)
+        logger.debug(f"{key}: {self.record_count - start} records re-ingested")
+
+        # Rows that no longer exist keep no id
+        for record_id in self._reuse_ids:
+            self._write_tombstone(record_id)
+        self._reuse_ids = deque()
+        source["ids"] = _compress_ids(new_ids)
+
+    def _emit(self, payloads):
+        ids = []
+        for record in self._make_records(payloads):
+            self.write_record(record)
+            self.record_count += 1
+            ids.append(record["id"])
+        return ids
+
+    def _write_tombstone(self, record_id):
+        self.write_record({"id": record_id, "deleted": True})
+        self.touched_ids.add(record_id)
+        self.deleted_count += 1
+
+    # ---------- SNAPSHOT ----------
+    def _update_snapshot(self):
+        """Brings output_json up to date with the delta, rewriting it only when it must."""
+        output = self.config.output_json
+        if not self.touched_ids and os.path.exists(output):
+            if not self.record_count:
+                logger.info("No changes; output_json left as is")
+                return
+            if str(output).endswith(".jsonl"):
+                self._append_snapshot()
+                return
+        self._rewrite_snapshot()
+
+    def _append_snapshot(self):
+        """Appends the delta's new records; no previous record was touched."""
+        output = self.config.output_json
+        size = os.path.getsize(output)
+        try:
+            with open(output, "a", encoding="utf-8") as f:
+                for record in iter_records(self.config.delta_json):
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except BaseException:
+            # Leave the previous snapshot as it was
+            with open(output, "r+b") as f:
+                f.truncate(size)
+            raise
+        logger.info(f"Appended {self.record_count} records to {output}")
+
+    def _rewrite_snapshot(self):
+        """Rewrites output_json from the previous snapshot plus the delta."""
+        base, ext = os.path.splitext(self.config.output_json)
+        tmp = f"{base}.tmp{ext}"
+
+        with record_writer(tmp) as write:
+            if os.path.exists(self.config.output_json):
+                for record in iter_records(self.config.output_json):
+                    if record["id"] not in self.touched_ids:
+                        write(record)
+            for record in iter_records(self.config.delta_json):
+                if not record.get("deleted"):
+                    write(record)
+
+        os.replace(tmp, self.config.output_json)
+
+    # ---------- MAIN PIPELINE ----------
+    def ingest(self):
+        try:
+            logger.info(f">>> Incremental Ingestion Started at {datetime.now()}")
+
+            changed = self._plan()
+            removed = [key for key in self.manifest["sources"] if key not in self.sources]
+
+            with record_writer(self.config.delta_json) as write:
+                self.write_record = write
+                self._ingest_units(changed)
+
+                for key in removed:
+                    for record_id in _expand_ids(self.manifest["sources"][key].get("ids", [])):
+                        self._write_tombstone(record_id)
+
+            self._update_snapshot()
+            for key in removed:
+                self.tables.pop(key, None)
+            self._save_tables()
+            self._save_manifest()
+
+            logger.info(
+                f"<<< Incremental Ingestion Completed. Changed sources: {len(changed)}, "
+                f"Removed sources: {len(removed)}, Upserted: {self.record_count}, "
+                f"Deleted: {self.deleted_count}"
+            )
+
+        except Exception as e:
+            raise KGException(e, sys)
@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.logger.logging import logger
+
+faiss = lazy_import("faiss")
+
+
+def _nlist(num_vectors, nlist):
+    """Configured nlist, or ~4*sqrt(n) capped so each list gets 39+ training points."""
+    if not nlist:
+        nlist = int(4 * math.sqrt(max(num_vectors, 1)))
+    return max(1, min(nlist, num_vectors // 39 or 1))
+
+
+# vector_store.quantization -> FAISS vector codec
+QUANTIZATION = ("none", "fp16", "int8", "pq")
+
+
+def _codec(options):
+    """Stored vector encoding: float32, fp16 / int8 scalar quantizer, or PQ."""
+    quantization = getattr(options, "quantization", "none") or "none"
+    if quantization not in QUANTIZATION:
+        raise ValueError(f"Unknown vector_store.quantization {quantization!r}, expected one of {QUANTIZATION}")
+    return {
+        "none": "Flat",
+        "fp16": "SQfp16",
+        "int8": "SQ8",
+        "pq": f"PQ{options.pq_m}x{options.pq_bits}",
+    }[quantization]
+
+
+def factory_string(index_type, num_vectors, options):
+    """
+    FAISS factory description for vector_store.index_type:
+    IndexFlatL2 / IndexFlatIP, IndexIVFFlat, IndexIVFPQ, IndexHNSWFlat, or
+    any other value taken as a factory string (e.g. "OPQ16_64,IVF4096,PQ16").
+
+    vector_store.quantization picks how the vectors themselves are stored
+    by the Flat, IVF and HNSW types; IndexIVFPQ and factory strings already
+    name their encoding and are left as they are.
+    """
+    codec = _codec(options)
+    if index_type in ("IndexFlatL2", "IndexFlatIP"):
+        return codec
+    if index_type == "IndexIVFFlat":
+        return f"IVF{_nlist(num_vectors, options.nlist)},{codec}"
+    if index_type == "IndexIVFPQ":
+        return f"IVF{_nlist(num_vectors, options.nlist)},PQ{options.pq_m}x{options.pq_bits}"
+    if index_type == "IndexHNSWFlat":
+        # Quantized storage gives IndexHNSWSQ / IndexHNSWPQ (8-bit PQ codes)
+        suffix = {"Flat": "", "SQfp16": "_SQfp16", "SQ8": "_SQ8"}.get(codec, f"_PQ{options.pq_m}")
+        return f"HNSW{options.hnsw_m}{suffix}"
+    return index_type
+
+
+# Flat index names imply their metric; every other type uses vector_store.metric
+_IMPLIED_METRIC = {"IndexFlatL2": "l2", "IndexFlatIP": "ip"}
+
+
+def effective_metric(options):
+    """'ip' or 'l2' for these vector_store options."""
+    return _IMPLIED_METRIC.get(options.index_type, getattr(options, "metric", "l2"))
+
+
+def index_metric(options):
+    return faiss.METRIC_INNER_PRODUCT if effective_metric(options) == "ip" else faiss.METRIC_L2
+
+
+def metric_name(index):
+    """'ip' or 'l2' for a built index."""
+    return "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+
+
+def requires_training(dim, options):
+    """Whether a new index of this type must be trained before vectors are added."""
+    description = factory_string(options.index_type, options.train_sample, options)
+    return not faiss.index_factory(dim, description, index_metric(options)).is_trained
+
+
+def build_index(vectors, ids, options):
+    """
+    IndexIDMap2 over the configured index type, trained (IVF/PQ) on a
+    random sample of at most options.train_sample vectors and filled with
+    (vectors, ids). Falls back to a flat index when there are too few
+    vectors to train on.
+    """
+    dim = vectors.shape[1]
+    metric = index_metric(options)
+    description = factory_string(options.index_type, len(vectors), options)
+    index = faiss.index_factory(dim, f"IDMap2,{description}", metric)
+
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > options.train_sample:
+            rows = np.random.default_rng(0).choice(len(vectors), options.train_sample, replace=False)
+            sample = vectors[np.sort(rows)]
+        try:
+            logger.info(f"Training {description} index on {len(sample)} vectors")
+            index.train(sample)
+        except RuntimeError as e:
+            logger.warning(f"Cannot train {description} on {len(sample)} vectors, using Flat: {e}")
+            description = "Flat"
+            index = faiss.index_factory(dim, "IDMap2,Flat", metric)
+
+    index.add_with_ids(vectors, ids)
+    logger.info(f"Built {description} index with {index.ntotal} vectors")
+    return index
+
+
+def supports_removal(index):
+    """Graph indexes (HNSW, NSG) cannot remove_ids; they are rebuilt instead."""
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    return not isinstance(inner, (faiss.IndexHNSW, faiss.IndexNSG))
+
+
+def apply_search_params(index, nprobe=None, ef_search=None):
+    """Sets query-time knobs that apply to this index type; others are skipped."""
+    space = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if not value:
+            continue
+        try:
+            space.set_index_parameter(index, name, value)
+            logger.info(f"Search parameter {name}={value}")
+        except RuntimeError:
+            logger.debug(f"Index has no {name} parameter, skipping")
+
+
+# A filtered IVF search probes enough lists to expect this many of the
+# selected ids among its candidates
+_FILTER_PROBED_MATCHES = 64
+
+
+def search_parameters(index, selector, matches=None):
+    """
+    Per-query SearchParameters restricting index.search to selector's ids.
+    Explicit parameters replace the index's own knobs, so the current
+    nprobe / efSearch are carried over. IVF nprobe grows as the number of
+    selected ids (matches) shrinks, up to every list.
+    """
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    if isinstance(inner, faiss.IndexIVF):
+        nprobe = inner.nprobe
+        if matches:
+            nprobe = max(nprobe, math.ceil(_FILTER_PROBED_MATCHES * inner.nlist / matches))
+        return faiss.SearchParametersIVF(sel=selector, nprobe=min(nprobe, inner.nlist))
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
@@ -0,0 +1,266 @@
+import os
+import json
+
+import numpy as np
+
+from src.knowledge_graph.logger.logging import logger
+
+# Document-level fields, interned once per distinct value
+DOC_FIELDS = ("source_type", "source_name", "created_at")
+
+CHUNK_DTYPE = np.dtype([
+    ("chunk_id", "<i8"),
+    ("doc_row", "<i8"),
+    ("text_offset", "<i8"),
+    ("text_length", "<i4"),
+])
+
+_EMPTY = -1
+_FLUSH_ROWS = 8192
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def _hash_slots(ids, bits):
+    """Multiplicative (Fibonacci) hash of int64 ids into 2**bits slots."""
+    mixed = ids.astype(np.uint64) * np.uint64(_GOLDEN)
+    return (mixed >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _build_hash_table(chunk_ids):
+    """
+    Open-addressing (linear probing) table of row numbers, sized to a load
+    factor <= 0.5. Built vectorized: each round places, per free slot, the
+    first row that wants it and moves the others one slot on.
+    """
+    bits = max(1, int(len(chunk_ids) * 2 - 1).bit_length())
+    size = 1 << bits
+    table = np.full(size, _EMPTY, dtype=np.int64)
+
+    rows = np.arange(len(chunk_ids), dtype=np.int64)
+    slots = _hash_slots(chunk_ids, bits)
+    while len(rows):
+        free = table[slots] == _EMPTY
+        _, first = np.unique(slots[free], return_index=True)
+        placed = np.flatnonzero(free)[first]
+        table[slots[placed]] = rows[placed]
+
+        pending = np.ones(len(rows), dtype=bool)
+        pending[placed] = False
+        rows, slots = rows[pending], (slots[pending] + 1) & (size - 1)
+    return table, bits
+
+
+class MetadataWriter:
+    """
+    Streams chunk metadata into the columnar layout read by MetadataStore:
+
+    - chunks.bin   fixed-width rows (chunk_id, doc_row, text offset/length)
+    - text.bin     UTF-8 chunk texts, back to back
+    - docs.bin     one row per document: doc_id and an interned code per
+                   DOC_FIELDS entry (-1 = missing)
+    - hash.bin     chunk_id -> row open-addressing table
+    - manifest.json counts, hash size and the interned value lists
+
+    Consecutive chunks of the same document share one document row.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._chunks = open(os.path.join(path, "chunks.bin"), "wb")
+        self._text = open(os.path.join(path, "text.bin"), "wb")
+        self._docs = open(os.path.join(path, "docs.bin"), "wb")
+
+        self.doc_dtype = np.dtype([("doc_id", "<i8")] + [(f, "<i4") for f in DOC_FIELDS])
+        self.interned = {f: {} for f in DOC_FIELDS}
+        self.count = 0
+        self.doc_count = 0
+        self.text_offset = 0
+        self._last_doc = None
+        # Buffered rows, written every _FLUSH_ROWS chunks
+        self._chunk_rows, self._doc_rows, self._texts = [], [], []
+
+    def _intern(self, field, value):
+        if value is None:
+            return _EMPTY
+        codes = self.interned[field]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def append(self, record):
+        doc_key = (record.get("doc_id"),) + tuple(record.get(f) for f in DOC_FIELDS)
+        if doc_key != self._last_doc:
+            doc_id = -1 if doc_key[0] is None else doc_key[0]
+            codes = [self._intern(f, v) for f, v in zip(DOC_FIELDS, doc_key[1:])]
+            self._doc_rows.append((doc_id, *codes))
+            self.doc_count += 1
+            self._last_doc = doc_key
+
+        text = (record.get("text") or "").encode("utf-8")
+        self._chunk_rows.append((record["chunk_id"], self.doc_count - 1, self.text_offset, len(text)))
+        self._texts.append(text)
+
+        self.text_offset += len(text)
+        self.count += 1
+        if len(self._chunk_rows) >= _FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        np.array(self._chunk_rows, dtype=CHUNK_DTYPE).tofile(self._chunks)
+        np.array(self._doc_rows, dtype=self.doc_dtype).tofile(self._docs)
+        self._text.write(b"".join(self._texts))
+        self._chunk_rows, self._doc_rows, self._texts = [], [], []
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def discard(self):
+        """Closes the files without finishing the store (caller removes path)."""
+        for f in (self._chunks, self._text, self._docs):
+            f.close()
+
+    def close(self):
+        self._flush()
+        for f in (self._chunks, self._text, self._docs):
+            f.close()
+
+        chunk_ids = np.fromfile(os.path.join(self.path, "chunks.bin"), dtype=CHUNK_DTYPE)["chunk_id"]
+        table, bits = _build_hash_table(chunk_ids)
+        table.tofile(os.path.join(self.path, "hash.bin"))
+
+        with open(os.path.join(self.path, "manifest.json"), "w") as f:
+            json.dump({
+                "count": self.count,
+                "doc_count": self.doc_count,
+                "hash_bits": bits,
+                "doc_fields": list(DOC_FIELDS),
+                "interned": {field: list(codes) for field, codes in self.interned.items()},
+            }, f)
+        return self.count
+
+
+class MetadataStore:
+    """
+    Read side of the columnar chunk metadata. Every file is memory-mapped,
+    so opening the store costs only the interned value lists; a lookup by
+    chunk id is one hash probe plus one slice of the text blob.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+
+        self.count = manifest["count"]
+        self.bits = manifest["hash_bits"]
+        self.doc_fields = manifest["doc_fields"]
+        self.interned = manifest["interned"]
+
+        doc_dtype = np.dtype([("doc_id", "<i8")] + [(f, "<i4") for f in self.doc_fields])
+        self.chunks = self._map("chunks.bin", CHUNK_DTYPE, self.count)
+        self.docs = self._map("docs.bin", doc_dtype, manifest["doc_count"])
+        self.table = self._map("hash.bin", np.int64, 1 << self.bits)
+        self.text = self._map("text.bin", np.uint8, None)
+        self._doc_order = self._sorted_docs = None
+
+        logger.info(f"Metadata store opened: {self.count} chunks from {path}")
+
+    def _map(self, name, dtype, count):
+        path = os.path.join(self.path, name)
+        if count == 0 or os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,) if count else None)
+
+    def __len__(self):
+        return self.count
+
+    def row_of(self, chunk_id):
+        """Row holding chunk_id, or -1."""
+        if not self.count:
+            return -1
+        mask = (1 << self.bits) - 1
+        slot = ((int(chunk_id) * _GOLDEN) & _MASK64) >> (64 - self.bits)
+        while True:
+            row = int(self.table[slot])
+            if row == _EMPTY:
+                return -1
+            if int(self.chunks[row]["chunk_id"]) == chunk_id:
+                return row
+            slot = (slot + 1) & mask
+
+    def record(self, row):
+        chunk = self.chunks[row]
+        start, length = int(chunk["text_offset"]), int(chunk["text_length"])
+        doc = self.docs[int(chunk["doc_row"])]
+
+        record = {
+            "chunk_id": int(chunk["chunk_id"]),
+            "doc_id": int(doc["doc_id"]),
+            "text": self.text[start:start + length].tobytes().decode("utf-8"),
+        }
+        for field in self.doc_fields:
+            code = int(doc[field])
+            if code != _EMPTY:
+                record[field] = self.interned[field][code]
+        return record
+
+    def get(self, chunk_id, default=None):
+        row = self.row_of(chunk_id)
+        return default if row < 0 else self.record(row)
+
+    def __contains__(self, chunk_id):
+        return self.row_of(chunk_id) >= 0
+
+    def __getitem__(self, chunk_id):
+        row = self.row_of(chunk_id)
+        if row < 0:
+            raise KeyError(chunk_id)
+        return self.record(row)
+
+    # ---------- BULK ACCESS ----------
+    def chunk_ids(self):
+        return np.asarray(self.chunks["chunk_id"])
+
+    def doc_ids(self):
+        """Document id of every row."""
+        return np.asarray(self.docs["doc_id"])[np.asarray(self.chunks["doc_row"])]
+
+    def records(self, rows=None):
+        for row in (range(self.count) if rows is None else rows):
+            yield self.record(int(row))
+
+    def doc_chunk_ids(self, doc_ids):
+        """Chunk ids of every chunk of doc_ids."""
+        if self._doc_order is None:
+            # Rows sorted by document, built on first use
+            doc_of_row = self.doc_ids()
+            self._doc_order = np.argsort(doc_of_row, kind="stable")
+            self._sorted_docs = doc_of_row[self._doc_order]
+        doc_ids = np.fromiter(doc_ids, dtype=np.int64)
+        starts = np.searchsorted(self._sorted_docs, doc_ids, side="left")
+        ends = np.searchsorted(self._sorted_docs, doc_ids, side="right")
+        rows = np.concatenate([self._doc_order[a:b] for a, b in zip(starts, ends)] or [np.zeros(0, np.int64)])
+        return self.chunk_ids()[rows]
+
+    def select(self, search_filter):
+        """
+        Sorted chunk ids matching a SearchFilter. Evaluated once per
+        distinct interned value and then per document row, never per chunk
+        record.
+        """
+        doc_mask = np.ones(len(self.docs), dtype=bool)
+        for field, allowed in (("source_type", search_filter.source_types),
+                               ("source_name", search_filter.source_names)):
+            if allowed:
+                codes = [code for code, value in enumerate(self.interned[field]) if value in allowed]
+                doc_mask &= np.isin(self.docs[field], codes)
+        if search_filter.created_after or search_filter.created_before:
+            codes = [code for code, value in enumerate(self.interned["created_at"])
+                     if search_filter.date_matches(value)]
+            doc_mask &= np.isin(self.docs["created_at"], codes)
+
+        ids = self.chunk_ids()[doc_mask[np.asarray(self.chunks["doc_row"])]]
+        return np.sort(ids)
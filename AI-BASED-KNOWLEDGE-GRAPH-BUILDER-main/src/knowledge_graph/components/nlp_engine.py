@@ -0,0 +1,96 @@
+import re
+from collections import deque
+
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.logger.logging import logger
+
+spacy = lazy_import("spacy")
+
+# What DataTransformation reads: doc.ents, doc.sents, token.pos_ and
+# token.lemma_ (POS from tagger + attribute_ruler, lemmas from lemmatizer)
+_REQUIRED = {"tok2vec", "transformer", "tagger", "morphologizer", "attribute_ruler", "lemmatizer", "ner"}
+# Where over-long texts are cut, best first: paragraphs, lines, sentence ends, spaces
+_BREAKS = [re.compile(p) for p in (r"\n\s*\n", r"\n", r"(?<=[.!?])\s+", r"\s+")]
+
+
+def load_pipeline(model):
+    """
+    spaCy pipeline with only the components the extractor reads enabled.
+    Sentence boundaries come from the lightweight senter instead of the
+    dependency parser when the model ships one.
+    """
+    nlp = spacy.load(model)
+    sentences = "senter" if "senter" in nlp.component_names else "parser"
+    keep = _REQUIRED | {sentences}
+    for name in nlp.component_names:
+        if name in keep and name in nlp.disabled:
+            nlp.enable_pipe(name)
+        elif name not in keep and name not in nlp.disabled:
+            nlp.disable_pipe(name)
+    logger.info(f"spaCy {model} pipeline: {nlp.pipe_names}")
+    return nlp
+
+
+class NLPEngine:
+    """
+    Batched spaCy parsing: texts go through nlp.pipe batch_size at a time,
+    over n_process processes, and come back in input order. Texts longer
+    than max_length characters are cut at paragraph, line or sentence
+    breaks, parsed piece by piece and joined back into one Doc, so no
+    single call exceeds spaCy's max_length or its memory.
+    """
+
+    def __init__(self, model="en_core_web_sm", batch_size=64, n_process=1, max_length=100_000):
+        self.nlp = load_pipeline(model)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.max_length = max_length
+        self.nlp.max_length = max(self.nlp.max_length, max_length)
+
+    @property
+    def signature(self):
+        """Model, version and enabled components; what a parse depends on."""
+        return f"{self.nlp.meta.get('name')}-{self.nlp.meta.get('version')}:{','.join(self.nlp.pipe_names)}"
+
+    def split(self, text):
+        """text cut into pieces of at most max_length characters, at the best break available."""
+        pieces = []
+        while len(text) > self.max_length:
+            window = text[:self.max_length]
+            cut = self.max_length
+            for pattern in _BREAKS:
+                ends = [m.end() for m in pattern.finditer(window, self.max_length // 2)]
+                if ends:
+                    cut = ends[-1]
+                    break
+            pieces.append(text[:cut])
+            text = text[cut:]
+        pieces.append(text)
+        return pieces
+
+    def pipe(self, items):
+        """
+        Parses (text, context) pairs lazily; yields (spaCy Doc, context)
+        in input order. Contexts stay in this process, only texts are sent
+        to the workers.
+        """
+        pending = deque()
+
+        def texts():
+            for text, context in items:
+                pieces = self.split(text)
+                if len(pieces) > 1:
+                    logger.info(f"Parsing a {len(text)}-character text in {len(pieces)} pieces")
+                # Queued before its text is handed out, so it is there when the Doc comes back
+                pending.append((context, len(pieces)))
+                yield from pieces
+
+        parts = []
+        for spacy_doc in self.nlp.pipe(texts(), batch_size=self.batch_size, n_process=self.n_process):
+            parts.append(spacy_doc)
+            context, count = pending[0]
+            if len(parts) < count:
+                continue
+            pending.popleft()
+            yield (parts[0] if count == 1 else spacy.tokens.Doc.from_docs(parts)), context
+            parts = []
@@ -0,0 +1,71 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from src.knowledge_graph.logger.logging import logger
+
+
+class QueryBatcher:
+    """
+    Dynamic batching in front of the embedder and index.
+
+    Callers submit() single queries from any thread and get a Future back.
+    A worker thread collects queries until max_batch_size items are waiting
+    or max_wait_ms have passed since the first one arrived, hands the whole
+    batch to search_batch(questions, top_ks, search_filters) (one encode
+    call and one index.search over the stacked matrix) and resolves each
+    caller's Future with its own slice of the results.
+    """
+
+    def __init__(self, search_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.search_batch = search_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self.batches = 0
+        self.queries = 0
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, question, top_k, search_filter=None):
+        future = Future()
+        self._queue.put((question, top_k, search_filter, future))
+        return future
+
+    @property
+    def mean_batch_size(self):
+        return self.queries / self.batches if self.batches else 0.0
+
+    def _collect(self):
+        """Blocks for the first query, then gathers more until full or timed out."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            questions, top_ks, search_filters, futures = zip(*batch)
+            try:
+                results = self.search_batch(list(questions), list(top_ks), list(search_filters))
+            except Exception as e:
+                logger.error(f"Batched search of {len(batch)} queries failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.queries += len(batch)
+            for future, result in zip(futures, results):
+                future.set_result(result)
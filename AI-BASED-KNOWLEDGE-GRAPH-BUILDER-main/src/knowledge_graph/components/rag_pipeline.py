@@ -1,37 +1,41 @@
-import json
-import faiss
-from pathlib import Path
-from sentence_transformers import SentenceTransformer
-
-from src.knowledge_graph.utils.common import read_yaml
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.components.retrieval_service import RetrievalService
+from src.knowledge_graph.components.search_filter import SearchFilter
 from src.knowledge_graph.logger.logging import logger
 
 
 class RAGPipeline:
-    def __init__(self):
-        cfg = read_yaml(Path("config/config.yaml"))
+    """
+    Lightweight per-session handle for the Chainlit app. All sessions of a
+    worker process share one RetrievalService (embedder, memory-mapped
+    FAISS index, metadata); the first session triggers the load.
 
-        self.index_path = cfg["rag"]["faiss"]["index_path"]
-        self.metadata_path = cfg["rag"]["faiss"]["metadata_path"]
-        self.top_k = cfg["rag"]["faiss"]["top_k"]
-
-        self.model = SentenceTransformer(
-            cfg["pipeline_embedd"]["embedding_model"]["name"]
-        )
+    search_filter (set with the /filter chat command) restricts retrieval
+    for this session only.
+    """
 
-        self.index = faiss.read_index(self.index_path)
-
-        with open(self.metadata_path, "r", encoding="utf-8") as f:
-            self.metadata = json.load(f)
+    def __init__(self):
+        self.config = ConfigManager().get_rag_pipeline_config()
+        self.service = RetrievalService.shared(self.config)
+        self.top_k = self.config.faiss.top_k
+        self.search_filter = None
 
         logger.info("RAGPipeline initialized successfully")
 
     def answer(self, question: str):
-        query_vec = self.model.encode(question).astype("float32").reshape(1, -1)
-        _, indices = self.index.search(query_vec, self.top_k)
+        return self._format(self.service.search(question, self.top_k, self.search_filter))
+
+    async def aanswer(self, question: str):
+        """answer() for async callers; retrieval runs off the event loop."""
+        return self._format(await self.service.asearch(question, self.top_k, self.search_filter))
 
-        chunks = [self.metadata[i] for i in indices[0]]
+    def set_filter(self, text):
+        """Parses "/filter" arguments; an empty text clears the filter."""
+        self.search_filter = SearchFilter.parse(text)
+        return self.search_filter
 
+    @staticmethod
+    def _format(chunks):
         answer = "\n".join(c["text"] for c in chunks[:3])
         sources = list(
             set(f"{c['source_type']} → {c['source_name']}" for c in chunks)
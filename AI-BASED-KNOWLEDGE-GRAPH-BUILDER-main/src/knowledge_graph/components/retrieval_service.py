@@ -0,0 +1,296 @@
+import asyncio
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from src.knowledge_graph.utils.resources import (get_resource, get_embedder,
+                                                 get_faiss_index, get_vector_metadata, lazy_import)
+from src.knowledge_graph.components.query_batcher import QueryBatcher
+from src.knowledge_graph.components.vector_store import resolve_shards
+from src.knowledge_graph.components.index_factory import apply_search_params, metric_name, search_parameters
+from src.knowledge_graph.components.search_filter import matching_ids
+from src.knowledge_graph.logger.logging import logger
+
+faiss = lazy_import("faiss")
+
+class RetrievalService:
+    """
+    Vector retrieval shared by every chat session of a worker process.
+
+    One embedder, one FAISS index and one metadata list are loaded per
+    process (see shared()). The index is memory-mapped read-only, so
+    worker processes on the same host share its pages through the OS page
+    cache instead of each holding a private copy. Sessions keep only a
+    reference to this object.
+
+    Thread-safe: FAISS searches on a read-only index run concurrently;
+    encoding is serialized because the tokenizer is not re-entrant.
+
+    asearch() and run_blocking() run the CPU-bound work on a small thread
+    pool so async callers (the Chainlit app) never block the event loop.
+
+    With batch_max_size > 1, concurrent queries from every session go
+    through a QueryBatcher: one encode call and one index.search per batch
+    instead of one per query.
+
+    Queries are encoded with the normalization the index was built with,
+    as recorded in its sidecar, and every hit carries a similarity "score"
+    (higher is closer; cosine for normalized stores).
+
+    A sharded store (see ShardedVectorStore) is searched shard by shard in
+    parallel (FAISS releases the GIL) and the per-shard top-k lists are
+    merged by score.
+
+    A SearchFilter is applied inside index.search through an IDSelector
+    built once per (shard, filter) from the metadata columns, so filtered
+    queries return a full top_k and score only the matching vectors.
+    Shards without matches (e.g. other source types of a store sharded by
+    source_type) are not searched at all.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.top_k = config.faiss.top_k
+
+        self.score_threshold = config.faiss.score_threshold
+
+        self.embedder = get_embedder(config.embedding_model)
+
+        # The generation (of every shard) published when the service
+        # starts; later generations are picked up by new worker processes
+        self.shards = []
+        settings = set()
+        for name, index_path, metadata_path, current in resolve_shards(
+            config.faiss.index_path, config.faiss.metadata_path
+        ):
+            index = get_faiss_index(index_path, mmap=True)
+            apply_search_params(index, config.faiss.nprobe, config.faiss.ef_search)
+            self.shards.append(_Shard(name, index, get_vector_metadata(metadata_path)))
+            settings.add(self._check_store(index, current))
+        if len(settings) > 1:
+            raise ValueError(f"Shards were built with different (metric, normalize): {settings}; "
+                             f"rebuild the vector store")
+        self.metric, self.normalize = settings.pop()
+
+        self._encode_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.faiss.search_workers, thread_name_prefix="retrieval"
+        )
+        # Separate pool: fan-out runs inside search(), which may itself be
+        # running on _executor
+        self._fanout = None
+        if len(self.shards) > 1:
+            self._fanout = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard-search")
+        self.batcher = None
+        if config.faiss.batch_max_size > 1:
+            self.batcher = QueryBatcher(
+                self.search_batch,
+                max_batch_size=config.faiss.batch_max_size,
+                max_wait_ms=config.faiss.batch_max_wait_ms,
+            )
+
+        logger.info(
+            f"RetrievalService ready: {sum(s.index.ntotal for s in self.shards)} vectors "
+            f"in {len(self.shards)} shard(s)"
+        )
+
+    @classmethod
+    def shared(cls, config):
+        """The process-wide service for this index; built on first call."""
+        return get_resource(
+            ("retrieval_service", str(config.faiss.index_path)), lambda: cls(config)
+        )
+
+    def _check_store(self, index, current):
+        """(metric, normalize) from the sidecar, validated against the loaded index."""
+        metric = metric_name(index)
+        if current is None:
+            logger.warning("Vector store has no sidecar; assuming unnormalized vectors")
+            return metric, False
+
+        settings = current.get("settings", {})
+        if settings.get("metric", metric) != metric:
+            raise ValueError(
+                f"Index {current['index']} uses metric {metric} but its sidecar "
+                f"records {settings['metric']}; rebuild the vector store"
+            )
+        if settings.get("model", self.config.embedding_model) != self.config.embedding_model:
+            raise ValueError(
+                f"Index {current['index']} was built with {settings['model']}, "
+                f"not {self.config.embedding_model}; rebuild the vector store"
+            )
+        return metric, settings.get("normalize", False)
+
+    def encode(self, texts):
+        with self._encode_lock:
+            return self.embedder.encode(
+                texts, convert_to_numpy=True, normalize_embeddings=self.normalize
+            ).astype("float32")
+
+    def _similarity(self, distances):
+        if self.metric == "ip":
+            return distances
+        if self.normalize:
+            # Squared L2 between unit vectors is 2 - 2*cosine
+            return 1.0 - distances / 2.0
+        return -distances
+
+    def _fan_out(self, plan, query_vecs, k):
+        """Searches every (shard, query rows, restriction) of plan, in parallel."""
+        def search(step):
+            shard, rows, restriction = step
+            return shard.search(query_vecs[rows], k, restriction)
+
+        if self._fanout is None or len(plan) == 1:
+            return [search(step) for step in plan]
+        return list(self._fanout.map(search, plan))
+
+    def search_batch(self, questions, top_ks, search_filters=None):
+        """
+        One encode, and one index.search per shard and distinct filter,
+        for a list of questions.
+        """
+        search_filters = search_filters or [None] * len(questions)
+        query_vecs = self.encode(questions)
+
+        # Which queries each shard answers, grouped by filter
+        groups = {}
+        for q, search_filter in enumerate(search_filters):
+            for shard in self.shards:
+                groups.setdefault((shard, search_filter), []).append(q)
+        plan = []
+        for (shard, search_filter), rows in groups.items():
+            restriction = shard.restriction(search_filter)
+            if restriction is not _NO_MATCH:
+                plan.append((shard, rows, restriction))
+
+        candidates = [[] for _ in questions]
+        for (shard, rows, _), (distances, indices) in zip(plan, self._fan_out(plan, query_vecs, max(top_ks))):
+            for q, ids, scores in zip(rows, indices.tolist(), self._similarity(distances).tolist()):
+                candidates[q].extend((score, i, shard) for i, score in zip(ids, scores) if i >= 0)
+
+        results = []
+        for found, k in zip(candidates, top_ks):
+            hits = []
+            for score, i, shard in sorted(found, key=lambda c: c[0], reverse=True)[:k]:
+                # Hits are ranked, so everything after the first miss scores lower
+                if self.score_threshold is not None and score < self.score_threshold:
+                    break
+                meta = shard.metadata.get(i)
+                if meta is not None:
+                    hits.append({**meta, "score": score})
+            results.append(hits)
+        return results
+
+    def search(self, question, top_k=None, search_filter=None):
+        """
+        Returns the metadata, plus "score", of the top_k chunks closest to
+        question, optionally only among chunks matching a SearchFilter.
+        """
+        top_k = top_k or self.top_k
+        if self.batcher:
+            return self.batcher.submit(question, top_k, search_filter).result()
+        return self.search_batch([question], [top_k], [search_filter])[0]
+
+    # ---------- ASYNC ----------
+    async def run_blocking(self, fn, *args):
+        """Runs fn(*args) on the retrieval thread pool and awaits the result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def asearch(self, question, top_k=None, search_filter=None):
+        """search() without blocking the event loop."""
+        if self.batcher:
+            future = self.batcher.submit(question, top_k or self.top_k, search_filter)
+            return await asyncio.wrap_future(future)
+        return await self.run_blocking(self.search, question, top_k, search_filter)
+
+
+# Restriction of a filter no chunk of the shard matches
+_NO_MATCH = object()
+# Distinct filters whose restrictions are kept per shard
+_RESTRICTION_CACHE_SIZE = 64
+# Filters matching at most this many chunks are scored exactly where the
+# index can reconstruct vectors: a graph traversal cannot be relied on to
+# reach a handful of scattered ids
+_EXACT_FILTER_MAX = 4096
+
+
+class _Shard:
+    """One searchable partition: its FAISS index, chunk metadata and filter restrictions."""
+
+    def __init__(self, name, index, metadata):
+        self.name = name
+        self.index = index
+        self.metadata = metadata
+        self.metric = metric_name(index)
+        self._restrictions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, query_vecs, k, restriction=None):
+        if isinstance(restriction, _ExactSet):
+            return restriction.search(query_vecs, k, self.metric)
+        return self.index.search(query_vecs, k, params=restriction)
+
+    def restriction(self, search_filter):
+        """
+        How to search the chunks matching search_filter: None when every
+        chunk matches, _NO_MATCH when none does, an _ExactSet for small
+        matches, otherwise IDSelector search parameters. Cached per filter.
+        """
+        if search_filter is None:
+            return None
+        with self._lock:
+            if search_filter in self._restrictions:
+                self._restrictions.move_to_end(search_filter)
+                return self._restrictions[search_filter]
+
+        ids = matching_ids(self.metadata, search_filter)
+        logger.info(f"Filter {search_filter} matches {len(ids)} chunks of shard {self.name!r}")
+        if len(ids) == 0:
+            restriction = _NO_MATCH
+        elif len(ids) >= self.index.ntotal:
+            restriction = None
+        else:
+            restriction = self._small_set(ids) if len(ids) <= _EXACT_FILTER_MAX else None
+            if restriction is None:
+                restriction = search_parameters(self.index, faiss.IDSelectorBatch(ids), matches=len(ids))
+
+        with self._lock:
+            self._restrictions[search_filter] = restriction
+            if len(self._restrictions) > _RESTRICTION_CACHE_SIZE:
+                self._restrictions.popitem(last=False)
+        return restriction
+
+    def _small_set(self, ids):
+        """_ExactSet of ids, or None when the index cannot reconstruct vectors (IVF)."""
+        try:
+            return _ExactSet(ids, self.index.reconstruct_batch(ids))
+        except RuntimeError:
+            return None
+
+
+class _ExactSet:
+    """A few matching chunks and their (decoded) vectors, scored by brute force."""
+
+    def __init__(self, ids, vectors):
+        self.ids = ids
+        self.vectors = vectors
+
+    def search(self, query_vecs, k, metric):
+        """(distances, ids) laid out like index.search, padded with -1 ids."""
+        products = query_vecs @ self.vectors.T
+        if metric == "ip":
+            order = np.argsort(-products, axis=1, kind="stable")[:, :k]
+        else:
+            products = ((query_vecs ** 2).sum(axis=1)[:, None] - 2 * products
+                        + (self.vectors ** 2).sum(axis=1)[None, :])
+            order = np.argsort(products, axis=1, kind="stable")[:, :k]
+
+        distances = np.full((len(query_vecs), k), -np.inf if metric == "ip" else np.inf, dtype=np.float32)
+        ids = np.full((len(query_vecs), k), -1, dtype=np.int64)
+        distances[:, :order.shape[1]] = np.take_along_axis(products, order, axis=1)
+        ids[:, :order.shape[1]] = self.ids[order]
+        return distances, ids
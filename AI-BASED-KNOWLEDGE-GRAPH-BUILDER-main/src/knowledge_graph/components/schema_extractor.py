@@ -0,0 +1,152 @@
+import os
+import re
+from collections import defaultdict
+
+import yaml
+import pandas as pd
+
+from src.knowledge_graph.utils.common import read_json
+from src.knowledge_graph.logger.logging import logger
+
+# Rows per table extracted in one vectorized pass
+_BATCH_ROWS = 10_000
+STRUCTURED_SOURCES = ("csv", "database")
+
+
+def _clean_names(names):
+    """DataTransformation.clean_text over a whole column."""
+    return (names.str.strip().str.lower()
+            .str.replace('"', "", regex=False).str.replace("'", "", regex=False))
+
+
+class SchemaExtractor:
+    """
+    Entities and relations of structured rows, read from their columns as
+    declared in schema/schema.yaml instead of by spaCy NER.
+
+    Ingestion keeps each row's values (metadata "values", in the column
+    order of its table in tables_json) next to the rendered text. Rows are
+    buffered per table and every _BATCH_ROWS of them are turned into
+    columns, then into entity ids and relation rows with column
+    operations. Rows ingested before values were recorded fall back to a
+    regex over the "col: val, col: val" text, which mis-splits a value
+    containing ", <column>: "; re-ingest such tables to avoid it. Entity
+    ids follow the NER scheme
+    ("<clean name>_<LABEL>"), so the same company found in an email and in
+    a CSV row is one graph node.
+    """
+
+    def __init__(self, schema_path, tables_json):
+        self.schema = {}
+        if schema_path and os.path.exists(schema_path):
+            with open(schema_path, "r", encoding="utf-8") as f:
+                self.schema = (yaml.safe_load(f) or {}).get("tables") or {}
+        self.tables = read_json(tables_json) if tables_json and os.path.exists(tables_json) else {}
+        for name, table in self.schema.items():
+            self._validate(name, table)
+
+        self._pending = defaultdict(list)
+        self._patterns = {}
+        self.rows = 0
+
+    @staticmethod
+    def _validate(name, table):
+        entities = table.get("entities") or {}
+        for entity, spec in entities.items():
+            if not spec.get("label") or not (spec.get("column") or spec.get("columns")):
+                raise ValueError(f"schema.yaml: {name}.{entity} needs a label and a column (or columns)")
+        for relation in table.get("relations") or []:
+            if len(relation) != 3 or relation[0] not in entities or relation[2] not in entities:
+                raise ValueError(f"schema.yaml: {name} relation {relation} must be [entity, RELATION, entity]")
+
+    def handles(self, record):
+        """Whether record is a structured row of a table the schema maps."""
+        return (record.get("source_type") in STRUCTURED_SOURCES
+                and record.get("source_name") in self.schema
+                and (record.get("metadata") or {}).get("table") in self.tables)
+
+    def add(self, record):
+        """Buffers a row; returns (entities, relationships) when its table's batch is full."""
+        ref = record["metadata"]["table"]
+        pending = self._pending[ref]
+        pending.append(record)
+        if len(pending) >= _BATCH_ROWS:
+            return self._extract(ref)
+        return None
+
+    def flush(self):
+        """(entities, relationships) of every table still buffered."""
+        for ref in list(self._pending):
+            yield self._extract(ref)
+
+    def _column_pattern(self, ref, column):
+        """Regex capturing column's value out of a rendered row of table ref (legacy rows)."""
+        key = (ref, column)
+        if key not in self._patterns:
+            # A value runs until the next ", <known column>: " or the end of the row
+            following = "|".join(re.escape(c) for c in self.tables[ref]["columns"])
+            self._patterns[key] = rf"(?:^|, ){re.escape(column)}: (.*?)(?=, (?:{following}): |$)"
+        return self._patterns[key]
+
+    def _extract(self, ref):
+        records = self._pending.pop(ref)
+        self.rows += len(records)
+        table = self.tables[ref]
+        spec = self.schema[table["source_name"]]
+
+        texts = pd.Series([r["text"] for r in records], dtype=object)
+        doc_ids = pd.Series([r.get("id") for r in records])
+        row_values = [r["metadata"].get("values") for r in records]
+        legacy = pd.Series([values is None for values in row_values])
+        columns = {}
+
+        def column(name):
+            if name not in columns:
+                if name not in table["columns"]:
+                    logger.warning(f"schema.yaml: {table['source_name']} has no column {name!r}")
+                    columns[name] = pd.Series([None] * len(texts), dtype=object)
+                else:
+                    i = table["columns"].index(name)
+                    found = pd.Series([None if values is None else values[i] for values in row_values],
+                                      dtype=object)
+                    if legacy.any():
+                        found[legacy] = texts[legacy].str.extract(self._column_pattern(ref, name), expand=False)
+                    columns[name] = found
+            return columns[name]
+
+        # entity -> (ids, names) per row; NaN where the row has no value
+        values = {}
+        entities = []
+        for entity, entity_spec in (spec.get("entities") or {}).items():
+            names = None
+            for name in entity_spec.get("columns") or [entity_spec["column"]]:
+                names = column(name) if names is None else names.str.cat(column(name), sep=" ")
+            names = names.str.strip()
+            names = names.where(names.str.len() > 0)
+            label = entity_spec["label"]
+            ids = _clean_names(names) + f"_{label}"
+            values[entity] = (ids, names)
+
+            found = pd.DataFrame({"id": ids, "name": names, "label": label, "doc_id": doc_ids}).dropna(subset=["id"])
+            entities.append(found.drop_duplicates("id"))
+
+        relationships = []
+        for subject, relation, obj in spec.get("relations") or []:
+            relation = str(relation).strip().replace(" ", "_").upper()
+            (subject_ids, subject_names), (object_ids, object_names) = values[subject], values[obj]
+            rows = pd.DataFrame({
+                "relation_id": subject_ids + f"|{relation}|" + object_ids,
+                "subject_id": subject_ids,
+                "subject_name": subject_names,
+                "relation": relation,
+                "object_id": object_ids,
+                "object_name": object_names,
+                "sentence": texts,
+                "doc_id": doc_ids,
+            }).dropna(subset=["subject_id", "object_id"])
+            rows = rows[rows["subject_id"] != rows["object_id"]]
+            relationships.append(rows.drop_duplicates("relation_id"))
+
+        entities = pd.concat(entities).drop_duplicates("id") if entities else pd.DataFrame()
+        relationships = pd.concat(relationships) if relationships else pd.DataFrame()
+        return entities.to_dict("records"), relationships.to_dict("records")
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def document_date(doc):
+    """
+    ISO 8601 (UTC) date of an input record, stored as chunk "created_at":
+    the Date header of emails, otherwise the ingestion timestamp.
+    """
+    header = ((doc.get("metadata") or {}).get("date") or "").strip()
+    if header:
+        # RFC 2822 headers first, then ISO dates ("Date: 2024-10-01") as in
+        # the sample emails
+        for parse in (parsedate_to_datetime, datetime.fromisoformat):
+            try:
+                date = parse(header)
+            except (TypeError, ValueError):
+                continue
+            if date is None:
+                continue
+            if date.tzinfo is not None:
+                date = date.astimezone(timezone.utc).replace(tzinfo=None)
+            return date.isoformat()
+    return doc.get("ingestion_timestamp")
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """
+    Restricts vector search to chunks whose metadata matches every given
+    field. created_after is inclusive, created_before exclusive; both are
+    compared as ISO prefixes, so "2024-10" .. "2024-11" is all of October.
+
+    Hashable, so the FAISS selector built for a filter is cached and
+    queries with the same filter are batched together.
+    """
+    source_types: Optional[Tuple[str, ...]] = None
+    source_names: Optional[Tuple[str, ...]] = None
+    created_after: Optional[str] = None
+    created_before: Optional[str] = None
+
+    # Chat command keys (/filter source=email from=2024-10 to=2024-11)
+    KEYS = {"source": "source_types", "name": "source_names", "from": "created_after", "to": "created_before"}
+
+    @classmethod
+    def parse(cls, text):
+        """SearchFilter from "key=value[,value] ..." pairs; None when empty."""
+        fields = {}
+        for part in text.split():
+            key, sep, value = part.partition("=")
+            if not sep or key not in cls.KEYS or not value:
+                raise ValueError(f"Invalid filter {part!r}; use {', '.join(f'{k}=...' for k in cls.KEYS)}")
+            field = cls.KEYS[key]
+            fields[field] = tuple(value.split(",")) if field in ("source_types", "source_names") else value
+        return cls(**fields) if fields else None
+
+    def __str__(self):
+        parts = []
+        for key, field in self.KEYS.items():
+            value = getattr(self, field)
+            if value:
+                parts.append(f"{key}={','.join(value) if isinstance(value, tuple) else value}")
+        return " ".join(parts)
+
+    def date_matches(self, value):
+        if not (self.created_after or self.created_before):
+            return True
+        if value is None:
+            return False
+        if self.created_after and value < self.created_after:
+            return False
+        return not (self.created_before and value >= self.created_before)
+
+    def matches(self, meta):
+        return (
+            (not self.source_types or meta.get("source_type") in self.source_types)
+            and (not self.source_names or meta.get("source_name") in self.source_names)
+            and self.date_matches(meta.get("created_at"))
+        )
+
+
+def matching_ids(metadata, search_filter):
+    """
+    Sorted chunk ids of metadata that pass search_filter: vectorized over
+    the columnar store's interned document columns, or a scan of a legacy
+    metadata dict.
+    """
+    if hasattr(metadata, "select"):
+        return metadata.select(search_filter)
+    return np.asarray(sorted(i for i, meta in metadata.items() if search_filter.matches(meta)), dtype=np.int64)
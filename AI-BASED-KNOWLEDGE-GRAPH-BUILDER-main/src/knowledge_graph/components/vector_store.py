@@ -0,0 +1,270 @@
+import os
+import re
+import glob
+import zlib
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from src.knowledge_graph.utils.common import read_json, write_json
+from src.knowledge_graph.utils.resources import lazy_import
+from src.knowledge_graph.components.metadata_store import MetadataStore, MetadataWriter
+from src.knowledge_graph.logger.logging import logger
+
+faiss = lazy_import("faiss")
+
+# Chunk ids are (document id << CHUNK_ID_BITS) | chunk offset, so a
+# document's chunks keep the same 64-bit ids across runs
+CHUNK_ID_BITS = 20
+KEEP_GENERATIONS = 2
+SHARD_BY = ("none", "source_type", "hash")
+
+
+def make_chunk_id(doc_id, offset):
+    if offset >= 1 << CHUNK_ID_BITS:
+        raise ValueError(f"Document {doc_id} has more than {1 << CHUNK_ID_BITS} chunks")
+    return (int(doc_id) << CHUNK_ID_BITS) | offset
+
+
+def chunk_doc_id(chunk_id):
+    return int(chunk_id) >> CHUNK_ID_BITS
+
+
+def _pointer_path(index_path):
+    return f"{index_path}.current"
+
+
+def _generation_path(path, generation, suffix=None):
+    base, ext = os.path.splitext(str(path))
+    return f"{base}.g{generation}{ext if suffix is None else suffix}"
+
+
+def current_generation(index_path):
+    """Sidecar of the published generation, or None for a legacy store."""
+    pointer = _pointer_path(index_path)
+    if not os.path.exists(pointer):
+        return None
+    return read_json(pointer)
+
+
+def resolve_store(index_path, metadata_path):
+    """(index file, metadata file) that readers should open right now."""
+    current = current_generation(index_path)
+    if current is None:
+        return str(index_path), str(metadata_path)
+    return current["index"], current["metadata"]
+
+
+def _shards_path(index_path):
+    return f"{index_path}.shards"
+
+
+def shard_manifest(index_path):
+    """{"shard_by", "num_shards", "shards"} of a sharded store, or None."""
+    path = _shards_path(index_path)
+    if not os.path.exists(path):
+        return None
+    return read_json(path)
+
+
+def shard_name(source_type):
+    """Shard of a source_type; also used to map query filters onto shards."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(source_type or "unknown"))
+
+
+def resolve_shards(index_path, metadata_path):
+    """
+    [(shard name, index file, metadata path, sidecar or None)] that readers
+    should open right now; a single ("", ...) entry for an unsharded store.
+    """
+    manifest = shard_manifest(index_path)
+    if manifest is None:
+        index_file, metadata_file = resolve_store(index_path, metadata_path)
+        return [("", index_file, metadata_file, current_generation(index_path))]
+
+    sharded = ShardedVectorStore(index_path, metadata_path, manifest["shard_by"], manifest["num_shards"])
+    shards = []
+    for name in manifest["shards"]:
+        store = sharded.store(name)
+        current = current_generation(store.index_path)
+        shards.append((name, current["index"], current["metadata"], current))
+    return shards
+
+
+class VectorStore:
+    """
+    Versioned FAISS index + chunk metadata.
+
+    Every publish() writes a new generation (faiss.g<N>.index, the
+    columnar metadata.g<N>/ store and a per-document text hash table) and
+    then swaps the faiss.index.current sidecar with os.replace. Readers
+    resolve the sidecar first, so they always see a complete
+    index/metadata pair; the previous generation is kept so processes
+    still mapping it are safe.
+    """
+
+    def __init__(self, index_path, metadata_path):
+        self.index_path = str(index_path)
+        self.metadata_path = str(metadata_path)
+
+    def load(self, settings):
+        """
+        (index, metadata store, documents) of the current generation, or
+        None when there is none or it was built with different settings
+        (model, chunking) or in an older layout.
+        """
+        current = current_generation(self.index_path)
+        if current is None:
+            return None
+        if current.get("settings") != settings:
+            logger.info("Vector store settings changed, rebuilding from scratch")
+            return None
+
+        if not os.path.isdir(current["metadata"]):
+            logger.info("Vector store metadata is in an older format, rebuilding from scratch")
+            return None
+
+        index = faiss.read_index(current["index"])
+        metadata = MetadataStore(current["metadata"])
+        documents = read_json(current["documents"])
+        return index, metadata, documents
+
+    def begin(self):
+        """GenerationWriter for the next generation; nothing is visible until commit()."""
+        current = current_generation(self.index_path)
+        return GenerationWriter(self, current["generation"] + 1 if current else 1)
+
+    def publish(self, index, metadata, documents, settings):
+        """metadata: iterable of chunk records (chunk_id, doc_id, text, ...)."""
+        writer = self.begin()
+        writer.extend(metadata)
+        return writer.commit(index, documents, settings)
+
+    def _prune(self, generation):
+        for path in (self.index_path, self.metadata_path):
+            base, ext = os.path.splitext(path)
+            for old in glob.glob(f"{glob.escape(base)}.g*"):
+                tag = old[len(base) + 2:].split(".", 1)[0]
+                if tag.isdigit() and int(tag) <= generation - KEEP_GENERATIONS:
+                    if os.path.isdir(old):
+                        shutil.rmtree(old)
+                    else:
+                        os.remove(old)
+
+    @staticmethod
+    def kept_records(metadata, doc_ids):
+        """Records of the metadata store not belonging to doc_ids, read lazily."""
+        if metadata is None:
+            return iter(())
+        stale = np.isin(metadata.doc_ids(), np.fromiter(doc_ids, dtype=np.int64))
+        return metadata.records(np.flatnonzero(~stale))
+
+
+class ShardedVectorStore:
+    """
+    Chunks partitioned into independent VectorStores, one per shard, under
+    <index dir>/shards/<name>/. Documents go to a shard by source_type or
+    by a hash of their id (num_shards buckets); "none" keeps the single
+    store at index_path.
+
+    Each shard publishes its own generations, so shards are rebuilt one at
+    a time. The faiss.index.shards manifest lists the shards readers should
+    search and is swapped with os.replace after the shards it names are
+    published.
+    """
+
+    def __init__(self, index_path, metadata_path, shard_by="none", num_shards=1):
+        if shard_by not in SHARD_BY:
+            raise ValueError(f"Unknown vector_store.shard_by {shard_by!r}, expected one of {SHARD_BY}")
+        self.index_path = str(index_path)
+        self.metadata_path = str(metadata_path)
+        self.shard_by = shard_by
+        self.num_shards = max(1, int(num_shards)) if shard_by == "hash" else 1
+
+    def shard_of(self, doc):
+        if self.shard_by == "source_type":
+            return shard_name(doc.get("source_type"))
+        if self.shard_by == "hash":
+            return f"shard-{zlib.crc32(str(doc.get('id')).encode()) % self.num_shards:03d}"
+        return ""
+
+    def store(self, name):
+        if not name:
+            return VectorStore(self.index_path, self.metadata_path)
+        root = os.path.join(os.path.dirname(self.index_path), "shards", name)
+        return VectorStore(
+            os.path.join(root, os.path.basename(self.index_path)),
+            os.path.join(root, os.path.basename(self.metadata_path)),
+        )
+
+    def names(self):
+        """Shards currently published for this layout."""
+        if self.shard_by == "none":
+            return [""] if current_generation(self.index_path) else []
+        manifest = shard_manifest(self.index_path)
+        if manifest is None or (manifest["shard_by"], manifest["num_shards"]) != (self.shard_by, self.num_shards):
+            return []
+        return list(manifest["shards"])
+
+    def write_manifest(self, names):
+        path = _shards_path(self.index_path)
+        if self.shard_by == "none":
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        write_json(path + ".tmp", {
+            "shard_by": self.shard_by,
+            "num_shards": self.num_shards,
+            "shards": sorted(names),
+            "created_at": datetime.now().isoformat(),
+        })
+        os.replace(path + ".tmp", path)
+        logger.info(f"Published {len(names)} vector store shards by {self.shard_by}")
+
+
+class GenerationWriter:
+    """
+    One generation of a VectorStore being written: chunk metadata is
+    appended as it is produced, and commit() writes the index and document
+    hashes and swaps the faiss.index.current sidecar. abort() discards it.
+    """
+
+    def __init__(self, store, generation):
+        self.store = store
+        self.generation = generation
+        self.paths = {
+            "index": _generation_path(store.index_path, generation),
+            "metadata": _generation_path(store.metadata_path, generation, ""),
+            "documents": _generation_path(store.index_path, generation, ".docs.json"),
+        }
+        # Left behind by an interrupted run
+        shutil.rmtree(self.paths["metadata"], ignore_errors=True)
+        self.metadata = MetadataWriter(self.paths["metadata"])
+
+    def extend(self, records):
+        self.metadata.extend(records)
+
+    def commit(self, index, documents, settings):
+        os.makedirs(os.path.dirname(self.store.index_path), exist_ok=True)
+        faiss.write_index(index, self.paths["index"])
+        self.metadata.close()
+        write_json(self.paths["documents"], documents)
+
+        pointer = _pointer_path(self.store.index_path)
+        write_json(pointer + ".tmp", {
+            "generation": self.generation,
+            **self.paths,
+            "ntotal": int(index.ntotal),
+            "settings": settings,
+            "created_at": datetime.now().isoformat(),
+        })
+        os.replace(pointer + ".tmp", pointer)
+        logger.info(f"Published vector store generation {self.generation}: {index.ntotal} vectors")
+
+        self.store._prune(self.generation)
+        return self.generation
+
+    def abort(self):
+        self.metadata.discard()
+        shutil.rmtree(self.paths["metadata"], ignore_errors=True)
@@ -1,16 +1,21 @@
 from src.knowledge_graph.utils.common import read_yaml
-from src.knowledge_graph.entity.config_entity import (DataIngestionConfig,DataTransformationConfig,
+from src.knowledge_graph.entity.config_entity import (DataIngestionConfig,DatabaseIngestionConfig,PdfIngestionConfig,DataTransformationConfig,NLPConfig,GraphLoaderConfig,
                                                       EmbeddingPipelineConfig,ChunkingConfig,EmbeddingModelConfig,
+                                                      EmbeddingCacheConfig,EncoderConfig,
                                                       VectorStoreConfig,
                                                       faiss_data,llmconfig,neo4j_config,Ragpipelineconfig)
 from src.knowledge_graph.constants import *
 
 class ConfigManager:
-    def __init__(self, config_path=CONFIG_FILE_PATH):
+    def __init__(self, config_path=CONFIG_FILE_PATH, schema_path=SCHEMA_FILE_PATH):
         self.config = read_yaml(config_path)
+        self.schema_path = schema_path
 
     def get_ingestion_data_config(self) -> DataIngestionConfig:
         config = self.config.ingestion_data
+        db = config.get("database", {})
+        pdf = config.get("pdf", {})
+        tables = db.get("tables")
         return DataIngestionConfig(
             root_dir=config.root_dir,
             email_dir=config.email_dir,
@@ -18,6 +23,24 @@ class ConfigManager:
             csv_dir=config.csv_dir,
             db_path=config.db_path,
             output_json=config.output_json,
+            tables_json=config.get("tables_json"),
+            num_workers=config.get("num_workers", 1),
+            database=DatabaseIngestionConfig(
+                immutable=db.get("immutable", False),
+                page_size=db.get("page_size", 10000),
+                fetch_size=db.get("fetch_size", 1000),
+                tables=tables.to_dict() if tables else None,
+            ),
+            pdf=PdfIngestionConfig(
+                mode=pdf.get("mode", "document"),
+                pages_per_record=pdf.get("pages_per_record", 1),
+                page_workers=pdf.get("page_workers", 1),
+                min_parallel_pages=pdf.get("min_parallel_pages", 64),
+                cache_dir=pdf.get("cache_dir"),
+            ),
+            incremental=config.get("incremental", False),
+            manifest_path=config.get("manifest_path"),
+            delta_json=config.get("delta_json"),
         )
     def get_transform_data_config(self) -> DataTransformationConfig:
         config = self.config.transform_data
@@ -29,6 +52,12 @@ class ConfigManager:
             neo4j_uri=config.neo4j.uri,
             neo4j_username=config.neo4j.username,
             neo4j_password=config.neo4j.password,
+            neo4j_database=config.neo4j.get("database", "rag-kg-db"),
+            graph_loader=GraphLoaderConfig(**config.get("graph_loader", {})),
+            parsed_output=config.get("parsed_output"),
+            nlp=NLPConfig(**config.get("nlp", {})),
+            schema_path=self.schema_path,
+            tables_json=config.get("tables_json"),
         )
     def get_pipeline_embedd_config(self) -> EmbeddingPipelineConfig:
         config = self.config.pipeline_embedd
@@ -39,10 +68,10 @@ class ConfigManager:
                                     chunk_overlap=config.chunking.chunk_overlap),
             embedding_model=EmbeddingModelConfig(name = config.embedding_model.name,
                                                 embedding_dim=config.embedding_model.embedding_dim),
-            vector_store=VectorStoreConfig(type = config.vector_store.type,
-                                        index_type=config.vector_store.index_type,
-                                        index_path = config.vector_store.index_path,
-                                        metadata_path= config.vector_store.metadata_path)
+            vector_store=VectorStoreConfig(**config.vector_store),
+            cache=EmbeddingCacheConfig(**config.get("cache", {})),
+            batch_size=config.get("batch_size", 1024),
+            encoder=EncoderConfig(**config.get("encoder", {}))
         )
     
     def get_rag_pipeline_config(self)->Ragpipelineconfig:
@@ -52,12 +81,19 @@ class ConfigManager:
             input_json = config.input_json,
             faiss = faiss_data(index_path = config.faiss.index_path,
                         metadata_path = config.faiss.metadata_path,
-                        top_k = config.faiss.top_k),
+                        top_k = config.faiss.top_k,
+                        score_threshold = config.faiss.get("score_threshold"),
+                        nprobe = config.faiss.get("nprobe", 0),
+                        ef_search = config.faiss.get("ef_search", 0),
+                        search_workers = config.faiss.get("search_workers", 4),
+                        batch_max_size = config.faiss.get("batch_max_size", 32),
+                        batch_max_wait_ms = config.faiss.get("batch_max_wait_ms", 5.0)),
             neo4j = neo4j_config(uri = config.neo4j.uri,
                         username = config.neo4j.username,
                         password = config.neo4j.password),
             llm = llmconfig(provider = config.llm.provider,
                         model = config.llm.model,
                         temperature = config.llm.temperature,
-                        max_tokens = config.llm.max_tokens)  
+                        max_tokens = config.llm.max_tokens),
+            embedding_model = self.config.pipeline_embedd.embedding_model.name
         )
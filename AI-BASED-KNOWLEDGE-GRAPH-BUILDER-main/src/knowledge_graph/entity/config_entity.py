@@ -1,7 +1,24 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 #data ingestion part
+@dataclass
+class DatabaseIngestionConfig:
+    immutable: bool = False
+    page_size: int = 10000
+    fetch_size: int = 1000
+    # {table: {columns: [...], where: "..."}}; None ingests every table
+    tables: dict = None
+
+@dataclass
+class PdfIngestionConfig:
+    # "document": one record per PDF, "page": one per pages_per_record pages
+    mode: str = "document"
+    pages_per_record: int = 1
+    page_workers: int = 1
+    min_parallel_pages: int = 64
+    cache_dir: Path = None
+
 @dataclass
 class DataIngestionConfig:
     root_dir: Path
@@ -10,8 +27,34 @@ class DataIngestionConfig:
     csv_dir: Path
     db_path: Path
     output_json: str
+    tables_json: str = None
+    num_workers: int = 1
+    database: DatabaseIngestionConfig = field(default_factory=DatabaseIngestionConfig)
+    pdf: PdfIngestionConfig = field(default_factory=PdfIngestionConfig)
+    incremental: bool = False
+    manifest_path: Path = None
+    delta_json: str = None
 
 #datatransformation part
+@dataclass
+class NLPConfig:
+    model: str = "en_core_web_sm"
+    # Texts per nlp.pipe batch and parsing processes
+    batch_size: int = 64
+    n_process: int = 1
+    # Longer texts are parsed in pieces cut at paragraph/sentence breaks
+    max_length: int = 100_000
+
+@dataclass
+class GraphLoaderConfig:
+    # Rows per UNWIND statement / transaction
+    batch_size: int = 5000
+    # Concurrent writer sessions; 1 writes batches one after another
+    workers: int = 1
+    # Attempts per batch on retryable errors, with exponential backoff
+    max_retries: int = 5
+    retry_backoff_s: float = 0.5
+
 @dataclass
 class DataTransformationConfig:
     input_json: Path
@@ -21,6 +64,16 @@ class DataTransformationConfig:
     neo4j_uri: str
     neo4j_username: str
     neo4j_password: str
+    # Directory of spaCy DocBin shards of the parsed documents, reused by
+    # reruns; None disables it
+    parsed_output: Path = None
+    nlp: NLPConfig = field(default_factory=NLPConfig)
+    # Column -> entity/relation mappings for CSV/DB rows, and the table
+    # columns written by ingestion; rows of mapped tables skip spaCy
+    schema_path: Path = None
+    tables_json: Path = None
+    neo4j_database: str = "rag-kg-db"
+    graph_loader: GraphLoaderConfig = field(default_factory=GraphLoaderConfig)
 
 #data embedding part
 @dataclass
@@ -39,6 +92,39 @@ class VectorStoreConfig:
     index_type: str
     index_path: Path
     metadata_path: Path
+    incremental: bool = False
+    # Cosine retrieval: unit-length vectors searched by inner product
+    metric: str = "ip"
+    normalize: bool = True
+    # ANN build options (see components/index_factory.py); nlist 0 = auto
+    nlist: int = 0
+    pq_m: int = 16
+    pq_bits: int = 8
+    hnsw_m: int = 32
+    train_sample: int = 100_000
+    # Stored vector encoding: none (float32) | fp16 | int8 | pq
+    quantization: str = "none"
+    # Partition chunks into shard indexes: none | source_type | hash
+    shard_by: str = "none"
+    num_shards: int = 4
+
+@dataclass
+class EmbeddingCacheConfig:
+    enabled: bool = True
+    cache_dir: Path = "artifacts/embeddings/cache"
+    # Least recently used vectors are evicted beyond this many entries
+    max_entries: int = 1_000_000
+    # float32, or float16 to halve the cache size
+    dtype: str = "float32"
+
+@dataclass
+class EncoderConfig:
+    # Encoder processes on CPU; 0 encodes in the calling process
+    workers: int = 0
+    # torch threads per process; 0 splits the cores evenly between workers
+    threads_per_worker: int = 0
+    # Texts per model forward pass, grouped by token length
+    batch_size: int = 32
 
 @dataclass
 class EmbeddingPipelineConfig:
@@ -46,6 +132,10 @@ class EmbeddingPipelineConfig:
     chunking: ChunkingConfig
     embedding_model: EmbeddingModelConfig
     vector_store: VectorStoreConfig
+    cache: EmbeddingCacheConfig = field(default_factory=EmbeddingCacheConfig)
+    # Chunks encoded and added to the index per step; bounds peak memory
+    batch_size: int = 1024
+    encoder: EncoderConfig = field(default_factory=EncoderConfig)
 
 #Rag part
 @dataclass
@@ -53,6 +143,16 @@ class faiss_data:
     index_path: Path
     metadata_path: Path
     top_k: int
+    # Threads that run encode/search for the async query path
+    search_workers: int = 4
+    # Results scoring below this similarity are dropped; None keeps all
+    score_threshold: float = None
+    # Query-time ANN knobs; 0 keeps the index default
+    nprobe: int = 0
+    ef_search: int = 0
+    # Micro-batching of concurrent queries; batch_max_size 1 disables it
+    batch_max_size: int = 32
+    batch_max_wait_ms: float = 5.0
 
 @dataclass
 class llmconfig:
@@ -73,3 +173,4 @@ class Ragpipelineconfig:
     faiss: faiss_data
     neo4j: neo4j_config
     llm: llmconfig
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
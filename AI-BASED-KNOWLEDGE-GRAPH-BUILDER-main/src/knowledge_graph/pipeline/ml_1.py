@@ -1,5 +1,6 @@
 from src.knowledge_graph.config.configuration import ConfigManager
-from src.knowledge_graph.components.ingestion_data import DataIngestion
+from src.knowledge_graph.components.data_ingestion import DataIngestion
+from src.knowledge_graph.components.incremental_ingestion import IncrementalDataIngestion
 from src.knowledge_graph.exception.exception import KGException
 import sys
 
@@ -15,7 +16,10 @@ class DataIngestionTrainingPipeline:
             config = ConfigManager()
             di_config = config.get_ingestion_data_config()
 
-            ingestion = DataIngestion(di_config)
+            if di_config.incremental:
+                ingestion = IncrementalDataIngestion(di_config)
+            else:
+                ingestion = DataIngestion(di_config)
             ingestion.ingest()
 
             print(">>> Data Ingestion completed successfully")
@@ -1,55 +1,43 @@
 import os
-import faiss
-from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
-
-from langchain_groq import ChatGroq
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough
-import spacy
 
 from src.knowledge_graph.components.data_retriever import HybridRetriever
 from src.knowledge_graph.config.configuration import ConfigManager
 from src.knowledge_graph.logger.logging import logger
-from src.knowledge_graph.utils.common import read_json
+from src.knowledge_graph.utils.resources import RAGResources, lazy_import
 from dotenv import load_dotenv
 load_dotenv()
 
+# Heavy modules (faiss, torch, spacy, neo4j) are loaded on first use
+# through RAGResources; the LLM client is imported when the chain is built.
+langchain_groq = lazy_import("langchain_groq")
+
 class RAGPipeline:
         @staticmethod
         def get_rag_chain():
             # 1. Load Config
             config = ConfigManager().get_rag_pipeline_config()
 
-            # 2. Load Resources (Embeddings, FAISS, Graph)
-            # Note: We still use SentenceTransformer for embeddings locally to match your FAISS index
-            embedder = SentenceTransformer('all-MiniLM-L6-v2') 
-
-            index = faiss.read_index(config.faiss.index_path)
-            metadata = read_json(config.faiss.metadata_path)
-                
-            graph = GraphDatabase.driver(
-                os.getenv("NEO_4J_URI"),
-                auth=(config.neo4j.username, os.getenv("PASSWORD"))
+            # 2. Resources (Embeddings, FAISS, Graph) are process-wide and
+            # loaded lazily on the first query, not while building the chain
+            resources = RAGResources(
+                config,
+                graph_uri=os.getenv("NEO_4J_URI"),
+                graph_password=os.getenv("PASSWORD")
             )
 
-            nlp = spacy.load("en_core_web_sm")
-
             # 3. Initialize Retriever
             retriever = HybridRetriever(
-                vector_index=index,
-                vector_metadata=metadata,
-                embedder=embedder,
-                graph=graph,
-                nlp=nlp,
+                resources=resources,
                 top_k_vector= config.faiss.top_k,
                 top_k_graph= 5
             )
             logger.info("LLM Initialzed successfully")
-            llm = ChatGroq(
+            llm = langchain_groq.ChatGroq(
                 model=config.llm.model,
                 groq_api_key=os.getenv("GROQ_API_KEY"),
                 temperature=config.llm.temperature,
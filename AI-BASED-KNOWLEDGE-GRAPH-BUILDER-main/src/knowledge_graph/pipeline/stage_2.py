@@ -1,5 +1,5 @@
 from src.knowledge_graph.config.configuration import ConfigManager
-from src.knowledge_graph.components.transform_data import DataTransformation
+from src.knowledge_graph.components.data_transformation import DataTransformation
 from src.knowledge_graph.exception.exception import KGException
 import sys
 
@@ -17,11 +17,8 @@ class DataTransformationTrainingPipeline:
 
             obj = DataTransformation(dt_config)
 
-            obj.extract_entities()
-            print(">>> Entities extracted")
-
-            obj.extract_relationships()
-            print(">>> Relationships extracted")
+            obj.extract()
+            print(">>> Entities and relationships extracted")
 
             obj.create_triples()
             print(">>> Triples created")
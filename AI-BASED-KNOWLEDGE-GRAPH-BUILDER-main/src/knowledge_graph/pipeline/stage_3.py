@@ -1,4 +1,4 @@
-from src.py.components.pipeline_embedd import EmbeddingPipeline
+from src.knowledge_graph.components.embedding_pipeline import EmbeddingPipeline
 
 from src.knowledge_graph.logger.logging import logger
 from src.knowledge_graph.exception.exception import KGException
@@ -1,10 +1,12 @@
 import os
+import hashlib
 import yaml
 from src.knowledge_graph.logger.logging import logger
 import json
 from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
+from contextlib import contextmanager
 from box.exceptions import BoxValueError
 
 @ensure_annotations
@@ -34,6 +36,15 @@ def read_yaml(path_to_yaml: Path) -> ConfigBox:
         raise e
     
 
+def file_sha256(path):
+    """Hex sha256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def write_json(path, data):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w") as f:
@@ -42,3 +53,48 @@ def write_json(path, data):
 def read_json(path):
     with open(path, "r") as f:
         return json.load(f)
+
+
+@contextmanager
+def record_writer(path):
+    """Streams records to `path` one at a time.
+
+    Writes JSON Lines when the path ends in .jsonl, otherwise a JSON array
+    (the legacy output.json layout), without holding the records in memory.
+
+    Yields:
+        Callable[[dict], None]: function that appends a single record.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    jsonl = str(path).endswith(".jsonl")
+
+    with open(path, "w", encoding="utf-8") as f:
+        first = [True]
+
+        def write(record):
+            line = json.dumps(record, ensure_ascii=False)
+            if jsonl:
+                f.write(line + "\n")
+            else:
+                f.write(("[\n" if first[0] else ",\n") + line)
+            first[0] = False
+
+        yield write
+
+        if not jsonl:
+            f.write("[]" if first[0] else "\n]")
+
+
+def iter_records(path):
+    """Yields records lazily from a .jsonl file.
+
+    Legacy .json arrays are still accepted, but are loaded in one go.
+    """
+    if not str(path).endswith(".jsonl"):
+        yield from read_json(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
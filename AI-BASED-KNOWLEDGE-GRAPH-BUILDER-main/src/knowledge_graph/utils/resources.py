@@ -0,0 +1,168 @@
+import types
+import asyncio
+import threading
+import importlib
+
+from src.knowledge_graph.logger.logging import logger
+
+
+class _LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Defers `import name` until the module is first used, e.g.
+        faiss = lazy_import("faiss")
+    keeps faiss off the import path of entry points that never touch it.
+    """
+    return _LazyModule(name)
+
+
+# ---------- PROCESS-WIDE RESOURCE REGISTRY ----------
+_resources = {}
+# Re-entrant: a loader may itself request other resources
+_lock = threading.RLock()
+
+
+def get_resource(key, loader):
+    """
+    Returns the process-wide instance registered under key, calling
+    loader() the first time it is requested. Thread-safe: concurrent
+    callers wait for a single load instead of loading twice.
+    """
+    try:
+        return _resources[key]
+    except KeyError:
+        pass
+
+    with _lock:
+        if key not in _resources:
+            logger.info(f"Loading shared resource: {key}")
+            _resources[key] = loader()
+        return _resources[key]
+
+
+def get_embedder(model_name):
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return get_resource(("embedder", model_name), load)
+
+
+def get_faiss_index(index_path, mmap=False):
+    """
+    With mmap=True the index is mapped read-only instead of copied onto the
+    heap, so processes reading the same file share its pages.
+    """
+    def load():
+        import faiss
+        if not mmap:
+            return faiss.read_index(str(index_path))
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        try:
+            return faiss.read_index(str(index_path), flags)
+        except RuntimeError as e:
+            logger.warning(f"Cannot memory-map {index_path}, reading it into memory: {e}")
+            return faiss.read_index(str(index_path))
+    return get_resource(("faiss_index", str(index_path), mmap), load)
+
+
+def get_vector_metadata(metadata_path):
+    """
+    Chunk metadata keyed by the id the index returns. Columnar stores
+    (a directory) are memory-mapped and read lazily; a legacy metadata.json
+    list is loaded into a dict keyed by chunk_id or list position.
+    """
+    def load():
+        import os
+        if os.path.isdir(metadata_path):
+            from src.knowledge_graph.components.metadata_store import MetadataStore
+            return MetadataStore(metadata_path)
+
+        from src.knowledge_graph.utils.common import read_json
+        metadata = read_json(metadata_path)
+        return {m.get("chunk_id", i): m for i, m in enumerate(metadata)}
+    return get_resource(("vector_metadata", str(metadata_path)), load)
+
+
+def get_nlp(model_name="en_core_web_sm"):
+    def load():
+        import spacy
+        return spacy.load(model_name)
+    return get_resource(("nlp", model_name), load)
+
+
+def get_graph_driver(uri, username, password):
+    def load():
+        from neo4j import GraphDatabase
+        return GraphDatabase.driver(uri, auth=(username, password))
+    return get_resource(("graph_driver", uri, username), load)
+
+
+def get_async_graph_driver(uri, username, password):
+    """
+    neo4j.AsyncDriver for the running event loop. An async driver's
+    connection pool belongs to the loop it was first used on, so one is
+    kept per loop rather than per process.
+    """
+    loop = asyncio.get_running_loop()
+
+    def load():
+        from neo4j import AsyncGraphDatabase
+        return AsyncGraphDatabase.driver(uri, auth=(username, password))
+    return get_resource(("async_graph_driver", uri, username, id(loop)), load)
+
+
+class RAGResources:
+    """
+    Lazy handles to the models and indexes the RAG path uses. Nothing is
+    loaded until a property is first read, and every instance shares the
+    same process-wide objects, so building one per chat session is cheap.
+    """
+
+    def __init__(self, config, graph_uri=None, graph_password=None):
+        self.config = config
+        self.graph_uri = graph_uri or config.neo4j.uri
+        self.graph_password = graph_password or config.neo4j.password
+        # Handles already resolved by aget
+        self._resolved = {}
+
+    @property
+    def retrieval(self):
+        from src.knowledge_graph.components.retrieval_service import RetrievalService
+        return RetrievalService.shared(self.config)
+
+    @property
+    def nlp(self):
+        return get_nlp()
+
+    @property
+    def graph(self):
+        return get_graph_driver(self.graph_uri, self.config.neo4j.username, self.graph_password)
+
+    @property
+    def async_graph(self):
+        """Async Neo4j driver; only valid inside a running event loop."""
+        return get_async_graph_driver(self.graph_uri, self.config.neo4j.username, self.graph_password)
+
+    async def aget(self, name):
+        """
+        Awaitable form of the retrieval/nlp properties: a first load (model,
+        index) runs on a worker thread instead of blocking the event loop.
+        """
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        resource = await asyncio.to_thread(getattr, self, name)
+        self._resolved[name] = resource
+        return resource
+
+    def warmup(self):
+        """Loads the vector-search resources ahead of the first query."""
+        return self.retrieval
@@ -0,0 +1,39 @@
+import yaml
+
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.constants import CONFIG_FILE_PATH
+
+
+def test_every_builder_reads_the_project_config():
+    manager = ConfigManager()
+
+    ingestion = manager.get_ingestion_data_config()
+    assert ingestion.output_json.endswith("output.jsonl")
+    assert ingestion.database.page_size > 0
+
+    transform = manager.get_transform_data_config()
+    assert transform.input_json == ingestion.output_json
+    assert transform.nlp.batch_size > 0
+
+    embedd = manager.get_pipeline_embedd_config()
+    assert embedd.chunking.chunk_size > embedd.chunking.chunk_overlap
+
+    rag = manager.get_rag_pipeline_config()
+    assert rag.embedding_model == embedd.embedding_model.name
+
+
+def test_transform_config_takes_neo4j_and_graph_loader_settings_from_yaml(tmp_path):
+    with open(CONFIG_FILE_PATH) as f:
+        config = yaml.safe_load(f)
+    config["transform_data"]["neo4j"]["database"] = "other-db"
+    config["transform_data"]["graph_loader"] = {"batch_size": 123, "workers": 3}
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+
+    transform = ConfigManager(path).get_transform_data_config()
+
+    assert transform.neo4j_database == "other-db"
+    assert transform.graph_loader.batch_size == 123
+    assert transform.graph_loader.workers == 3
+    # Unset keys keep the dataclass defaults
+    assert transform.graph_loader.max_retries == 5
@@ -0,0 +1,68 @@
+import zlib
+
+import numpy as np
+
+from src.knowledge_graph.components.embedding_cache import EmbeddingCache
+
+
+def fake_encode(texts, calls=None):
+    if calls is not None:
+        calls.append(list(texts))
+    return np.stack([np.random.default_rng(zlib.crc32(t.encode())).random(4) for t in texts]).astype(np.float32)
+
+
+def test_only_misses_are_encoded_and_reused_after_reload(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model", normalize=True)
+    calls = []
+    texts = ["a", "b", "a", "c"]
+
+    vectors = cache.encode(texts, lambda t: fake_encode(t, calls))
+    assert calls == [["a", "b", "c"]]
+    assert np.allclose(vectors, fake_encode(texts))
+    cache.save()
+
+    reloaded = EmbeddingCache(tmp_path, "model", normalize=True)
+    calls = []
+    vectors = reloaded.encode(["c", "d", "a"], lambda t: fake_encode(t, calls))
+    assert calls == [["d"]]
+    assert np.allclose(vectors, fake_encode(["c", "d", "a"]))
+    assert reloaded.stats()["hits"] == 2
+
+
+def test_other_model_does_not_share_entries(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model", normalize=True)
+    cache.encode(["a"], fake_encode)
+    cache.save()
+
+    calls = []
+    EmbeddingCache(tmp_path, "other", normalize=True).encode(["a"], lambda t: fake_encode(t, calls))
+    assert calls == [["a"]]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model", normalize=True, max_entries=3)
+    cache.encode(["a", "b", "c"], fake_encode)
+    cache.encode(["a"], fake_encode)          # b is now the oldest
+    cache.encode(["d"], fake_encode)
+
+    assert cache.stats()["entries"] == 3
+    assert cache.stats()["evictions"] == 1
+    calls = []
+    cache.encode(["a", "c", "d", "b"], lambda t: fake_encode(t, calls))
+    assert calls == [["b"]]
+
+
+def test_interrupted_run_leaves_a_consistent_cache(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model", normalize=True, max_entries=100)
+    saved = [f"old {i}" for i in range(100)]
+    cache.encode(saved, fake_encode)
+    cache.save()
+
+    # Evicts and stores new vectors, but never reaches save()
+    for batch in range(5):
+        cache.encode([f"new {batch} {i}" for i in range(40)], fake_encode)
+    del cache
+
+    reloaded = EmbeddingCache(tmp_path, "model", normalize=True, max_entries=100)
+    texts = saved + [f"new {batch} {i}" for batch in range(5) for i in range(40)]
+    assert np.allclose(reloaded.encode(texts, fake_encode), fake_encode(texts))
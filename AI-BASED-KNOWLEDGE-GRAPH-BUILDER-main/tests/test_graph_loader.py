@@ -0,0 +1,164 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from neo4j.exceptions import ClientError, TransientError
+
+from src.knowledge_graph.components.graph_loader import ENTITY_QUERY, TRIPLE_QUERY, GraphLoader
+from src.knowledge_graph.components.graph_schema import (BACKFILL_NAME_LOWER, COUNT_ENTITIES, COUNT_NAME_LOWER,
+                                                         SCHEMA_STATEMENTS)
+
+
+class FakeDriver:
+    """
+    Records committed transactions; commits fail with the queued errors
+    first. Schema statements report created_per_statement new
+    indexes/constraints; counts answers the entity count queries.
+    """
+
+    def __init__(self, failures=(), created_per_statement=0, counts=None):
+        self.failures = list(failures)
+        self.commits = []
+        self.auto_commit = []
+        self.lock = threading.Lock()
+        self.created_per_statement = created_per_statement
+        self.counts = counts or {}
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.driver.auto_commit.append(query)
+        created = self.driver.created_per_statement if query in SCHEMA_STATEMENTS else 0
+        return FakeResult(created, self.driver.counts.get(query, 0))
+
+    def begin_transaction(self):
+        return FakeTransaction(self.driver)
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, rows):
+        self.statements.append((query, rows))
+        return FakeResult()
+
+    def commit(self):
+        with self.driver.lock:
+            if self.driver.failures:
+                raise self.driver.failures.pop(0)
+            self.driver.commits.extend(self.statements)
+
+
+class FakeResult:
+    def __init__(self, created=0, count=0):
+        self.created = created
+        self.count = count
+
+    def consume(self):
+        return SimpleNamespace(counters=SimpleNamespace(constraints_added=0, indexes_added=self.created))
+
+    def single(self):
+        return {"n": self.count}
+
+
+def entities(n):
+    return [{"id": f"e{i}_ORG", "name": f"E{i}", "label": "ORG"} for i in range(n)]
+
+
+def triples(n):
+    return [{"head_id": f"e{i}_ORG", "tail_id": f"e{i + 1}_ORG", "relation": "RELATED_TO"} for i in range(n)]
+
+
+def test_rows_are_written_in_batches():
+    driver = FakeDriver()
+    loader = GraphLoader(driver, batch_size=4)
+
+    assert loader.load_entities(entities(10)) == 10
+    assert loader.load_triples(triples(5)) == 5
+
+    assert [len(rows) for _, rows in driver.commits] == [4, 4, 2, 4, 1]
+    assert [query for query, _ in driver.commits] == [ENTITY_QUERY] * 3 + [TRIPLE_QUERY] * 2
+    assert driver.commits[0][1][0] == {"id": "e0_ORG", "name": "E0", "type": "ORG"}
+    assert driver.commits[3][1][0] == {"hid": "e0_ORG", "tid": "e1_ORG", "rel": "RELATED_TO"}
+
+
+def test_parallel_writers_write_every_row_once():
+    driver = FakeDriver()
+    loader = GraphLoader(driver, batch_size=3, workers=4)
+
+    assert loader.load_entities(entities(50)) == 50
+    written = sorted(row["id"] for _, rows in driver.commits for row in rows)
+    assert written == sorted(e["id"] for e in entities(50))
+
+
+def test_retryable_failure_retries_the_batch():
+    driver = FakeDriver(failures=[TransientError("deadlock"), TransientError("deadlock")])
+    loader = GraphLoader(driver, batch_size=5, max_retries=3, retry_backoff_s=0)
+
+    assert loader.load_entities(entities(5)) == 5
+    assert loader.retries == 2
+    # Failed attempts were rolled back: the batch is committed exactly once
+    assert len(driver.commits) == 1
+
+
+def test_gives_up_after_max_retries():
+    driver = FakeDriver(failures=[TransientError("deadlock")] * 3)
+    loader = GraphLoader(driver, batch_size=5, max_retries=3, retry_backoff_s=0)
+
+    with pytest.raises(TransientError):
+        loader.load_entities(entities(5))
+    assert driver.commits == []
+
+
+def test_non_retryable_failure_is_raised_at_once():
+    driver = FakeDriver(failures=[ClientError("syntax error")])
+    loader = GraphLoader(driver, batch_size=5, max_retries=3, retry_backoff_s=0)
+
+    with pytest.raises(ClientError):
+        loader.load_entities(entities(5))
+    assert loader.retries == 0
+
+
+def test_ensure_schema_runs_every_statement():
+    driver = FakeDriver()
+    GraphLoader(driver).ensure_schema()
+
+    assert driver.auto_commit[:len(SCHEMA_STATEMENTS)] == SCHEMA_STATEMENTS
+
+
+def test_ensure_schema_backfills_when_the_schema_is_created():
+    driver = FakeDriver(created_per_statement=1)
+    GraphLoader(driver).ensure_schema()
+
+    assert driver.auto_commit[-1] == BACKFILL_NAME_LOWER
+    assert COUNT_ENTITIES not in driver.auto_commit
+
+
+def test_ensure_schema_backfills_only_missing_name_lower():
+    complete = FakeDriver(counts={COUNT_ENTITIES: 10, COUNT_NAME_LOWER: 10})
+    GraphLoader(complete).ensure_schema()
+    assert BACKFILL_NAME_LOWER not in complete.auto_commit
+
+    partial = FakeDriver(counts={COUNT_ENTITIES: 10, COUNT_NAME_LOWER: 7})
+    GraphLoader(partial).ensure_schema()
+    assert partial.auto_commit[-1] == BACKFILL_NAME_LOWER
@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from src.knowledge_graph.components.incremental_ingestion import IncrementalDataIngestion
+from src.knowledge_graph.entity.config_entity import DataIngestionConfig
+
+
+@pytest.fixture
+def sources(tmp_path):
+    emails = tmp_path / "emails"
+    emails.mkdir()
+    for name in ("a", "b", "c"):
+        (emails / f"{name}.txt").write_text(f"From: {name}@example.com\nSubject: {name}\n\nBody of {name}.")
+
+    db_path = tmp_path / "data.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE orders (order_id TEXT, status TEXT)")
+        conn.executemany("INSERT INTO orders VALUES (?, ?)", [("o1", "new"), ("o2", "shipped")])
+    return tmp_path
+
+
+def ingest(root, tables_json="tables.json"):
+    out = root / "out"
+    config = DataIngestionConfig(
+        root_dir=str(out), email_dir=str(root / "emails"), pdf_dir=str(root / "pdf"),
+        csv_dir=str(root / "csv"), db_path=str(root / "data.db"),
+        output_json=str(out / "output.jsonl"), tables_json=str(out / tables_json) if tables_json else None,
+        incremental=True, manifest_path=str(out / "manifest.json"), delta_json=str(out / "delta.jsonl"),
+    )
+    IncrementalDataIngestion(config).ingest()
+    with open(config.output_json, encoding="utf-8") as f:
+        snapshot = {r["id"]: r for r in map(json.loads, f)}
+    with open(config.delta_json, encoding="utf-8") as f:
+        delta = [json.loads(line) for line in f]
+    return snapshot, delta
+
+
+def ids_of(snapshot, source_name):
+    return sorted(i for i, r in snapshot.items() if r["source_name"] == source_name)
+
+
+def test_unchanged_sources_keep_their_ids(sources):
+    first, _ = ingest(sources)
+    second, delta = ingest(sources)
+
+    assert delta == []
+    assert second == first
+
+
+def test_changed_source_reuses_its_ids(sources):
+    first, _ = ingest(sources)
+    (sources / "emails" / "b.txt").write_text("From: b@example.com\nSubject: b\n\nA new body.")
+    second, delta = ingest(sources)
+
+    assert ids_of(second, "b.txt") == ids_of(first, "b.txt")
+    assert [r["id"] for r in delta] == ids_of(first, "b.txt")
+    assert second[ids_of(second, "b.txt")[0]]["text"] == "A new body."
+    for name in ("a.txt", "c.txt", "orders"):
+        assert ids_of(second, name) == ids_of(first, name)
+
+
+def test_new_rows_and_files_get_new_ids(sources):
+    first, _ = ingest(sources)
+    with sqlite3.connect(sources / "data.db") as conn:
+        conn.execute("INSERT INTO orders VALUES ('o3', 'new')")
+    (sources / "emails" / "d.txt").write_text("From: d@example.com\nSubject: d\n\nBody of d.")
+    second, _ = ingest(sources)
+
+    assert set(first) < set(second)
+    assert all(second[i] == first[i] for i in first)
+    assert len(ids_of(second, "orders")) == 3
+    assert min(set(second) - set(first)) > max(first)
+
+
+def test_removed_source_leaves_tombstones(sources):
+    first, _ = ingest(sources)
+    os.remove(sources / "emails" / "a.txt")
+    second, delta = ingest(sources)
+
+    assert delta == [{"id": i, "deleted": True} for i in ids_of(first, "a.txt")]
+    assert set(second) == set(first) - set(ids_of(first, "a.txt"))
+
+
+def test_tables_json_defaults_next_to_output(sources):
+    first, _ = ingest(sources, tables_json=None)
+    second, delta = ingest(sources, tables_json=None)
+
+    with open(sources / "out" / "tables.json", encoding="utf-8") as f:
+        assert list(json.load(f)) == [first[ids_of(first, "orders")[0]]["metadata"]["table"]]
+    assert delta == []
+    assert second == first
@@ -0,0 +1,34 @@
+import glob
+import os
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from src.knowledge_graph.components.data_ingestion import _parse_csv, _parse_email
+from src.knowledge_graph.components.nlp_engine import NLPEngine
+
+MODEL = "en_core_web_sm"
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+pytestmark = pytest.mark.skipif(not spacy.util.is_package(MODEL), reason=f"spaCy model {MODEL} is not installed")
+
+
+def entity_spans(doc):
+    return {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+
+
+def test_trimmed_pipeline_finds_the_full_pipelines_entities():
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "emails", "*.txt"))):
+        payloads.extend(_parse_email(path))
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "spreadsheets", "*.csv"))):
+        payloads.extend(_parse_csv(path))
+    texts = [text for _, _, _, text in payloads if text]
+
+    engine = NLPEngine(MODEL)
+    assert "parser" not in engine.nlp.pipe_names
+    full = spacy.load(MODEL)
+
+    trimmed = [entity_spans(doc) for doc, _ in engine.pipe((text, None) for text in texts)]
+    assert trimmed == [entity_spans(full(text)) for text in texts]
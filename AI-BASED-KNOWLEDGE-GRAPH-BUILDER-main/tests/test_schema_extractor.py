@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from src.knowledge_graph.components.data_ingestion import DataIngestion
+from src.knowledge_graph.components.schema_extractor import SchemaExtractor
+from src.knowledge_graph.entity.config_entity import DataIngestionConfig
+
+SCHEMA = """
+tables:
+  customers.csv:
+    entities:
+      customer: {columns: [First Name, Last Name], label: PERSON}
+      company: {column: Company, label: ORG}
+      city: {column: City, label: GPE}
+    relations:
+      - [customer, WORKS_AT, company]
+      - [customer, LIVES_IN, city]
+"""
+
+
+@pytest.fixture
+def ingested(tmp_path):
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    # The first company name contains the ", <column>: " delimiter of the rendered rows
+    (csv_dir / "customers.csv").write_text(
+        "First Name,Last Name,Company,City\n"
+        'Ada,Lovelace,"Acme, City: Paris",London\n'
+        "Alan,Turing,,Manchester\n"
+    )
+    out = tmp_path / "out"
+    config = DataIngestionConfig(
+        root_dir=str(out), email_dir=str(tmp_path / "emails"), pdf_dir=str(tmp_path / "pdf"),
+        csv_dir=str(csv_dir), db_path=str(tmp_path / "missing.db"), output_json=str(out / "output.jsonl"),
+    )
+    DataIngestion(config).ingest()
+    (tmp_path / "schema.yaml").write_text(SCHEMA)
+    with open(config.output_json, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    return tmp_path / "schema.yaml", out / "tables.json", records
+
+
+def extract(schema_path, tables_json, records):
+    extractor = SchemaExtractor(schema_path, tables_json)
+    entities, relations = [], []
+    for record in records:
+        assert extractor.handles(record)
+        extractor.add(record)
+    for found, related in extractor.flush():
+        entities.extend(found)
+        relations.extend(related)
+    return ({e["id"]: e["name"] for e in entities},
+            sorted((r["subject_name"], r["relation"], r["object_name"]) for r in relations))
+
+
+def test_values_containing_the_delimiter_are_kept_whole(ingested):
+    entities, relations = extract(*ingested)
+
+    assert entities == {
+        "ada lovelace_PERSON": "Ada Lovelace",
+        "alan turing_PERSON": "Alan Turing",
+        "acme, city: paris_ORG": "Acme, City: Paris",
+        "london_GPE": "London",
+        "manchester_GPE": "Manchester",
+    }
+    assert relations == [
+        ("Ada Lovelace", "LIVES_IN", "London"),
+        ("Ada Lovelace", "WORKS_AT", "Acme, City: Paris"),
+        ("Alan Turing", "LIVES_IN", "Manchester"),
+    ]
+
+
+def test_rows_without_values_fall_back_to_the_rendered_text(ingested):
+    schema_path, tables_json, records = ingested
+    for record in records:
+        del record["metadata"]["values"]
+
+    entities, _ = extract(schema_path, tables_json, records)
+
+    assert entities["alan turing_PERSON"] == "Alan Turing"
+    assert entities["manchester_GPE"] == "Manchester"
+    # The legacy regex path cannot tell the delimiter inside a value apart
+    assert "acme_ORG" in entities
@@ -0,0 +1,35 @@
+import glob
+import os
+
+from src.knowledge_graph.components.data_ingestion import _parse_email
+from src.knowledge_graph.components.search_filter import SearchFilter, document_date, matching_ids
+
+EMAIL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "emails")
+INGESTED = "2026-01-01T00:00:00"
+
+
+def sample_emails():
+    docs = []
+    for path in sorted(glob.glob(os.path.join(EMAIL_DIR, "*.txt"))):
+        for source_type, source_name, metadata, text in _parse_email(path):
+            docs.append({"source_type": source_type, "source_name": source_name,
+                         "metadata": metadata, "text": text, "ingestion_timestamp": INGESTED})
+    return docs
+
+
+def test_document_date_parses_rfc2822_and_iso_dates():
+    assert document_date({"metadata": {"date": "Tue, 01 Oct 2024 09:30:00 +0200"}}) == "2024-10-01T07:30:00"
+    assert document_date({"metadata": {"date": "2024-10-01"}}) == "2024-10-01T00:00:00"
+    assert document_date({"metadata": {"date": "soon"}, "ingestion_timestamp": INGESTED}) == INGESTED
+
+
+def test_filter_sample_emails_by_date():
+    docs = sample_emails()
+    metadata = {i: {"source_type": doc["source_type"], "source_name": doc["source_name"],
+                    "created_at": document_date(doc)} for i, doc in enumerate(docs)}
+
+    ids = matching_ids(metadata, SearchFilter.parse("source=email from=2024-10-05 to=2024-10-10"))
+
+    dates = sorted(metadata[i]["created_at"][:10] for i in ids.tolist())
+    assert dates == ["2024-10-05", "2024-10-06", "2024-10-07", "2024-10-08", "2024-10-09"]
+    assert not matching_ids(metadata, SearchFilter.parse("from=2025-01")).size